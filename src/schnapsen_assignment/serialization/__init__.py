@@ -1,6 +1,44 @@
+from typing import Iterable, Sequence, cast
 from .gamelog_pb2 import ActionGameLog, ConditionGameLog, GameLog, Move, MoveType, Card
+from .compact import AnyGameLog, CompactGameLog, encode_compact, is_compact, read_compact, write_compact
+from .stream import GameLogStreamReader, GameLogStreamWriter, is_stream, is_stream_file, read_game_log, write_stream
 from schnapsen.game import Move as SchnapsenMove, RegularMove, Marriage, TrumpExchange
-from schnapsen.deck import Card as SchnapsenCard
+from schnapsen.deck import Card as SchnapsenCard, Rank, Suit
+
+# Lookup tables between the Card enum of the gamelog and the one of schnapsen, in both directions
+_SCHNAPSEN_CARDS: dict[int, SchnapsenCard] = {number: SchnapsenCard[name] for name, number in Card.items()}
+_PB_CARDS: dict[SchnapsenCard, Card] = {card: cast(Card, number) for number, card in _SCHNAPSEN_CARDS.items()}
+
+
+def _move_key(move_type: int, cards: Sequence[int]) -> int:
+    """A key which identifies the move type, the number of cards and the cards, -1 if the move cannot be a known one.
+
+    The cards take the lowest 12 bits, 6 for each, above them are the number of cards and the move type.
+    """
+    if not 0 <= move_type < 4 or len(cards) > 2:
+        return -1
+    key = 0
+    for card in cards:
+        if not 0 <= card < 63:
+            return -1
+        key = (key << 6) | (card + 1)
+    return (move_type << 2 | len(cards)) << 12 | key
+
+
+# There is only a small, fixed, number of distinct moves. They are immutable, so each is created once and shared
+_INTERNED_MOVES: dict[int, SchnapsenMove] = {}
+for _card in SchnapsenCard:
+    _INTERNED_MOVES[_move_key(MoveType.REGULAR, [_PB_CARDS[_card]])] = RegularMove(_card)
+for _suit in Suit:
+    _jack = SchnapsenCard.get_card(Rank.JACK, _suit)
+    _queen = SchnapsenCard.get_card(Rank.QUEEN, _suit)
+    _king = SchnapsenCard.get_card(Rank.KING, _suit)
+    _INTERNED_MOVES[_move_key(MoveType.TRUMP_EXCHANGE, [_PB_CARDS[_jack]])] = TrumpExchange(_jack)
+    _INTERNED_MOVES[_move_key(MoveType.MARRIAGE, [_PB_CARDS[_queen], _PB_CARDS[_king]])] = Marriage(_queen, _king)
+
+# Dense integer codes for the known moves, 0 up to len(MOVES), e.g., for columnar exports
+MOVES: tuple[SchnapsenMove, ...] = tuple(_INTERNED_MOVES.values())
+_MOVE_CODES: dict[int, int] = {key: code for code, key in enumerate(_INTERNED_MOVES)}
 
 
 def to_pb_move(move: SchnapsenMove) -> Move:
@@ -12,15 +50,21 @@ def to_pb_move(move: SchnapsenMove) -> Move:
         move_type = MoveType.MARRIAGE
     else:
         raise AssertionError("Code path must never reach here. File an issue on github")
-    return Move(move_type=move_type, cards=[card.name for card in move.cards])
+    return Move(move_type=move_type, cards=[_PB_CARDS[card] for card in move.cards])
 
 
 def to_schnapsen_card(card: Card) -> SchnapsenCard:
-    name = Card.Name(card)
-    return SchnapsenCard[name]
+    try:
+        return _SCHNAPSEN_CARDS[card]
+    except KeyError:
+        raise ValueError(f"Unknown card number {card}") from None
 
 
 def to_schnapsen_move(move: Move) -> SchnapsenMove:
+    interned = _INTERNED_MOVES.get(_move_key(move.move_type, move.cards))
+    if interned is not None:
+        return interned
+    # Not one of the known moves, construct it such that the usual validation applies
     if move.move_type == MoveType.REGULAR:
         assert len(move.cards) == 1
         return RegularMove(to_schnapsen_card(move.cards[0]))
@@ -34,4 +78,17 @@ def to_schnapsen_move(move: Move) -> SchnapsenMove:
         raise AssertionError("Code path must never reach here. File an issue on github")
 
 
-__all__ = ["ActionGameLog", "ConditionGameLog", "GameLog", "Move", "to_pb_move", "to_schnapsen_move"]
+def move_code(move: Move) -> int:
+    """The index of the move in MOVES, -1 if it is not one of the known moves."""
+    return _MOVE_CODES.get(_move_key(move.move_type, move.cards), -1)
+
+
+def to_schnapsen_moves(moves: Iterable[Move]) -> tuple[SchnapsenMove, ...]:
+    """Convert a whole repeated outcomes field at once. The result can be iterated as often as needed."""
+    interned_moves = _INTERNED_MOVES
+    return tuple(interned_moves.get(_move_key(move.move_type, move.cards)) or to_schnapsen_move(move) for move in moves)
+
+
+__all__ = ["ActionGameLog", "ConditionGameLog", "GameLog", "Move", "MOVES", "move_code", "to_pb_move", "to_schnapsen_move", "to_schnapsen_moves",
+           "GameLogStreamReader", "GameLogStreamWriter", "is_stream", "is_stream_file", "read_game_log", "write_stream",
+           "AnyGameLog", "CompactGameLog", "encode_compact", "is_compact", "read_compact", "write_compact"]
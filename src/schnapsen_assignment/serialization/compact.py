@@ -0,0 +1,279 @@
+"""A compact container for game logs.
+
+A GameLog stores every condition outcome as a byte, every move as a nested message, and the game IDs again in every section.
+The compact container stores the same content with the condition outcomes packed into bits, the moves as indices into a dictionary of the distinct moves,
+and the game IDs once, in a table which the sections refer to.
+
+Layout of a compact game log::
+
+    MAGIC
+    varint  flags, FLAG_ZSTD if the blocks are compressed with zstd
+    varint  length of the tables block
+    bytes   tables block:
+        varint  number of distinct moves
+        repeated move:
+            varint  move type
+            varint  number of cards
+            repeated varint  card
+        varint  number of game IDs
+        repeated zigzag varint  difference to the previous game ID, the first one to 0
+        varint  number of sections
+        repeated section:
+            varint  field number of the section in GameLog (condition1 = 1, ..., integration = 21)
+            varint  number of records
+            varint  length of the section block
+    repeated section block, in the order of the tables:
+        repeated record:
+            zigzag varint  difference of the index in the game ID table to the one of the previous record, the first one to 0
+            varint  number of outcomes
+            conditions: the outcomes as bits, the first one in the lowest bit of the first byte, padded to whole bytes
+            actions: the index of every move in the dictionary, one byte each if there are at most 256 distinct moves, two bytes little endian otherwise
+
+Every block is compressed on its own, such that CompactGameLog decodes only the sections which are used.
+Compression needs the zstandard package.
+"""
+from typing import Any, BinaryIO, Union, cast
+
+from .gamelog_pb2 import ActionGameLog, Card, ConditionGameLog, GameLog, Move, MoveType
+from .stream import SECTIONS, _encode_varint
+
+MAGIC = b"SCHNAPSEN-GAMELOG-COMPACT\x01"
+FLAG_ZSTD = 1
+
+_SECTION_NUMBERS = {name: GameLog.DESCRIPTOR.fields_by_name[name].number for name in SECTIONS}
+_SECTION_BY_NUMBER = {number: name for name, number in _SECTION_NUMBERS.items()}
+# for every byte, the eight outcomes in it, as the bytes of a packed repeated bool field
+_UNPACKED_BITS = [bytes((byte >> bit) & 1 for bit in range(8)) for byte in range(256)]
+_SMALL_VARINTS = [bytes([value]) for value in range(0x80)]
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _decode_varint(data: Union[bytes, memoryview], position: int) -> tuple[int, int]:
+    """The varint at position, and the position after it."""
+    result = 0
+    shift = 0
+    while True:
+        try:
+            byte = data[position]
+        except IndexError:
+            raise ValueError("The compact game log ends in the middle of a varint")
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def _length(length: int) -> bytes:
+    return _SMALL_VARINTS[length] if length < 0x80 else _encode_varint(length)
+
+
+def _field(number: int, content: bytes) -> bytes:
+    """A length delimited protobuf field"""
+    return _encode_varint(number << 3 | 2) + _length(len(content)) + content
+
+
+def _game_id_field(game_id: int) -> bytes:
+    # int64 is encoded as the unsigned 64 bit two's complement, and left out when it is 0
+    return b"\x08" + _encode_varint(game_id & 0xFFFFFFFFFFFFFFFF) if game_id else b""
+
+
+def is_compact(prefix: bytes) -> bool:
+    """Whether the bytes are the start of a compact game log"""
+    return prefix.startswith(MAGIC)
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError:
+        raise Exception("Compressed compact game logs require zstandard, install it with `pip install schnapsen-assignment[zstd]`")
+    return zstandard
+
+
+def encode_compact(game_log: "AnyGameLog", compress: bool = False, level: int = 19) -> bytes:
+    """The game log in the compact format, with every block compressed with zstd at the given level if compress is set."""
+    compressor = _zstandard().ZstdCompressor(level=level) if compress else None
+
+    moves: dict[tuple[int, tuple[int, ...]], int] = {}
+    for section, record_type in SECTIONS.items():
+        if record_type is ActionGameLog:
+            for record in getattr(game_log, section):
+                for move in record.outcomes:
+                    moves.setdefault((move.move_type, tuple(move.cards)), len(moves))
+    if len(moves) > 0x10000:
+        raise ValueError("Too many distinct moves for a compact game log")
+
+    game_ids: dict[int, int] = {}
+    sections: list[tuple[str, int, bytearray]] = []
+    for section, record_type in SECTIONS.items():
+        records = getattr(game_log, section)
+        if not records:
+            continue
+        block = bytearray()
+        previous_index = 0
+        for record in records:
+            index = game_ids.setdefault(record.game_id, len(game_ids))
+            block += _encode_varint(_zigzag(index - previous_index))
+            previous_index = index
+            block += _encode_varint(len(record.outcomes))
+            if record_type is ConditionGameLog:
+                outcomes = list(record.outcomes)
+                block += bytes(sum(outcome << bit for bit, outcome in enumerate(outcomes[start:start + 8])) for start in range(0, len(outcomes), 8))
+            else:
+                codes = [moves[(move.move_type, tuple(move.cards))] for move in record.outcomes]
+                block += bytes(codes) if len(moves) <= 256 else b"".join(code.to_bytes(2, "little") for code in codes)
+        sections.append((section, len(records), block))
+
+    def finish(block: Union[bytes, bytearray]) -> bytes:
+        return compressor.compress(bytes(block)) if compressor is not None else bytes(block)
+
+    section_blocks = [finish(block) for _, _, block in sections]
+    tables = bytearray(_encode_varint(len(moves)))
+    for move_type, cards in moves:
+        tables += _encode_varint(move_type) + _encode_varint(len(cards)) + b"".join(_encode_varint(card) for card in cards)
+    tables += _encode_varint(len(game_ids))
+    previous_id = 0
+    for game_id in game_ids:
+        tables += _encode_varint(_zigzag(game_id - previous_id))
+        previous_id = game_id
+    tables += _encode_varint(len(sections))
+    for (section, count, _), section_block in zip(sections, section_blocks):
+        tables += _encode_varint(_SECTION_NUMBERS[section]) + _encode_varint(count) + _encode_varint(len(section_block))
+    tables_block = finish(tables)
+    return b"".join([MAGIC, _encode_varint(FLAG_ZSTD if compress else 0), _encode_varint(len(tables_block)), tables_block, *section_blocks])
+
+
+def write_compact(game_log: "AnyGameLog", fp: BinaryIO, compress: bool = False, level: int = 19) -> None:
+    fp.write(encode_compact(game_log, compress, level))
+
+
+class CompactGameLog:
+    """A compact game log, which decodes every section the first time it is used.
+
+    The sections are attributes with the same names and contents as the ones of a GameLog, repeated fields of ConditionGameLog or ActionGameLog records.
+    """
+
+    def __init__(self, data: Union[bytes, memoryview]) -> None:
+        # the sections are slices of the data, which is not copied. It can be a view of a memory mapped file
+        data = memoryview(data)
+        if not is_compact(bytes(data[:len(MAGIC)])):
+            raise ValueError("Not a compact game log")
+        self._data = data
+        flags, position = _decode_varint(data, len(MAGIC))
+        self._decompressor = _zstandard().ZstdDecompressor() if flags & FLAG_ZSTD else None
+        length, position = _decode_varint(data, position)
+        tables = self._block(data[position:position + length])
+        position += length
+
+        move_count, offset = _decode_varint(tables, 0)
+        self.moves: list[Move] = []
+        for _ in range(move_count):
+            move_type, offset = _decode_varint(tables, offset)
+            card_count, offset = _decode_varint(tables, offset)
+            cards: list[Card] = []
+            for _ in range(card_count):
+                card, offset = _decode_varint(tables, offset)
+                cards.append(cast(Card, card))
+            self.moves.append(Move(move_type=cast(MoveType, move_type), cards=cards))
+        # every move as a field of ActionGameLog.outcomes, ready to be joined into a record
+        self._move_fields = [_field(2, move.SerializeToString()) for move in self.moves]
+
+        game_id_count, offset = _decode_varint(tables, offset)
+        self.game_ids: list[int] = []
+        game_id = 0
+        for _ in range(game_id_count):
+            delta, offset = _decode_varint(tables, offset)
+            game_id += _unzigzag(delta)
+            self.game_ids.append(game_id)
+        self._game_id_fields = [_game_id_field(game_id) for game_id in self.game_ids]
+
+        section_count, offset = _decode_varint(tables, offset)
+        self._blocks: dict[str, tuple[int, memoryview]] = {}
+        for _ in range(section_count):
+            number, offset = _decode_varint(tables, offset)
+            count, offset = _decode_varint(tables, offset)
+            length, offset = _decode_varint(tables, offset)
+            if position + length > len(data):
+                raise ValueError("The compact game log ends in the middle of a section")
+            self._blocks[_SECTION_BY_NUMBER[number]] = (count, data[position:position + length])
+            position += length
+        self._sections: dict[str, Any] = {}
+
+    def _block(self, block: memoryview) -> Union[bytes, memoryview]:
+        return self._decompressor.decompress(block) if self._decompressor is not None else block
+
+    def __reduce__(self) -> tuple[type["CompactGameLog"], tuple[bytes]]:
+        # neither the view nor the decompressor can be pickled
+        return CompactGameLog, (bytes(self._data),)
+
+    def _decode_section(self, section: str) -> bytes:
+        """The section as a serialized GameLog which contains only this section. Parsing that is left to protobuf, which is much faster at it."""
+        if section not in self._blocks:
+            return b""
+        count, compressed = self._blocks[section]
+        block = self._block(compressed)
+        tag = _encode_varint(_SECTION_NUMBERS[section] << 3 | 2)
+        conditions = SECTIONS[section] is ConditionGameLog
+        code_width = 1 if len(self.moves) <= 256 else 2
+        move_fields = self._move_fields
+        game_id_fields = self._game_id_fields
+        records: list[bytes] = []
+        index = 0
+        position = 0
+        for _ in range(count):
+            # most varints in a block are a single byte
+            delta, position = (block[position], position + 1) if block[position] < 0x80 else _decode_varint(block, position)
+            index += _unzigzag(delta)
+            outcome_count, position = (block[position], position + 1) if block[position] < 0x80 else _decode_varint(block, position)
+            if conditions:
+                end = position + (outcome_count + 7) // 8
+                outcomes = b"".join([_UNPACKED_BITS[byte] for byte in block[position:end]])[:outcome_count]
+                content = b"\x12" + _length(outcome_count) + outcomes if outcome_count else b""
+            else:
+                end = position + outcome_count * code_width
+                codes = block[position:end] if code_width == 1 else [int.from_bytes(block[start:start + 2], "little") for start in range(position, end, 2)]
+                content = b"".join([move_fields[code] for code in codes])
+            if end > len(block):
+                raise ValueError(f"The compact game log ends in the middle of a record of {section}")
+            position = end
+            record = game_id_fields[index] + content
+            records.append(tag + _length(len(record)) + record)
+        return b"".join(records)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in SECTIONS:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        if name not in self._sections:
+            self._sections[name] = getattr(GameLog.FromString(self._decode_section(name)), name)
+        return self._sections[name]
+
+    def to_game_log(self) -> GameLog:
+        """Decode all sections into a GameLog"""
+        return GameLog.FromString(b"".join(self._decode_section(section) for section in SECTIONS))
+
+    def SerializeToString(self, deterministic: bool = False) -> bytes:
+        return self.to_game_log().SerializeToString(deterministic=deterministic)
+
+
+# what the checker accepts: both have the sections as attributes
+AnyGameLog = Union[GameLog, CompactGameLog]
+
+
+def read_compact(fp: BinaryIO) -> CompactGameLog:
+    return CompactGameLog(fp.read())
@@ -0,0 +1,158 @@
+"""A streaming container for game logs.
+
+A GameLog is a single protobuf message, which has to be read and parsed completely before it can be used.
+The streaming container stores the same ConditionGameLog and ActionGameLog records, but length delimited, such that they can be read one by one.
+
+Layout of a stream::
+
+    MAGIC
+    repeated chunk:
+        varint  field number of the section in GameLog (condition1 = 1, ..., integration = 21)
+        varint  number of records in the chunk
+        repeated record:
+            varint  length of the record
+            bytes   serialized ConditionGameLog or ActionGameLog
+
+A section can be split over several chunks, which allows writers to emit records without knowing how many will follow.
+"""
+import io
+import os
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, Optional, Union
+
+from .gamelog_pb2 import ActionGameLog, ConditionGameLog, GameLog
+
+if TYPE_CHECKING:
+    from .compact import AnyGameLog
+
+MAGIC = b"SCHNAPSEN-GAMELOG-STREAM\x01"
+
+SECTIONS: dict[str, type[Union[ConditionGameLog, ActionGameLog]]] = {
+    "condition1": ConditionGameLog,
+    "condition2": ConditionGameLog,
+    "condition3": ConditionGameLog,
+    "action1": ActionGameLog,
+    "action2": ActionGameLog,
+    "action3": ActionGameLog,
+    "action4": ActionGameLog,
+    "integration": ActionGameLog,
+}
+_SECTION_BY_NUMBER = {GameLog.DESCRIPTOR.fields_by_name[name].number: name for name in SECTIONS}
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _read_varint(fp: BinaryIO) -> Optional[int]:
+    """Read a varint, returns None at the end of the stream."""
+    result = 0
+    shift = 0
+    while True:
+        byte = fp.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("The game log stream ends in the middle of a varint")
+            return None
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+
+
+def is_stream(prefix: bytes) -> bool:
+    """Whether the bytes are the start of a streaming game log"""
+    return prefix.startswith(MAGIC)
+
+
+def is_stream_file(path: "os.PathLike[str] | str") -> bool:
+    """Whether the file is a streaming game log, only its first bytes are read"""
+    with open(path, "rb") as f:
+        return is_stream(f.read(len(MAGIC)))
+
+
+class GameLogStreamWriter:
+    """Writes records to a stream. Every call to write emits one chunk."""
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        fp.write(MAGIC)
+
+    def write(self, section: str, records: Iterable[Union[ConditionGameLog, ActionGameLog]]) -> None:
+        serialized = [record.SerializeToString() for record in records]
+        if not serialized:
+            return
+        self.fp.write(_encode_varint(GameLog.DESCRIPTOR.fields_by_name[section].number))
+        self.fp.write(_encode_varint(len(serialized)))
+        for data in serialized:
+            self.fp.write(_encode_varint(len(data)))
+            self.fp.write(data)
+
+
+def write_stream(game_log: GameLog, fp: BinaryIO, chunk_size: Optional[int] = None) -> None:
+    """Write the game log as a stream, section by section, in chunks of at most chunk_size records."""
+    writer = GameLogStreamWriter(fp)
+    for section in SECTIONS:
+        records = list(getattr(game_log, section))
+        step = chunk_size or max(len(records), 1)
+        for start in range(0, len(records), step):
+            writer.write(section, records[start:start + step])
+
+
+class GameLogStreamReader:
+    """Reads the records of a stream one by one, as (section, record) pairs.
+
+    Records of sections passed to skip_section are not parsed anymore, but skipped over.
+    """
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        if not is_stream(fp.read(len(MAGIC))):
+            raise ValueError("Not a streaming game log")
+        self.skipped: set[str] = set()
+        self._seekable = fp.seekable()
+
+    def skip_section(self, section: str) -> None:
+        self.skipped.add(section)
+
+    def __iter__(self) -> Iterator[tuple[str, Union[ConditionGameLog, ActionGameLog]]]:
+        while (number := _read_varint(self.fp)) is not None:
+            section = _SECTION_BY_NUMBER.get(number)
+            if section is None:
+                raise ValueError(f"Unknown section number {number} in the game log stream")
+            count = _read_varint(self.fp)
+            for _ in range(count or 0):
+                length = _read_varint(self.fp)
+                if length is None:
+                    raise ValueError("The game log stream ends in the middle of a chunk")
+                if section in self.skipped:
+                    if self._seekable:
+                        self.fp.seek(length, 1)
+                    else:
+                        self.fp.read(length)
+                    continue
+                data = self.fp.read(length)
+                if len(data) != length:
+                    raise ValueError("The game log stream ends in the middle of a record")
+                yield section, SECTIONS[section].FromString(data)
+
+
+def read_game_log(fp: BinaryIO) -> "AnyGameLog":
+    """Read a complete GameLog, from a stream, a compact game log, or a serialized GameLog message.
+
+    A compact game log is returned as a CompactGameLog, which decodes its sections only when they are used.
+    """
+    from .compact import CompactGameLog, is_compact
+    data = fp.read()
+    if is_compact(data):
+        return CompactGameLog(data)
+    if not is_stream(data):
+        return GameLog.FromString(data)
+    game_log = GameLog()
+    for section, record in GameLogStreamReader(io.BytesIO(data)):
+        getattr(game_log, section).append(record)
+    return game_log
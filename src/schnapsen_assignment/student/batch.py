@@ -0,0 +1,186 @@
+import csv
+from collections import deque
+import importlib.util
+import io
+import json
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional, cast
+
+from schnapsen_assignment.serialization import AnyGameLog, read_game_log
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import (ACTION_CHECKS, CONDITION_CHECKS, INTEGRATION_CHECK,
+                                                  assess_integration_correctness, assess_snapshots_correctness)
+from schnapsen_assignment.student.snapshots import SnapshotStore
+
+CHECKS = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)
+# the number of seconds the checks of one bot may take, by default
+DEFAULT_BOT_TIMEOUT = 600.0
+# how often a bot is checked again when the pool broke while it was checked
+BOT_RETRIES = 1
+
+
+@dataclass
+class CheckResult:
+    passed: bool
+    seconds: float
+    error: Optional[str] = None
+    """The first error found by the check, if any"""
+
+
+@dataclass
+class BatchResult:
+    """The outcome of checking one student bot against the gamelog of that student."""
+
+    student: str
+    bot_path: str
+    error: Optional[str] = None
+    """Set in case the bot could not be checked at all, e.g., because it could not be imported"""
+    checks: dict[str, CheckResult] = field(default_factory=dict)
+
+    def passed(self) -> bool:
+        return self.error is None and all(result.passed for result in self.checks.values())
+
+
+def load_bot_class(path: Path, class_name: str = "AssignmentBot") -> type[AssignmentBot]:
+    """Import the module at the given path, and return the bot class it defines.
+    The class does not have to derive from our AssignmentBot, but must have the same methods."""
+    spec = importlib.util.spec_from_file_location(f"schnapsen_batch_{path.stem}", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import a module from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return cast(type[AssignmentBot], getattr(module, class_name))
+
+
+def grade_bot(student_bot: AssignmentBot, game_log: AnyGameLog, store: SnapshotStore) -> dict[str, CheckResult]:
+    """Run every check separately, such that each check gets its own timing.
+    The conditions and actions are checked against the snapshots in the store, which are shared between all bots."""
+    results: dict[str, CheckResult] = {}
+    for check in CONDITION_CHECKS + ACTION_CHECKS:
+        conditions = iter([iter(list(cond_log.outcomes)) for cond_log in game_log.condition1]) if check == "action1" else None
+        start = time.perf_counter()
+        errors = assess_snapshots_correctness(getattr(student_bot, check), getattr(game_log, check), store, conditions=conditions)
+        results[check] = CheckResult(not errors, time.perf_counter() - start, str(errors[0]) if errors else None)
+    start = time.perf_counter()
+    errors = assess_integration_correctness(student_bot, game_log.integration)
+    results[INTEGRATION_CHECK] = CheckResult(not errors, time.perf_counter() - start, str(errors[0]) if errors else None)
+    return results
+
+
+def _prepare_snapshots_task(cache_dir: Path, game_ids: list[int]) -> None:
+    SnapshotStore(cache_dir).prepare(game_ids)
+
+
+def _grade_bot_task(bot_path: Path, content: bytes, cache_dir: Path) -> BatchResult:
+    """Check the bot against the gamelog, whose content was read by the main process."""
+    result = BatchResult(student=bot_path.stem, bot_path=str(bot_path))
+    try:
+        student_bot = load_bot_class(bot_path)()
+        game_log = read_game_log(io.BytesIO(content))
+        result.checks = grade_bot(student_bot, game_log, SnapshotStore(cache_dir))
+    except BaseException:
+        # also, e.g., a bot which calls sys.exit
+        result.error = traceback.format_exc(limit=-1)
+    return result
+
+
+def _kill_pool(executor: ProcessPoolExecutor) -> None:
+    """Shut down the pool without waiting for its tasks. ProcessPoolExecutor has no public way to stop a worker in the middle of a task."""
+    for process in list((executor._processes or {}).values()):
+        process.kill()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batch(bots_dir: Path, gamelogs_dir: Path, cache_dir: Path, jobs: int = 1, timeout: float = DEFAULT_BOT_TIMEOUT) -> list[BatchResult]:
+    """Check every bot module `<student>.py` in bots_dir against the gamelog `<student>.gamelog` in gamelogs_dir.
+
+    First, the snapshots of all games occurring in any of the gamelogs are recorded, once, in the cache directory.
+    Then, every bot is imported and checked in one of the worker processes.
+    A bot whose checks take longer than timeout seconds fails. Its worker cannot be interrupted, so all workers are killed and the pool is started again,
+    the bots which were checked at the same time are checked again. When a worker dies, e.g., because a bot exited the process,
+    the pool is started again as well, and the bots which were checked on it are retried once.
+    """
+    results: list[BatchResult] = []
+    jobs_to_grade: list[tuple[Path, bytes]] = []
+    game_ids: set[int] = set()
+    for bot_path in sorted(bots_dir.glob("*.py")):
+        gamelog_path = gamelogs_dir / f"{bot_path.stem}.gamelog"
+        if not gamelog_path.exists():
+            results.append(BatchResult(student=bot_path.stem, bot_path=str(bot_path), error=f"No gamelog found at {gamelog_path}"))
+            continue
+        # read once, the workers get the content
+        content = gamelog_path.read_bytes()
+        game_log = read_game_log(io.BytesIO(content))
+        for check in CONDITION_CHECKS + ACTION_CHECKS:
+            game_ids.update(log.game_id for log in getattr(game_log, check))
+        jobs_to_grade.append((bot_path, content))
+
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        all_game_ids = sorted(game_ids)
+        list(executor.map(_prepare_snapshots_task, [cache_dir] * jobs, [all_game_ids[i::jobs] for i in range(jobs)]))
+        # the bots to check, with the number of times they were retried, and those being checked, with their deadline
+        queue = deque((bot_path, content, 0) for bot_path, content in jobs_to_grade)
+        running: dict[Future[BatchResult], tuple[Path, bytes, int, float]] = {}
+
+        def retry_or_fail(bot_path: Path, content: bytes, retries: int) -> None:
+            if retries < BOT_RETRIES:
+                queue.append((bot_path, content, retries + 1))
+            else:
+                results.append(BatchResult(student=bot_path.stem, bot_path=str(bot_path), error="A worker process died while checking the bot"))
+
+        while queue or running:
+            while queue and len(running) < jobs:
+                bot_path, content, retries = queue.popleft()
+                running[executor.submit(_grade_bot_task, bot_path, content, cache_dir)] = (bot_path, content, retries, time.monotonic() + timeout)
+            done, _ = wait(running, timeout=max(0.0, min(deadline for *_, deadline in running.values()) - time.monotonic()), return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                bot_path, content, retries, _ = running.pop(future)
+                try:
+                    results.append(future.result())
+                except BrokenProcessPool:
+                    broken = True
+                    retry_or_fail(bot_path, content, retries)
+                except Exception:
+                    results.append(BatchResult(student=bot_path.stem, bot_path=str(bot_path), error=traceback.format_exc(limit=-1)))
+            now = time.monotonic()
+            overdue = {future for future, (*_, deadline) in running.items() if deadline <= now}
+            if broken or overdue:
+                _kill_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=jobs)
+                for future, (bot_path, content, retries, _) in running.items():
+                    if future in overdue:
+                        results.append(BatchResult(student=bot_path.stem, bot_path=str(bot_path), error=f"The checks did not finish within {timeout:g} seconds"))
+                    elif broken:
+                        # any of the bots on the pool may have broken it
+                        retry_or_fail(bot_path, content, retries)
+                    else:
+                        queue.appendleft((bot_path, content, retries))
+                running.clear()
+    except BaseException:
+        _kill_pool(executor)
+        raise
+    executor.shutdown()
+    return sorted(results, key=lambda result: result.student)
+
+
+def write_summary(results: list[BatchResult], path: Path) -> None:
+    """Write the results as JSON, or as CSV with one row per student if the path ends in .csv"""
+    if path.suffix == ".csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["student", "bot_path", "error"] + [f"{check}_{column}" for check in CHECKS for column in ("passed", "seconds")])
+            for result in results:
+                row: list[object] = [result.student, result.bot_path, result.error or ""]
+                for check in CHECKS:
+                    check_result = result.checks.get(check)
+                    row += [check_result.passed, f"{check_result.seconds:.6f}"] if check_result else ["", ""]
+                writer.writerow(row)
+    else:
+        path.write_text(json.dumps([asdict(result) for result in results], indent=2))
@@ -0,0 +1,114 @@
+import itertools
+import platform
+import time
+from dataclasses import asdict, dataclass
+from random import Random
+from typing import Any, Callable, Iterable, Optional
+
+from google.protobuf.internal import api_implementation
+from schnapsen.game import BotState, Move, PlayerPerspective, SimpleMoveRequester
+
+from schnapsen_assignment.serialization import GameLog, to_schnapsen_moves
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import (ACTION_CHECKS, CONDITION_CHECKS, check_action_game, check_condition_game,
+                                                  check_integration_game)
+from schnapsen_assignment.student.generate import engine_with, generate_game_log
+
+BENCH_FORMAT_VERSION = 1
+
+
+@dataclass
+class Measurement:
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def best_of(repeat: int, run: Callable[[], Any]) -> float:
+    """The lowest wall time of repeat runs, in seconds. The lowest is the one least disturbed by the rest of the system."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class PerspectiveRecordingRequester(SimpleMoveRequester):
+    def __init__(self) -> None:
+        self.perspectives: list[tuple[PlayerPerspective, Optional[Move]]] = []
+
+    def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+        self.perspectives.append((perspective, leader_move))
+        return super().get_move(bot, perspective, leader_move)
+
+
+def record_perspectives(game_ids: Iterable[int]) -> list[tuple[PlayerPerspective, Optional[Move]]]:
+    """All decision points of the games the condition and action checks replay.
+    The perspectives stay valid after the game, the engine never modifies a game state it handed out."""
+    from schnapsen.bots.rand import RandBot
+    requester = PerspectiveRecordingRequester()
+    for game_id in game_ids:
+        randbot = RandBot(Random(12345678910 + game_id))
+        engine_with(requester).play_game(randbot, randbot, Random(game_id))
+    return requester.perspectives
+
+
+def run_benchmarks(student_bot: AssignmentBot, games: int = 20, repeat: int = 3) -> dict[str, Measurement]:
+    """Measure the checker and the bot on a synthetic game log of the given number of games, generated from the bot itself."""
+    game_log = generate_game_log(range(games), reference=student_bot)
+    results: dict[str, Measurement] = {}
+
+    serialized = game_log.SerializeToString()
+    results["gamelog_parse"] = Measurement(best_of(repeat, lambda: GameLog.FromString(serialized)) * 1000, "ms", False)
+    action_logs = [log for check in ACTION_CHECKS + ("integration",) for log in getattr(game_log, check)]
+    results["move_conversion"] = Measurement(best_of(repeat, lambda: [to_schnapsen_moves(log.outcomes) for log in action_logs]) * 1000, "ms", False)
+
+    for check in CONDITION_CHECKS:
+        seconds = best_of(repeat, lambda: [check_condition_game(getattr(student_bot, check), log) for log in getattr(game_log, check)])
+        results[f"replay_{check}"] = Measurement(games / seconds, "games/s", True)
+    for check in ACTION_CHECKS[1:]:
+        seconds = best_of(repeat, lambda: [check_action_game(getattr(student_bot, check), log, itertools.repeat(True)) for log in getattr(game_log, check)])
+        results[f"replay_{check}"] = Measurement(games / seconds, "games/s", True)
+    seconds = best_of(repeat, lambda: [check_action_game(student_bot.action1, log, iter(list(condition_log.outcomes)))
+                                       for log, condition_log in zip(game_log.action1, game_log.condition1)])
+    results["replay_action1"] = Measurement(games / seconds, "games/s", True)
+    seconds = best_of(repeat, lambda: [check_integration_game(student_bot, log) for log in game_log.integration])
+    results["replay_integration"] = Measurement(games / seconds, "games/s", True)
+
+    perspectives = record_perspectives(range(games))
+    for check in CONDITION_CHECKS + ACTION_CHECKS:
+        method = getattr(student_bot, check)
+        seconds = best_of(repeat, lambda: [method(perspective, leader_move) for perspective, leader_move in perspectives])
+        results[f"call_{check}"] = Measurement(seconds / len(perspectives) * 1e6, "us/call", False)
+    return results
+
+
+def environment() -> dict[str, str]:
+    return {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "protobuf": api_implementation.Type(),
+            "machine": platform.machine()}
+
+
+def to_json(results: dict[str, Measurement], games: int, repeat: int) -> dict[str, Any]:
+    return {"version": BENCH_FORMAT_VERSION,
+            "games": games,
+            "repeat": repeat,
+            "environment": environment(),
+            "results": {name: asdict(measurement) for name, measurement in results.items()}}
+
+
+def compare(results: dict[str, Measurement], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """The benchmarks which got worse than the baseline by more than the tolerance, a fraction of the baseline value."""
+    regressions: list[str] = []
+    for name, measurement in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or base["unit"] != measurement.unit or not base["value"]:
+            continue
+        change = (measurement.value - base["value"]) / base["value"]
+        if not measurement.higher_is_better:
+            change = -change
+        if change < -tolerance:
+            regressions.append(f"{name}: {measurement.value:.2f} {measurement.unit}, baseline {base['value']:.2f} {measurement.unit} ({abs(change):.0%} worse)")
+    return regressions
@@ -1,13 +1,142 @@
-
+from collections import Counter
+from typing import Any, Iterable, Optional
 from schnapsen.game import Bot, Move, PlayerPerspective
 # other needed imports here. Most likely you need:
-from schnapsen.game import Marriage
+from schnapsen.game import Marriage, RegularMove
 from schnapsen.deck import Card, Suit, Rank
 
 
+# The suit order of this bot, from lower suit to higher suit
+SUIT_ORDER = {Suit.SPADES: 1, Suit.HEARTS: 2, Suit.CLUBS: 3, Suit.DIAMONDS: 4}
+POINTS = {Rank.ACE: 11, Rank.TEN: 10, Rank.KING: 4, Rank.QUEEN: 3, Rank.JACK: 2}
+
+# Each of the 20 Schnapsen cards gets one bit. The bits of a suit are adjacent, such that a suit can be selected with a mask.
+CARD_BIT: dict[Card, int] = {Card.get_card(rank, suit): 1 << (5 * (suit_order - 1) + rank_index)
+                             for suit, suit_order in SUIT_ORDER.items()
+                             for rank_index, rank in enumerate(sorted(POINTS, key=POINTS.__getitem__))}
+SUIT_MASK: dict[Suit, int] = {suit: 0b11111 << (5 * (suit_order - 1)) for suit, suit_order in SUIT_ORDER.items()}
+ROYAL_MARRIAGE_MASK: dict[Suit, int] = {suit: CARD_BIT[Card.get_card(Rank.KING, suit)] | CARD_BIT[Card.get_card(Rank.QUEEN, suit)] for suit in Suit}
+
+# Total orders of all cards, precomputed such that comparing two cards is a single lookup
+POINTS_THEN_SUIT_ORDER: dict[Card, int] = {card: position for position, card in enumerate(sorted(CARD_BIT, key=lambda card: (POINTS[card.rank], SUIT_ORDER[card.suit])))}
+SUIT_THEN_POINTS_ORDER: dict[Card, int] = {card: position for position, card in enumerate(sorted(CARD_BIT, key=lambda card: (SUIT_ORDER[card.suit], POINTS[card.rank])))}
+
+
+def by_points_then_suit(move: RegularMove) -> int:
+    return POINTS_THEN_SUIT_ORDER[move.card]
+
+
+def by_suit_then_points(move: RegularMove) -> int:
+    return SUIT_THEN_POINTS_ORDER[move.card]
+
+
+def regular_moves_of(moves: Iterable[Move]) -> list[RegularMove]:
+    return [move.as_regular_move() for move in moves if move.is_regular_move()]
+
+
+def card_mask(cards: Iterable[Card]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= CARD_BIT[card]
+    return mask
+
+
+class DecisionCache:
+    """Everything the bot derives from the perspective for one decision. Each value is computed at most once, when first needed.
+
+    The queries counter records how often each method of the perspective was called, which allows to confirm that the engine is queried at most once per decision.
+    """
+
+    def __init__(self, perspective: PlayerPerspective) -> None:
+        self.perspective = perspective
+        self.queries: Counter[str] = Counter()
+        self._valid_moves: Optional[list[Move]] = None
+        self._regular_moves: Optional[list[RegularMove]] = None
+        self._trump_suit: Optional[Suit] = None
+        self._talon_size: Optional[int] = None
+        self._hand: Optional[int] = None
+        self._won: Optional[int] = None
+        self._opponent_known: Optional[int] = None
+
+    def _query(self, name: str) -> Any:
+        self.queries[name] += 1
+        return getattr(self.perspective, name)()
+
+    @property
+    def valid_moves(self) -> list[Move]:
+        """The valid moves. The list is shared, and must not be modified."""
+        if self._valid_moves is None:
+            self._valid_moves = self._query("valid_moves")
+        return self._valid_moves
+
+    @property
+    def regular_moves(self) -> list[RegularMove]:
+        """The valid regular moves. The list is shared, and must not be modified."""
+        if self._regular_moves is None:
+            self._regular_moves = regular_moves_of(self.valid_moves)
+        return self._regular_moves
+
+    @property
+    def trump_suit(self) -> Suit:
+        if self._trump_suit is None:
+            self._trump_suit = self._query("get_trump_suit")
+        return self._trump_suit
+
+    @property
+    def talon_size(self) -> int:
+        if self._talon_size is None:
+            self._talon_size = self._query("get_talon_size")
+        return self._talon_size
+
+    @property
+    def hand(self) -> int:
+        """The mask of the cards in the hand"""
+        if self._hand is None:
+            self._hand = card_mask(self._query("get_hand").get_cards())
+        return self._hand
+
+    @property
+    def won(self) -> int:
+        """The mask of the cards won by either player"""
+        if self._won is None:
+            self._won = card_mask(self._query("get_won_cards").get_cards()) | card_mask(self._query("get_opponent_won_cards").get_cards())
+        return self._won
+
+    @property
+    def opponent_known(self) -> int:
+        """The mask of the cards known to be in the hand of the opponent"""
+        if self._opponent_known is None:
+            self._opponent_known = card_mask(self._query("get_known_cards_of_opponent_hand").get_cards())
+        return self._opponent_known
+
+    def opponent_suit_count(self, suit: Suit) -> int:
+        """The number of cards of the suit known to be in the hand of the opponent"""
+        return (self.opponent_known & SUIT_MASK[suit]).bit_count()
+
+    @property
+    def royal_marriage_available(self) -> bool:
+        royal_marriage = ROYAL_MARRIAGE_MASK[self.trump_suit]
+        return self.hand & royal_marriage == royal_marriage
+
+
 class AssignmentBot(Bot):
     """Your suit order is [SPADES, HEARTS, CLUBS, DIAMONDS], from lower suit to higher suit."""
 
+    def __init__(self, name: Optional[str] = None) -> None:
+        super().__init__(name)
+        self.last_decision_cache: Optional[DecisionCache] = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the cache refers to a perspective, which refers to the whole game and must not be pickled with the bot
+        state = self.__dict__.copy()
+        state["last_decision_cache"] = None
+        return state
+
+    def decision_cache(self, perspective: PlayerPerspective) -> DecisionCache:
+        """The cache for the decision on this perspective. The condition and action methods of one decision share it, as they are called with the same perspective."""
+        if self.last_decision_cache is None or self.last_decision_cache.perspective is not perspective:
+            self.last_decision_cache = DecisionCache(perspective)
+        return self.last_decision_cache
 
     def get_move(self, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
         """Get the move for the Bot.
@@ -26,196 +155,73 @@ class AssignmentBot(Bot):
 
     def condition1(self, perspective: PlayerPerspective, leader_move: Move | None) -> bool:
         """1. if the bot can play a royal marriage [1 point]"""
-        
         if leader_move is not None:
             return False
-
-        trump_suit = perspective.get_trump_suit()
-        hand = perspective.get_hand().get_cards()
-        
-        king_check = False
-        queen_check = False
-        
-        for card in hand:
-            if card.suit == trump_suit:
-                if card.rank == Rank.KING:
-                    king_check = True
-                if card.rank == Rank.QUEEN:
-                    queen_check = True
-            
-        return king_check and queen_check
+        cache = self.decision_cache(perspective)
+        return cache.royal_marriage_available
 
     def condition2(self, perspective: PlayerPerspective, leader_move: Move | None) -> bool:
         """2. otherwise, if the 🂡 (ACE_SPADES) has not been won yet by either bot [1 point]"""
-        
-        for card in perspective.get_won_cards().get_cards():
-            if card.suit == Suit.SPADES and card.rank == Rank.ACE:
-                return False
-        
-        for card in perspective.get_opponent_won_cards().get_cards():
-            if card.suit == Suit.SPADES and card.rank == Rank.ACE:
-                return False
-            
-        return True
+        cache = self.decision_cache(perspective)
+        return not cache.won & CARD_BIT[Card.ACE_SPADES]
 
     def condition3(self, perspective: PlayerPerspective, leader_move: Move | None) -> bool:
         """                  a. if it is the second phase of the game and the opponent has more CLUBS than
                         DIAMONDS or equal the number in their hand [1.5 points]"""
-        if perspective.get_talon_size() == 0:
-            opponent_hand = perspective.get_known_cards_of_opponent_hand().get_cards()
-            clubs_count = 0
-            diamonds_count = 0
-                    
-            for card in opponent_hand:
-                if card.suit == Suit.CLUBS:
-                    clubs_count += 1
-                elif card.suit == Suit.DIAMONDS:
-                    diamonds_count += 1
-                    
-            return clubs_count >= diamonds_count
+        cache = self.decision_cache(perspective)
+        if cache.talon_size == 0:
+            return cache.opponent_suit_count(Suit.CLUBS) >= cache.opponent_suit_count(Suit.DIAMONDS)
 
         return False
-                    
+
     def action1(self, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
         """   then play the royal marriage  [1.5 point]"""
-        marriage_king = None
-        marriage_queen = None
-        
-        for card in perspective.get_hand().get_cards():
-            if card.rank == Rank.KING and card.suit == perspective.get_trump_suit():
-                marriage_king = card
-                
-            elif card.rank == Rank.QUEEN and card.suit == perspective.get_trump_suit():
-                marriage_queen = card
-                
-        if marriage_king and marriage_queen:
-            return Marriage(marriage_queen, marriage_king)
-        
-        return perspective.valid_moves()[0]
+        cache = self.decision_cache(perspective)
+        if cache.royal_marriage_available:
+            return Marriage(Card.get_card(Rank.QUEEN, cache.trump_suit), Card.get_card(Rank.KING, cache.trump_suit))
+
+        return cache.valid_moves[0]
 
     def action2(self, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
         """                     then play the valid regular move where the card has the lowest suit according
                           to the suit order above. If multiple cards have the lowest suit,
                           prioritize according to lowest points. [1.5 points]"""
         
-        suits_map = {Suit.SPADES: 1, Suit.HEARTS: 2, Suit.CLUBS: 3, Suit.DIAMONDS: 4}
-        rank_map = {Rank.ACE: 11, Rank.TEN: 10, Rank.KING: 4, Rank.QUEEN: 3, Rank.JACK: 2}
-        
-        valid_moves = perspective.valid_moves()
-        regular_moves = []
-        
-        for move in valid_moves:
-            if move.is_regular_move():
-                regular_moves.append(move)
-        
+        cache = self.decision_cache(perspective)
+        regular_moves = cache.regular_moves
         if not regular_moves:
-            return perspective.valid_moves()[0]
-        
-        return_move = regular_moves[0]
-        
-        for move in regular_moves:
-            current_priority = suits_map[move.card.suit]
-            best_priority = suits_map[return_move.card.suit]
-            
-            if current_priority < best_priority:
-                return_move = move
-            
-            elif current_priority == best_priority:
-                current_points = rank_map[move.card.rank]
-                best_points = rank_map[return_move.card.rank]
-                
-                if current_points < best_points:
-                    return_move = move
-        
-        return return_move
-                    
+            return cache.valid_moves[0]
+
+        return min(regular_moves, key=by_suit_then_points)
+
     def action3(self, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
         """                  b. otherwise among the cards in valid regular moves, take the cards with the most
                                frequently occurring rank. If there are multiple ranks with equal
                                most frequency, take the one with the highest points. Among those.
                                take the card with the highest suit, according to the order above. [2.0 points]"""
                                
-        valid_moves = perspective.valid_moves()
-        regular_moves = []
-        
-        suits_map = {Suit.SPADES: 1, Suit.HEARTS: 2, Suit.CLUBS: 3, Suit.DIAMONDS: 4}
-        rank_map = {Rank.ACE: 11, Rank.TEN: 10, Rank.KING: 4, Rank.QUEEN: 3, Rank.JACK: 2}
-        
-        for move in valid_moves:
-            if move.is_regular_move():
-                regular_moves.append(move)
-                
+        cache = self.decision_cache(perspective)
+        regular_moves = cache.regular_moves
         if not regular_moves:
-            return perspective.valid_moves()[0]
-        
-        rank_frequency = {}
-        
-        for move in regular_moves:
-            if move.card.rank not in rank_frequency:
-                rank_frequency[move.card.rank] = 1
-                
-            elif move.card.rank in rank_frequency:
-                rank_frequency[move.card.rank] += 1
-                
-        return_move = regular_moves[0]
-        
+            return cache.valid_moves[0]
+
+        rank_frequency = dict.fromkeys(POINTS, 0)
         for move in regular_moves:
-            current_rank = move.card.rank
-            best_rank = return_move.card.rank
-            
-            if rank_frequency[current_rank] > rank_frequency[best_rank]:
-                return_move = move
-            
-            elif rank_frequency[current_rank] == rank_frequency[best_rank]:
-                if rank_map[current_rank] > rank_map[best_rank]:
-                    return_move = move
-                
-                elif rank_map[current_rank] == rank_map[best_rank]:
-                    if suits_map[move.card.suit] > suits_map[return_move.card.suit]:
-                        return_move = move
-        
-        return return_move
-        
+            rank_frequency[move.card.rank] += 1
+
+        # the order by points, then suit, is the tie breaker among the most frequent ranks
+        return max(regular_moves, key=lambda move: (rank_frequency[move.card.rank], POINTS_THEN_SUIT_ORDER[move.card]))
+
     def action4(self, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
         """3. otherwise take the cards in valid regular moves and order them by points (low to high); in this
              ordering, if two cards have the same points, sort these according to the suit order.
              Now, play the card in the middle of the sequence. If the number of cards is even, play
              the card right below the middle. [1.5 points]"""
              
-        valid_moves = perspective.valid_moves()
-        regular_moves = []
-        
-        suits_map = {Suit.SPADES: 1, Suit.HEARTS: 2, Suit.CLUBS: 3, Suit.DIAMONDS: 4}
-        rank_map = {Rank.ACE: 11, Rank.TEN: 10, Rank.KING: 4, Rank.QUEEN: 3, Rank.JACK: 2}
-        
-        for move in valid_moves:
-            if move.is_regular_move():
-                regular_moves.append(move)
-        
+        cache = self.decision_cache(perspective)
+        regular_moves = cache.regular_moves
         if not regular_moves:
-            return perspective.valid_moves()[0]
-                            
-        for i in range(len(regular_moves)):
-            for j in range(0, len(regular_moves) - i - 1):
-                current_move = regular_moves[j]
-                next_move = regular_moves[j + 1]
-                
-                current_points = rank_map[current_move.card.rank]
-                next_points = rank_map[next_move.card.rank]
-                
-                swap = False
-                
-                if current_points > next_points:
-                    swap = True
-                    
-                elif current_points == next_points:
-                    if suits_map[current_move.card.suit] > suits_map[next_move.card.suit]:
-                        swap = True
-                
-                if swap:
-                    temp_move = regular_moves[j]
-                    regular_moves[j] = regular_moves[j + 1]
-                    regular_moves[j + 1] = temp_move
-            
+            return cache.valid_moves[0]
+
         middle_index = (len(regular_moves) - 1) // 2
-        return regular_moves[middle_index]
\ No newline at end of file
+        return sorted(regular_moves, key=by_points_then_suit)[middle_index]
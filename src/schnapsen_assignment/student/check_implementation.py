@@ -1,19 +1,16 @@
-import itertools
-from random import Random
-import traceback
-from typing import Callable, Iterable, Iterator, Optional, Generic, TypeVar, cast
+"""The `schnapsen` command line.
+
+Only click is imported at startup. Every command imports what it needs when it runs, such that `--help`, and the commands which do not replay games,
+do not pay for the game engine, the protobuf messages, or requests. The checker itself is in schnapsen_assignment.student.checker.
+"""
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Any, Optional
 import click
 
-import requests
-
-from schnapsen.bots import RandBot
-from schnapsen_assignment.student.bot import AssignmentBot
-from schnapsen.game import (BotState, GamePlayEngine, Move,
-                            PlayerPerspective, SchnapsenDeckGenerator, SchnapsenHandGenerator,
-                            SchnapsenTrickImplementer, SimpleMoveRequester,
-                            SchnapsenMoveValidator, SchnapsenTrickScorer)
-
-from schnapsen_assignment.serialization import GameLog, ConditionGameLog, ActionGameLog, to_schnapsen_move
+from schnapsen_assignment.student.gamelog_cache import DEFAULT_CACHE_DIR, GAMELOG_URL
 
 
 @click.group(context_settings={'show_default': True})
@@ -21,25 +18,93 @@ def main() -> None:
     """The main entry point."""
 
 
+def parse_ids(spec: str) -> list[int]:
+    """Parse a comma separated list of IDs and inclusive ranges, e.g., `0-99,120,200-299`."""
+    ids: list[int] = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        ids.extend(range(int(first), int(last or first) + 1))
+    return ids
+
+
 @main.command(name="check", help="Check the schnapsen_assignment.student.bot.AssignmentBot for compliance with the assignment")
 @click.option('--id', type=int, required=True, help="Your student ID")
-def test_bot(id: int) -> None:
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), default=DEFAULT_CACHE_DIR, help="Directory in which downloaded gamelogs are cached")
+@click.option('--offline', is_flag=True, help="Do not contact the server, only use the cached gamelog")
+@click.option('--compact', is_flag=True, help="Store downloaded gamelogs in the compact format, compressed with zstd if zstandard is installed")
+@click.option('--url', default=GAMELOG_URL, help="URL of the gamelogs, {id} is replaced by the student ID")
+@click.option('--jobs', type=click.IntRange(min=1), default=1, help="Number of processes used to replay the games")
+@click.option('--snapshots', is_flag=True, help="Check the conditions and actions against perspective snapshots stored in the cache directory, instead of replaying the games")
+@click.option('--gamelog', type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Check against this gamelog file, standard or streaming, instead of the one for the student ID")
+@click.option('--fail-fast', is_flag=True, help="Stop replaying a game as soon as its checks failed, and only report the first error of each check")
+@click.option('--sample', type=click.IntRange(min=1), help="Only check a random, stratified, sample of this many games per check, for quick feedback")
+@click.option('--seed', type=int, help="Seed for --sample, by default a random one")
+@click.option('--incremental', is_flag=True, help="Only run the checks whose methods changed since the last run against the same gamelog, reuse the stored results of the others")
+@click.option('--from-trick', type=click.IntRange(min=1), help="Resume every game from a checkpoint of its state at or before this trick, stored in the cache directory, and only check the decisions after it. Trump exchanges count as tricks")
+@click.option('--checkpoint-every', type=click.IntRange(min=1), default=1, help="With --from-trick, record a checkpoint before every this many tricks")
+@click.option('--profile', is_flag=True, help="Report the time spent per check, in the student code and in the replay of the games")
+@click.option('--profile-output', type=click.Path(dir_okay=False, path_type=Path), help="With --profile, also write a Chrome trace of the replayed games if the name ends in .json, cProfile statistics otherwise")
+def test_bot(id: int, cache_dir: Path, offline: bool, compact: bool, url: str, jobs: int, snapshots: bool, gamelog: Optional[Path],
+             fail_fast: bool, sample: Optional[int], seed: Optional[int], incremental: bool, from_trick: Optional[int], checkpoint_every: int,
+             profile: bool, profile_output: Optional[Path]) -> None:
+    if profile and (jobs > 1 or snapshots):
+        raise click.UsageError("--profile can only be used without --jobs and --snapshots")
+    if incremental and snapshots:
+        raise click.UsageError("--incremental cannot be combined with --snapshots")
+    if from_trick is not None and (jobs > 1 or snapshots or incremental):
+        raise click.UsageError("--from-trick can only be used without --jobs, --snapshots and --incremental")
+    import cProfile
+    from contextlib import nullcontext
+    from random import Random
+    from schnapsen_assignment.serialization import GameLogStreamReader, is_stream_file, read_game_log
+    from schnapsen_assignment.student.bot import AssignmentBot
+    from schnapsen_assignment.student.checkpoints import CheckpointStore
+    from schnapsen_assignment.student.checker import (ACTION_CHECKS, CONDITION_CHECKS, INTEGRATION_CHECK, assess_correctness,
+                                                      assess_correctness_from_snapshots, assess_correctness_streaming, sample_game_log)
+    from schnapsen_assignment.student.gamelog_cache import GamelogCache
+    from schnapsen_assignment.student.profiling import CheckProfile
+    from schnapsen_assignment.student.snapshots import SnapshotStore
     student_bot = AssignmentBot()
-    # game_cache = Path(f".schnapsen_rollout_cache_{id}.json")
-    # if game_cache.exists():
-    #     game_log = GameLog.FromString(game_cache.read_bytes())
-    # else:
-    r = requests.get(f'https://wolkje-105.labs.vu.nl/prins/assignment/v1/{id}/bot.gamelog')
-    if r.status_code != 200:
-        raise Exception("Server could not be contacted")
-    game_log = GameLog.FromString(r.content)
-    # TODO save content to a caching file
-    condition_errors, action_errors, integration_errors = assess_correctness(student_bot, game_log)
+    check_profile = CheckProfile(CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)) if profile else None
+    profiler = cProfile.Profile() if profile_output is not None and profile_output.suffix != ".json" else None
+    if gamelog is not None and jobs == 1 and not snapshots and not profile and sample is None and not incremental and from_trick is None and is_stream_file(gamelog):
+        # check the games while they are being read
+        with open(gamelog, "rb") as f:
+            condition_errors, action_errors, integration_errors = assess_correctness_streaming(student_bot, GameLogStreamReader(f), fail_fast)
+        cache_report: object = f"streamed from {gamelog}"
+    else:
+        if gamelog is not None:
+            with open(gamelog, "rb") as f:
+                game_log = read_game_log(f)
+            cache_report = f"read from {gamelog}"
+        else:
+            game_log, cache_report = GamelogCache(cache_dir, url, compact=compact).fetch(id, offline=offline)
+        if sample is not None:
+            seed = seed if seed is not None else Random().randrange(2 ** 32)
+            game_log = sample_game_log(game_log, sample, Random(seed))
+            cache_report = f"{cache_report}, sampled {sample} games per check with --seed {seed}"
+        if snapshots:
+            condition_errors, action_errors, integration_errors = assess_correctness_from_snapshots(student_bot, game_log, SnapshotStore(cache_dir), fail_fast)
+        elif incremental:
+            from schnapsen_assignment.student.incremental import ResultStore, assess_correctness_incremental
+            with profiler or nullcontext():
+                (condition_errors, action_errors, integration_errors), reused = assess_correctness_incremental(
+                    student_bot, game_log, ResultStore(cache_dir), jobs=jobs, profile=check_profile, fail_fast=fail_fast)
+            cache_report = f"{cache_report}, reused the unchanged results of {', '.join(reused) or 'no checks'}"
+        else:
+            checkpoints = CheckpointStore(cache_dir, checkpoint_every) if from_trick is not None else None
+            with profiler or nullcontext():
+                condition_errors, action_errors, integration_errors = assess_correctness(student_bot, game_log, jobs=jobs, profile=check_profile, fail_fast=fail_fast,
+                                                                                         checkpoints=checkpoints, from_trick=from_trick or 0)
+            if from_trick is not None:
+                cache_report = f"{cache_report}, resumed every game from its checkpoint at or before trick {from_trick}"
     no_errors = 'No errors found, implementation appears correct.'
     print(f"""
 Status report for {student_bot}
 =================={"=" * len(str(student_bot))}
 
+Gamelog: {cache_report}
+
 Condition 1
 -----------
     {no_errors if not condition_errors[0] else condition_errors[0][0]}
@@ -72,178 +137,227 @@ Integration test
 ----------------
     {no_errors if not integration_errors[0] else integration_errors[0][0]}
 """)
-
-
-def assess_correctness(student_bot: AssignmentBot, game_log: GameLog) -> tuple[list[list[str]], list[list[str]], list[list[str]]]:
-    condition_errors: list[list[str]] = []
-    condition_errors.append(assess_conditions_correctness(student_bot.condition1, game_log.condition1))
-    condition_errors.append(assess_conditions_correctness(student_bot.condition2, game_log.condition2))
-    condition_errors.append(assess_conditions_correctness(student_bot.condition3, game_log.condition3))
-
-    action_errors: list[list[str]] = []
-    conditions: Iterator[Iterator[bool]] = iter([iter([c for c in cond_log.outcomes]) for cond_log in game_log.condition1])
-    action_errors.append(assess_actions_correctness(student_bot.action1, game_log.action1, conditions=conditions))
-    action_errors.append(assess_actions_correctness(student_bot.action2, game_log.action2, conditions=None))
-    action_errors.append(assess_actions_correctness(student_bot.action3, game_log.action3, conditions=None))
-    action_errors.append(assess_actions_correctness(student_bot.action4, game_log.action4, conditions=None))
-
-    integration_errors: list[list[str]] = []
-    integration_errors.append(assess_integration_correctness(student_bot, game_log.integration))
-
-    return condition_errors, action_errors, integration_errors
-
-
-T = TypeVar('T', bound=bool | Move)
-
-
-def simple_perspective_string(perspective: PlayerPerspective, leader_move: Optional[Move]) -> str:
-    valid_moves: list[Move] = perspective.valid_moves()
-    trump_suit = perspective.get_trump_suit()
-    hand = perspective.get_hand().get_cards()
-    won_cards = perspective.get_won_cards().get_cards()
-    opponent_won_cards = perspective.get_opponent_won_cards().get_cards()
-    known_cards_of_opponent_hand = perspective.get_known_cards_of_opponent_hand().get_cards()
-
-    return f"Perspective[\nhand={hand}, \nphase={perspective.get_phase()}, leader_move={leader_move}, trump_suit={trump_suit}, \nvalid_moves = {valid_moves}, \nwon_cards={won_cards}, \nwon_cards_opponent={opponent_won_cards}, \nknown_opponent_cards={known_cards_of_opponent_hand}]"
-
-
-class CheckingGamePlayEngine(Generic[T], GamePlayEngine):
-
-    class CheckingRequester(SimpleMoveRequester):
-        def __init__(self, implementation: Callable[[PlayerPerspective, Optional[Move]], T],
-                     expected_outcomes: Iterable[T],
-                     conditions: Iterator[bool]
-                     ) -> None:
-            self.expected_outcomes_iterator: Iterator[T] = iter(expected_outcomes)
-            self.conditions = conditions
-            self.implementation = implementation
-            self.errors: list[str] = []
-
-        def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
-            # check whether the condition working correctly
-            if next(self.conditions):
-                try:
-                    outcome = self.implementation(perspective, leader_move)
-                    expected_outcome = next(self.expected_outcomes_iterator)
-                    if outcome != expected_outcome:
-                        self.errors.append(f"Something seems wrong in your code. Expected {expected_outcome} , but got {outcome} for {self.implementation.__name__}. \n--- For input {simple_perspective_string(perspective, leader_move)}.")
-                except Exception as e:
-                    if isinstance(e, NotImplementedError):
-                        msg = str(e)
-                    else:
-                        msg = traceback.format_exc(limit=-1)
-                    self.errors.append(f"An exception was raised from your bot's method {self.implementation.__name__} with message: {msg}")
-
-            bot_move = super().get_move(bot, perspective, leader_move)
-            return bot_move
-
-    def __init__(self, implementation: Callable[[PlayerPerspective, Optional[Move]], T],
-                 expected_outcomes: Iterable[T],
-                 conditions: Iterator[bool]
-                 ):
-        super().__init__(deck_generator=SchnapsenDeckGenerator(),
-                         hand_generator=SchnapsenHandGenerator(),
-                         trick_implementer=SchnapsenTrickImplementer(),
-                         move_requester=CheckingGamePlayEngine.CheckingRequester(implementation, expected_outcomes, conditions),
-                         move_validator=SchnapsenMoveValidator(),
-                         trick_scorer=SchnapsenTrickScorer())
-
-    def errors(self) -> list[str]:
-        req = cast(CheckingGamePlayEngine.CheckingRequester, self.move_requester)
-        return req.errors
-
-
-def assess_conditions_correctness(condition_implementation: Callable[[PlayerPerspective, Optional[Move]], bool],
-                                  condition_game_logs: Iterable[ConditionGameLog]) -> list[str]:
-    for condition_game_log in condition_game_logs:
-        game_id = condition_game_log.game_id
-        outcomes: Iterable[bool] = condition_game_log.outcomes
-        engine = CheckingGamePlayEngine(condition_implementation, outcomes, itertools.repeat(True))
-
-        randbot = RandBot(Random(12345678910 + game_id))
-        engine.play_game(randbot, randbot, Random(game_id))
-        if engine.errors():
-            # We stop early to not report 100s of times the same error
-            return engine.errors()
-    return []
-
-
-def assess_actions_correctness(action_implementation: Callable[[PlayerPerspective, Optional[Move]], Move],
-                               action_game_logs: Iterable[ActionGameLog],
-                               conditions: Iterator[Iterator[bool]] | None) -> list[str]:
-
-    if conditions is None:
-        conditions = map(itertools.repeat, itertools.repeat(True))
-
-    for action_game_log, condition in zip(action_game_logs, conditions):
-        game_id = action_game_log.game_id
-        outcomes: Iterable[Move] = map(to_schnapsen_move, action_game_log.outcomes)
-        engine = CheckingGamePlayEngine(action_implementation, outcomes, condition)
-
-        randbot = RandBot(Random(12345678910 + game_id))
-        engine.play_game(randbot, randbot, Random(game_id))
-        if engine.errors():
-            # We stop early to not report 100s of times the same error
-            return engine.errors()
-    return []
-
-
-class IntegrationCheckingGamePlayEngine(GamePlayEngine):
-
-    class CheckingRequester(SimpleMoveRequester):
-        def __init__(self, bot: AssignmentBot,
-                     expected_outcomes: Iterable[Move],
-                     ) -> None:
-            self.expected_outcomes_iterator: Iterator[Move] = iter(expected_outcomes)
-            self.bot = bot
-            self.errors: list[str] = []
-
-        def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
-            # check whether the condition working correctly
-            expected_move: Move = next(self.expected_outcomes_iterator)
-            if bot.implementation == self.bot:
-                try:
-                    bot_move = super().get_move(bot, perspective, leader_move)
-                except Exception as e:
-                    if isinstance(e, NotImplementedError):
-                        msg = str(e)
-                    else:
-                        msg = traceback.format_exc(limit=-1)
-                    self.errors.append(f"An exception was raised by your bot with message: {msg}")
-                    bot_move = expected_move
-                if bot_move != expected_move:
-                    self.errors.append(f"Bot played a wrong move. \nFor input {perspective}, \n{expected_move} was expected, but got {bot_move}.")
-                    bot_move = expected_move
+    if check_profile is not None:
+        print(f"Profile\n-------\n{check_profile.report()}\n")
+        if profile_output is not None:
+            if profiler is not None:
+                profiler.dump_stats(profile_output)
             else:
-                bot_move = super().get_move(bot, perspective, leader_move)
-
-            return bot_move
-
-    def __init__(self, bot: AssignmentBot, expected_outcomes: Iterable[Move]):
-        super().__init__(deck_generator=SchnapsenDeckGenerator(),
-                         hand_generator=SchnapsenHandGenerator(),
-                         trick_implementer=SchnapsenTrickImplementer(),
-                         move_requester=IntegrationCheckingGamePlayEngine.CheckingRequester(bot, expected_outcomes),
-                         move_validator=SchnapsenMoveValidator(),
-                         trick_scorer=SchnapsenTrickScorer())
-
-    def errors(self) -> list[str]:
-        req = cast(IntegrationCheckingGamePlayEngine.CheckingRequester, self.move_requester)
-        return req.errors
-
-
-def assess_integration_correctness(student_bot: AssignmentBot, game_logs: Iterable[ActionGameLog]) -> list[str]:
-    for game_log in game_logs:
-        game_id = game_log.game_id
-        outcomes: Iterable[Move] = [to_schnapsen_move(move) for move in game_log.outcomes]
-        engine = IntegrationCheckingGamePlayEngine(student_bot, outcomes)
-
-        randbot = RandBot(Random(12345678910 + game_id))
-        engine.play_game(student_bot, randbot, Random(game_id))
-        if engine.errors():
-            # We stop early to not report 100s of times the same error
-            return engine.errors()
-    return []
+                check_profile.write_chrome_trace(profile_output)
+            print(f"Profile written to {profile_output}")
+
+
+@main.command(name="fetch", help="Download the gamelogs of many students into the cache, or check that the cached copies are current")
+@click.option('--ids', required=True, help="The student IDs, as comma separated IDs and inclusive ranges, e.g., 2700000-2700099,2712345")
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), default=DEFAULT_CACHE_DIR, help="Directory in which downloaded gamelogs are cached")
+@click.option('--url', default=GAMELOG_URL, help="URL of the gamelogs, {id} is replaced by the student ID")
+@click.option('--jobs', type=click.IntRange(min=1), default=10, help="Maximum number of concurrent downloads")
+@click.option('--compact', is_flag=True, help="Store downloaded gamelogs in the compact format, compressed with zstd if zstandard is installed")
+def fetch(ids: str, cache_dir: Path, url: str, jobs: int, compact: bool) -> None:
+    try:
+        student_ids = parse_ids(ids)
+    except ValueError:
+        raise click.BadParameter(f"Cannot parse the student IDs {ids!r}", param_hint="--ids")
+    from schnapsen_assignment.student.gamelog_cache import CacheReport, GamelogCache, make_session
+    start = time.perf_counter()
+    cache = GamelogCache(cache_dir, url, make_session(pool_size=jobs), compact=compact)
+    results = cache.prefetch(student_ids, jobs)
+    failures = {student_id: result for student_id, result in results.items() if not isinstance(result, CacheReport)}
+    downloaded = sum(isinstance(result, CacheReport) and not result.hit for result in results.values())
+    for student_id, failure in failures.items():
+        print(f"{student_id}: {failure}")
+    print(f"Fetched {len(results)} gamelogs in {time.perf_counter() - start:.1f} s: {downloaded} downloaded, "
+          f"{len(results) - downloaded - len(failures)} already current, {len(failures)} failed")
+    if failures:
+        sys.exit(1)
+
+
+@main.command(name="export", help="Export gamelogs, and optionally the outcomes of a bot for them, as a table with one row per checked decision")
+@click.argument('gamelogs', nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option('--output', type=click.Path(dir_okay=False, path_type=Path), required=True, help="Where to write the table, as .npz if the name ends in .npz, as Parquet otherwise")
+@click.option('--observe', is_flag=True, help="Also record the outcomes of the bot at every decision")
+@click.option('--bot', type=click.Path(exists=True, dir_okay=False, path_type=Path), help="With --observe, the module defining the AssignmentBot to observe. By default, the bot of this package")
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), default=DEFAULT_CACHE_DIR, help="Directory in which the shared perspective snapshots are cached")
+@click.option('--chunk-rows', type=click.IntRange(min=1), default=1_000_000, help="Number of rows kept in memory before they are written")
+def export_command(gamelogs: tuple[Path, ...], output: Path, observe: bool, bot: Optional[Path], cache_dir: Path, chunk_rows: int) -> None:
+    from schnapsen_assignment.student.batch import load_bot_class
+    from schnapsen_assignment.student.bot import AssignmentBot
+    from schnapsen_assignment.student.export import expand_paths, export
+    from schnapsen_assignment.student.snapshots import SnapshotStore
+    student_bot = (load_bot_class(bot)() if bot is not None else AssignmentBot()) if observe else None
+    start = time.perf_counter()
+    paths = expand_paths(gamelogs)
+    rows = export(paths, output, student_bot, SnapshotStore(cache_dir) if observe else None, chunk_rows)
+    print(f"Exported {rows} rows from {len(paths)} gamelogs in {time.perf_counter() - start:.1f} s to {output}")
+
+
+@main.command(name="check-batch", help="Check a directory of bot modules, each against the cached gamelog of the same student")
+@click.option('--bots', type=click.Path(exists=True, file_okay=False, path_type=Path), required=True, help="Directory with one module <student>.py per student, defining AssignmentBot")
+@click.option('--gamelogs', type=click.Path(exists=True, file_okay=False, path_type=Path), required=True, help="Directory with one <student>.gamelog per student")
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), default=DEFAULT_CACHE_DIR, help="Directory in which the shared perspective snapshots are cached")
+@click.option('--jobs', type=click.IntRange(min=1), default=1, help="Number of worker processes")
+@click.option('--output', type=click.Path(dir_okay=False, path_type=Path), default=Path("summary.json"), help="Where to write the summary, as CSV if the name ends in .csv, as JSON otherwise")
+@click.option('--timeout', type=click.FloatRange(min=0, min_open=True), default=600.0, show_default=True, help="Seconds the checks of one bot may take before it fails")
+def check_batch(bots: Path, gamelogs: Path, cache_dir: Path, jobs: int, output: Path, timeout: float) -> None:
+    from schnapsen_assignment.student.batch import run_batch, write_summary
+    start = time.perf_counter()
+    results = run_batch(bots, gamelogs, cache_dir, jobs, timeout)
+    write_summary(results, output)
+    passed = sum(result.passed() for result in results)
+    print(f"Checked {len(results)} bots in {time.perf_counter() - start:.1f} s, {passed} passed all checks. Summary written to {output}")
+
+
+@main.command(name="bench", help="Benchmark the checker and the bot on a locally generated gamelog")
+@click.option('--games', type=click.IntRange(min=1), default=20, help="Number of games in the generated gamelog")
+@click.option('--repeat', type=click.IntRange(min=1), default=3, help="Number of runs of every benchmark, the fastest one is reported")
+@click.option('--output', type=click.Path(dir_okay=False, path_type=Path), help="Write the results as JSON to this file")
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Compare against the JSON results of an earlier run")
+@click.option('--tolerance', type=click.FloatRange(min=0), default=0.1, help="Fraction by which a result may be worse than the baseline before it counts as a regression")
+def bench(games: int, repeat: int, output: Optional[Path], baseline: Optional[Path], tolerance: float) -> None:
+    import json
+    from schnapsen_assignment.student.bench import compare, run_benchmarks, to_json
+    from schnapsen_assignment.student.bot import AssignmentBot
+    results = run_benchmarks(AssignmentBot(), games, repeat)
+    for name, measurement in results.items():
+        print(f"{name:<24}{measurement.value:>12.2f} {measurement.unit}")
+    if output is not None:
+        output.write_text(json.dumps(to_json(results, games, repeat), indent=2))
+    if baseline is not None:
+        regressions = compare(results, json.loads(baseline.read_text()), tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions compared to {baseline}")
+
+
+@main.command(name="generate", help="Generate a gamelog locally, by recording the outcomes of a reference bot")
+@click.option('--games', required=True, help="The game IDs, as comma separated IDs and inclusive ranges, e.g., 0-99,120")
+@click.option('--output', type=click.Path(dir_okay=False, path_type=Path), required=True, help="Where to write the gamelog")
+@click.option('--bot', type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Module defining the reference AssignmentBot. By default, the bot of this package")
+@click.option('--jobs', type=click.IntRange(min=1), default=1, help="Number of processes generating games")
+@click.option('--format', 'output_format', type=click.Choice(["stream", "standard"]), default="stream", help="Write a streaming gamelog, or a single GameLog message")
+def generate(games: str, output: Path, bot: Optional[Path], jobs: int, output_format: str) -> None:
+    from schnapsen_assignment.student.generate import write_generated
+    try:
+        game_ids = parse_ids(games)
+    except ValueError:
+        raise click.BadParameter(f"Cannot parse the game IDs {games!r}", param_hint="--games")
+    start = time.perf_counter()
+    write_generated(output, game_ids, bot, jobs, stream=output_format == "stream")
+    print(f"Generated {len(game_ids)} games in {time.perf_counter() - start:.1f} s, written to {output}")
+
+
+@main.command(name="compact", help="Convert a gamelog, standard, streaming or compact, to the compact format")
+@click.argument('gamelog', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--output', type=click.Path(dir_okay=False, path_type=Path), required=True, help="Where to write the compact gamelog")
+@click.option('--zstd/--no-zstd', default=True, help="Compress the sections with zstd, which requires zstandard")
+def compact_command(gamelog: Path, output: Path, zstd: bool) -> None:
+    from schnapsen_assignment.serialization import read_game_log, write_compact
+    with open(gamelog, "rb") as f:
+        game_log = read_game_log(f)
+    with open(output, "wb") as f:
+        write_compact(game_log, f, compress=zstd)
+    print(f"Compacted {gamelog} from {gamelog.stat().st_size} to {output.stat().st_size} bytes")
+
+
+@main.command(name="serve", help="Run the checker as a local service, which keeps warm workers and the gamelogs in memory")
+@click.option('--host', default="127.0.0.1", help="Address to listen on")
+@click.option('--port', type=int, default=8765, help="Port to listen on")
+@click.option('--socket', 'unix_socket', type=click.Path(dir_okay=False, path_type=Path), help="Listen on this Unix socket instead of a TCP port")
+@click.option('--workers', type=click.IntRange(min=1), default=os.cpu_count() or 1, show_default="number of CPUs", help="Number of worker processes")
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), default=DEFAULT_CACHE_DIR, help="Directory in which downloaded gamelogs are cached")
+@click.option('--offline', is_flag=True, help="Do not contact the server, only use cached gamelogs")
+@click.option('--compact', is_flag=True, help="Store downloaded gamelogs in the compact format, compressed with zstd if zstandard is installed")
+@click.option('--url', default=GAMELOG_URL, help="URL of the gamelogs, {id} is replaced by the student ID")
+@click.option('--job-timeout', type=click.FloatRange(min=0, min_open=True), default=600.0, show_default=True,
+              help="Seconds a job may run before it fails, jobs can only ask for less")
+def serve(host: str, port: int, unix_socket: Optional[Path], workers: int, cache_dir: Path, offline: bool, compact: bool, url: str,
+          job_timeout: float) -> None:
+    import signal
+    from schnapsen_assignment.student.gamelog_cache import GamelogCache
+    from schnapsen_assignment.student.service import CheckService, ServiceHTTPServer, UnixServiceHTTPServer
+    service = CheckService(GamelogCache(cache_dir, url, compact=compact), workers, offline, job_timeout)
+    server = UnixServiceHTTPServer(unix_socket, service) if unix_socket is not None else ServiceHTTPServer((host, port), service)
+    # shut down cleanly when stopped by a service manager
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Checking on {unix_socket or f'http://{host}:{port}'} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if unix_socket is not None:
+            unix_socket.unlink(missing_ok=True)
+
+
+@main.command(name="submit", help="Check a bot with a running checker service, and print the result as JSON")
+@click.option('--bot', type=click.Path(exists=True, dir_okay=False, path_type=Path), required=True, help="Module defining the AssignmentBot to check")
+@click.option('--id', type=int, help="The student ID, whose gamelog the service fetches")
+@click.option('--gamelog', type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Check against this gamelog file instead of the one for the student ID")
+@click.option('--server', default="127.0.0.1:8765", help="host:port of the service")
+@click.option('--socket', 'unix_socket', type=click.Path(dir_okay=False, path_type=Path), help="Unix socket of the service, instead of --server")
+@click.option('--submitter', help="Name under which the job is queued, jobs are scheduled round robin between submitters. By default, the address of the client")
+@click.option('--fail-fast', is_flag=True, help="Only report the first error of each check")
+@click.option('--no-wait', is_flag=True, help="Only submit the job, do not wait for the result")
+@click.option('--timeout', type=click.FloatRange(min=0, min_open=True),
+              help="Give up waiting after this many seconds, the service also stops the job once it ran this long. By default, wait until the job is done")
+def submit(bot: Path, id: Optional[int], gamelog: Optional[Path], server: str, unix_socket: Optional[Path], submitter: Optional[str],
+           fail_fast: bool, no_wait: bool, timeout: Optional[float]) -> None:
+    import json
+    from schnapsen_assignment.student.service import request
+    if (id is None) == (gamelog is None):
+        raise click.UsageError("Give either --id or --gamelog")
+    body = {"bot": str(bot.resolve()), "student_id": id, "gamelog": str(gamelog.resolve()) if gamelog is not None else None,
+            "submitter": submitter, "fail_fast": fail_fast, "timeout": timeout}
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    status, job = request("POST", "/jobs", body, server, unix_socket)
+    # the job is polled until it is done, a poll returns after at most 60 s even if it is not
+    while status in (200, 202) and not no_wait and job["status"] in ("queued", "running"):
+        wait = 60.0 if deadline is None else min(60.0, deadline - time.monotonic())
+        if wait <= 0:
+            print(f"The job did not finish within {timeout:g} seconds", file=sys.stderr)
+            break
+        status, job = request("GET", f"/jobs/{job['id']}?wait={wait:.3f}", address=server, unix_socket=unix_socket)
+    print(json.dumps(job, indent=2))
+    if status not in (200, 202) or (not no_wait and not job["passed"]):
+        sys.exit(1)
+
+
+@main.command(name="startup", help="Measure how long importing the command line and the checker takes, with python -X importtime")
+@click.option('--budget-ms', type=click.FloatRange(min=0), help="Exit with an error if importing the command line takes longer than this")
+@click.option('--top', type=click.IntRange(min=0), default=10, help="Number of the slowest imports of the checker to list")
+def startup(budget_ms: Optional[float], top: int) -> None:
+    from schnapsen_assignment.student.startup import CHECKER_MODULE, CLI_MODULE, measure_import, protobuf_implementation, total_ms
+    cli_ms = total_ms(measure_import(CLI_MODULE))
+    checker_imports = measure_import(CHECKER_MODULE)
+    print(f"{'command line':<16}{cli_ms:>10.1f} ms  import {CLI_MODULE}, e.g., for --help")
+    print(f"{'checker':<16}{total_ms(checker_imports):>10.1f} ms  import {CHECKER_MODULE}, for the commands which replay games")
+    implementation = protobuf_implementation()
+    print(f"protobuf implementation: {implementation}")
+    if implementation == "python":
+        print("The pure Python protobuf implementation is slow at parsing gamelogs. "
+              "Unset PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION, or install a protobuf release with the upb backend (4.21 or later)")
+    if top:
+        print(f"\nSlowest imports of the checker\n{'self ms':>10}{'cumulative ms':>16}  module")
+        for import_time in sorted(checker_imports, key=lambda import_time: import_time.self_us, reverse=True)[:top]:
+            print(f"{import_time.self_us / 1000:>10.1f}{import_time.cumulative_us / 1000:>16.1f}  {import_time.name}")
+    if budget_ms is not None:
+        if cli_ms > budget_ms:
+            print(f"\nImporting the command line takes {cli_ms:.1f} ms, over the budget of {budget_ms:.1f} ms")
+            sys.exit(1)
+        print(f"\nImporting the command line takes {cli_ms:.1f} ms, within the budget of {budget_ms:.1f} ms")
+
+
+def __getattr__(name: str) -> Any:
+    # the checker used to be defined in this module, its names are still available from here
+    from schnapsen_assignment.student import checker
+    try:
+        return getattr(checker, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 
 if __name__ == "__main__":
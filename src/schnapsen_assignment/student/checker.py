@@ -0,0 +1,657 @@
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from contextlib import AbstractContextManager, nullcontext
+import itertools
+import multiprocessing
+from random import Random
+import traceback
+from typing import Any, Callable, Collection, Iterable, Iterator, Mapping, Optional, Generic, TypeVar, cast
+
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen.game import (BotState, GamePlayEngine, Move,
+                            PlayerPerspective, SchnapsenDeckGenerator, SchnapsenHandGenerator,
+                            SchnapsenTrickImplementer, SimpleMoveRequester,
+                            SchnapsenMoveValidator, SchnapsenTrickScorer)
+
+from schnapsen_assignment.serialization import AnyGameLog, GameLog, ConditionGameLog, ActionGameLog, GameLogStreamReader, to_schnapsen_moves
+from schnapsen_assignment.student.checkpoints import Checkpoint, CheckpointStore, nearest
+from schnapsen_assignment.student.profiling import CheckProfile
+from schnapsen_assignment.student.snapshots import PerspectiveSnapshot, SnapshotStore
+
+
+CONDITION_CHECKS = ("condition1", "condition2", "condition3")
+ACTION_CHECKS = ("action1", "action2", "action3", "action4")
+INTEGRATION_CHECK = "integration"
+
+
+class CheckError:
+    """An error found by a check. The message is formatted only when it is displayed, formatting the perspective is expensive."""
+
+    def __init__(self, message: str | Callable[[], str]) -> None:
+        self._message = message
+
+    def __str__(self) -> str:
+        if not isinstance(self._message, str):
+            self._message = self._message()
+        return self._message
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the message refers to the perspective, which refers to the whole game. Only the formatted message is sent to other processes
+        return {"_message": str(self)}
+
+
+class CheckAborted(Exception):
+    """Raised by the requesters in fail fast mode, to stop the replay of a game once the checks in it failed."""
+
+
+def assess_correctness(student_bot: AssignmentBot, game_log: AnyGameLog, jobs: int = 1,
+                       profile: Optional[CheckProfile] = None, fail_fast: bool = False,
+                       checks: Optional[Collection[str]] = None, checkpoints: Optional[CheckpointStore] = None,
+                       from_trick: int = 0) -> tuple[list[list[CheckError]], list[list[CheckError]], list[list[CheckError]]]:
+    """Check all conditions, actions and the integration of the student bot against the game log.
+
+    The conditions and actions are checked in a shared replay: every game is played only once, and all methods which have this game in their log are checked during it.
+    For every check, the errors of the first failing game in its log are reported.
+    If a profile is given, the time spent is recorded in it. Profiling is not supported with more than one job.
+    With fail_fast, the replay of a game stops as soon as all checks in it failed, and only the first error of each check is reported.
+    If checks is given, only those checks are run, the others are reported without errors.
+    With checkpoints, every game is resumed from its latest checkpoint at or before from_trick, and the decisions before it are not checked.
+    Checkpoints are not supported with more than one job.
+    """
+    if checks is None:
+        checks = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)
+    if jobs > 1:
+        return assess_correctness_parallel(student_bot, game_log, jobs, fail_fast, checks)
+
+    results: dict[str, dict[int, list[CheckError]]] = {check: {} for check in CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)}
+    for game_id, entries in shared_replay_plan(game_log).items():
+        # We stop early to not report 100s of times the same error
+        pending = [(check, index, log, condition) for check, index, log, condition in entries if check in checks and not _failed_before(results[check], index)]
+        if not pending:
+            continue
+        errors = check_shared_game(student_bot, game_id, [(check, log, iter(condition) if condition is not None else itertools.repeat(True))
+                                                          for check, _, log, condition in pending], profile, fail_fast,
+                                   nearest(checkpoints.get(game_id), from_trick) if checkpoints is not None else None)
+        for (check, index, _, _), check_errors in zip(pending, errors):
+            if check_errors:
+                results[check][index] = check_errors
+
+    if INTEGRATION_CHECK in checks:
+        results[INTEGRATION_CHECK][0] = assess_integration_correctness(student_bot, game_log.integration, profile, fail_fast,
+                                                                       checkpoints, from_trick)
+    return _collect_first_errors(results)
+
+
+def sample_game_log(game_log: AnyGameLog, k: int, rng: Random) -> GameLog:
+    """A random, stratified, sample of at most k games of every check.
+
+    The log of every check is split into k strata of consecutive games, and one game is drawn from each, such that the sample covers the whole log.
+    Logs of the same length are sampled at the same positions, which keeps the games shared between the checks together in the shared replay.
+    action1 is always sampled at the positions of condition1, to which its games are matched by position.
+    """
+    positions_by_length: dict[int, list[int]] = {}
+
+    def positions(length: int) -> list[int]:
+        if length not in positions_by_length:
+            if length <= k:
+                positions_by_length[length] = list(range(length))
+            else:
+                positions_by_length[length] = [rng.randrange(stratum * length // k, (stratum + 1) * length // k) for stratum in range(k)]
+        return positions_by_length[length]
+
+    sample = GameLog()
+    for check in CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,):
+        records = getattr(game_log, check)
+        check_positions = positions(len(game_log.condition1)) if check == "action1" else positions(len(records))
+        getattr(sample, check).extend(records[position] for position in check_positions if position < len(records))
+    return sample
+
+
+def _failed_before(check_results: dict[int, list[CheckError]], index: int) -> bool:
+    return any(failed_index < index for failed_index in check_results)
+
+
+def _collect_first_errors(results: dict[str, dict[int, list[CheckError]]]) -> tuple[list[list[CheckError]], list[list[CheckError]], list[list[CheckError]]]:
+    """For every check, select the errors of the failing game which comes first in its log."""
+    def first_errors(check: str) -> list[CheckError]:
+        failed = [index for index, errors in results[check].items() if errors]
+        return results[check][min(failed)] if failed else []
+
+    condition_errors = [first_errors(check) for check in CONDITION_CHECKS]
+    action_errors = [first_errors(check) for check in ACTION_CHECKS]
+    integration_errors = [first_errors(INTEGRATION_CHECK)]
+    return condition_errors, action_errors, integration_errors
+
+
+T = TypeVar('T', bound=bool | Move)
+
+
+def simple_perspective_string(perspective: PlayerPerspective, leader_move: Optional[Move]) -> str:
+    valid_moves: list[Move] = perspective.valid_moves()
+    trump_suit = perspective.get_trump_suit()
+    hand = perspective.get_hand().get_cards()
+    won_cards = perspective.get_won_cards().get_cards()
+    opponent_won_cards = perspective.get_opponent_won_cards().get_cards()
+    known_cards_of_opponent_hand = perspective.get_known_cards_of_opponent_hand().get_cards()
+
+    return f"Perspective[\nhand={hand}, \nphase={perspective.get_phase()}, leader_move={leader_move}, trump_suit={trump_suit}, \nvalid_moves = {valid_moves}, \nwon_cards={won_cards}, \nwon_cards_opponent={opponent_won_cards}, \nknown_opponent_cards={known_cards_of_opponent_hand}]"
+
+
+class CheckingGamePlayEngine(Generic[T], GamePlayEngine):
+
+    class CheckingRequester(SimpleMoveRequester):
+        def __init__(self, implementation: Callable[[PlayerPerspective, Optional[Move]], T],
+                     expected_outcomes: Iterable[T],
+                     conditions: Iterator[bool],
+                     profile: Optional[CheckProfile] = None,
+                     fail_fast: bool = False,
+                     name: Optional[str] = None
+                     ) -> None:
+            self.expected_outcomes_iterator: Iterator[T] = iter(expected_outcomes)
+            self.conditions = conditions
+            self.implementation = implementation
+            # the name of the check, the method may be wrapped by a decorator which does not keep its name
+            self.name = name if name is not None else getattr(implementation, "__name__", repr(implementation))
+            self.errors: list[CheckError] = []
+            self.profile = profile
+            self.fail_fast = fail_fast
+
+        @property
+        def done(self) -> bool:
+            """Whether the rest of the game does not have to be checked anymore"""
+            return self.fail_fast and bool(self.errors)
+
+        def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+            self.check(perspective, leader_move)
+            if self.done:
+                raise CheckAborted()
+            bot_move = super().get_move(bot, perspective, leader_move)
+            return bot_move
+
+        def check(self, perspective: PlayerPerspective, leader_move: Move | None) -> None:
+            if self.done:
+                return
+            # check whether the condition working correctly
+            if next(self.conditions):
+                try:
+                    if self.profile is not None:
+                        outcome = self.profile.call(self.name, self.implementation, perspective, leader_move)
+                    else:
+                        outcome = self.implementation(perspective, leader_move)
+                    expected_outcome = next(self.expected_outcomes_iterator)
+                    if outcome != expected_outcome:
+                        name = self.name
+                        self.errors.append(CheckError(lambda: f"Something seems wrong in your code. Expected {expected_outcome} , but got {outcome} for {name}. \n--- For input {simple_perspective_string(perspective, leader_move)}."))
+                except Exception as e:
+                    if isinstance(e, NotImplementedError):
+                        msg = str(e)
+                    else:
+                        msg = traceback.format_exc(limit=-1)
+                    self.errors.append(CheckError(f"An exception was raised from your bot's method {self.name} with message: {msg}"))
+
+    def __init__(self, implementation: Callable[[PlayerPerspective, Optional[Move]], T],
+                 expected_outcomes: Iterable[T],
+                 conditions: Iterator[bool],
+                 fail_fast: bool = False
+                 ):
+        super().__init__(deck_generator=SchnapsenDeckGenerator(),
+                         hand_generator=SchnapsenHandGenerator(),
+                         trick_implementer=SchnapsenTrickImplementer(),
+                         move_requester=CheckingGamePlayEngine.CheckingRequester(implementation, expected_outcomes, conditions, fail_fast=fail_fast),
+                         move_validator=SchnapsenMoveValidator(),
+                         trick_scorer=SchnapsenTrickScorer())
+
+    def errors(self) -> list[CheckError]:
+        req = cast(CheckingGamePlayEngine.CheckingRequester, self.move_requester)
+        return req.errors
+
+
+def check_condition_game(condition_implementation: Callable[[PlayerPerspective, Optional[Move]], bool],
+                         condition_game_log: ConditionGameLog,
+                         fail_fast: bool = False) -> list[CheckError]:
+    from schnapsen.bots.rand import RandBot
+    game_id = condition_game_log.game_id
+    outcomes: Iterable[bool] = condition_game_log.outcomes
+    engine = CheckingGamePlayEngine(condition_implementation, outcomes, itertools.repeat(True), fail_fast)
+
+    randbot = RandBot(Random(12345678910 + game_id))
+    try:
+        engine.play_game(randbot, randbot, Random(game_id))
+    except CheckAborted:
+        pass
+    return engine.errors()
+
+
+def assess_conditions_correctness(condition_implementation: Callable[[PlayerPerspective, Optional[Move]], bool],
+                                  condition_game_logs: Iterable[ConditionGameLog],
+                                  fail_fast: bool = False) -> list[CheckError]:
+    for condition_game_log in condition_game_logs:
+        errors = check_condition_game(condition_implementation, condition_game_log, fail_fast)
+        if errors:
+            # We stop early to not report 100s of times the same error
+            return errors
+    return []
+
+
+def assess_actions_correctness(action_implementation: Callable[[PlayerPerspective, Optional[Move]], Move],
+                               action_game_logs: Iterable[ActionGameLog],
+                               conditions: Iterator[Iterator[bool]] | None,
+                               fail_fast: bool = False) -> list[CheckError]:
+
+    if conditions is None:
+        conditions = map(itertools.repeat, itertools.repeat(True))
+
+    for action_game_log, condition in zip(action_game_logs, conditions):
+        errors = check_action_game(action_implementation, action_game_log, condition, fail_fast)
+        if errors:
+            # We stop early to not report 100s of times the same error
+            return errors
+    return []
+
+
+def check_action_game(action_implementation: Callable[[PlayerPerspective, Optional[Move]], Move],
+                      action_game_log: ActionGameLog,
+                      condition: Iterator[bool],
+                      fail_fast: bool = False) -> list[CheckError]:
+    from schnapsen.bots.rand import RandBot
+    game_id = action_game_log.game_id
+    outcomes: Iterable[Move] = to_schnapsen_moves(action_game_log.outcomes)
+    engine = CheckingGamePlayEngine(action_implementation, outcomes, condition, fail_fast)
+
+    randbot = RandBot(Random(12345678910 + game_id))
+    try:
+        engine.play_game(randbot, randbot, Random(game_id))
+    except CheckAborted:
+        pass
+    return engine.errors()
+
+
+class SharedCheckingGamePlayEngine(GamePlayEngine):
+    """Replays a game once, while checking several condition and action implementations at every decision point."""
+
+    class SharedCheckingRequester(SimpleMoveRequester):
+        def __init__(self, requesters: list[CheckingGamePlayEngine.CheckingRequester]) -> None:
+            self.requesters = requesters
+
+        def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+            for requester in self.requesters:
+                requester.check(perspective, leader_move)
+            if all(requester.done for requester in self.requesters):
+                raise CheckAborted()
+            bot_move = super().get_move(bot, perspective, leader_move)
+            return bot_move
+
+    def __init__(self, requesters: list[CheckingGamePlayEngine.CheckingRequester]):
+        super().__init__(deck_generator=SchnapsenDeckGenerator(),
+                         hand_generator=SchnapsenHandGenerator(),
+                         trick_implementer=SchnapsenTrickImplementer(),
+                         move_requester=SharedCheckingGamePlayEngine.SharedCheckingRequester(requesters),
+                         move_validator=SchnapsenMoveValidator(),
+                         trick_scorer=SchnapsenTrickScorer())
+
+    def errors(self) -> list[list[CheckError]]:
+        req = cast(SharedCheckingGamePlayEngine.SharedCheckingRequester, self.move_requester)
+        return [requester.errors for requester in req.requesters]
+
+
+def shared_replay_plan(game_log: AnyGameLog) -> dict[int, list[tuple[str, int, ConditionGameLog | ActionGameLog, Optional[list[bool]]]]]:
+    """Group the condition and action game logs by game ID, such that each game has to be replayed only once.
+
+    Each entry is (check, index in the log of the check, game log, condition gating the check or None).
+    The games are ordered by the position in which they first occur in any log, such that failures are discovered early.
+    """
+    logs: dict[str, list[Any]] = {check: list(getattr(game_log, check)) for check in CONDITION_CHECKS + ACTION_CHECKS}
+    # action1 is only checked where condition1 holds, and its game logs are matched with those of condition1 by position
+    action1_conditions = [list(cond_log.outcomes) for cond_log in game_log.condition1]
+    logs["action1"] = logs["action1"][:len(action1_conditions)]
+
+    plan: dict[int, list[tuple[str, int, ConditionGameLog | ActionGameLog, Optional[list[bool]]]]] = {}
+    for index in range(max(map(len, logs.values()), default=0)):
+        for check, check_logs in logs.items():
+            if index < len(check_logs):
+                condition = action1_conditions[index] if check == "action1" else None
+                plan.setdefault(check_logs[index].game_id, []).append((check, index, check_logs[index], condition))
+    return plan
+
+
+def check_shared_game(student_bot: AssignmentBot, game_id: int,
+                      entries: list[tuple[str, ConditionGameLog | ActionGameLog, Iterator[bool]]],
+                      profile: Optional[CheckProfile] = None, fail_fast: bool = False,
+                      start: Optional[Checkpoint] = None) -> list[list[CheckError]]:
+    """Replay the game once and check the given (check, game log, condition) entries at each decision point.
+    If start is given, the game is resumed from that checkpoint, and the outcomes of the decisions before it are skipped.
+    Returns the errors for each entry."""
+    from schnapsen.bots.rand import RandBot
+    requesters: list[CheckingGamePlayEngine.CheckingRequester] = []
+    for check, game_log, condition in entries:
+        assert game_log.game_id == game_id
+        outcomes: Iterable[Any]
+        if isinstance(game_log, ActionGameLog):
+            outcomes = to_schnapsen_moves(game_log.outcomes)
+        else:
+            outcomes = game_log.outcomes
+        if start is not None:
+            # there is an outcome for every skipped decision at which the condition held
+            outcomes = itertools.islice(outcomes, sum(itertools.islice(condition, start.decisions)), None)
+        requesters.append(CheckingGamePlayEngine.CheckingRequester(getattr(student_bot, check), outcomes, condition, profile, fail_fast, check))
+    engine = SharedCheckingGamePlayEngine(requesters)
+
+    randbot = RandBot(Random(12345678910 + game_id))
+    try:
+        with _profiled_game(profile, "shared", game_id, [check for check, _, _ in entries]):
+            if start is not None:
+                engine.play_game_from_state(start.game_state(), None)
+            else:
+                engine.play_game(randbot, randbot, Random(game_id))
+    except CheckAborted:
+        pass
+    return engine.errors()
+
+
+def _profiled_game(profile: Optional[CheckProfile], replay: str, game_id: int, checks: list[str]) -> AbstractContextManager[None]:
+    return profile.game(replay, game_id, checks) if profile is not None else nullcontext()
+
+
+class IntegrationCheckingGamePlayEngine(GamePlayEngine):
+
+    class CheckingRequester(SimpleMoveRequester):
+        def __init__(self, bot: AssignmentBot,
+                     expected_outcomes: Iterable[Move],
+                     profile: Optional[CheckProfile] = None,
+                     fail_fast: bool = False
+                     ) -> None:
+            self.expected_outcomes_iterator: Iterator[Move] = iter(expected_outcomes)
+            self.bot = bot
+            self.errors: list[CheckError] = []
+            self.profile = profile
+            self.fail_fast = fail_fast
+            self.observed: list[Optional[Move]] = []
+            """The move of the student bot at every move request, None if it raised an exception or it was the turn of the opponent"""
+
+        def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+            # check whether the condition working correctly
+            expected_move: Move = next(self.expected_outcomes_iterator)
+            if bot.implementation == self.bot:
+                self.observed.append(None)
+                try:
+                    if self.profile is not None:
+                        bot_move = self.profile.call(INTEGRATION_CHECK, super().get_move, bot, perspective, leader_move)
+                    else:
+                        bot_move = super().get_move(bot, perspective, leader_move)
+                    self.observed[-1] = bot_move
+                except Exception as e:
+                    if isinstance(e, NotImplementedError):
+                        msg = str(e)
+                    else:
+                        msg = traceback.format_exc(limit=-1)
+                    self.errors.append(CheckError(f"An exception was raised by your bot with message: {msg}"))
+                    bot_move = expected_move
+                if bot_move != expected_move:
+                    wrong_move = bot_move
+                    self.errors.append(CheckError(lambda: f"Bot played a wrong move. \nFor input {perspective}, \n{expected_move} was expected, but got {wrong_move}."))
+                    bot_move = expected_move
+                if self.fail_fast and self.errors:
+                    raise CheckAborted()
+            else:
+                self.observed.append(None)
+                bot_move = super().get_move(bot, perspective, leader_move)
+
+            return bot_move
+
+    def __init__(self, bot: AssignmentBot, expected_outcomes: Iterable[Move], profile: Optional[CheckProfile] = None, fail_fast: bool = False):
+        super().__init__(deck_generator=SchnapsenDeckGenerator(),
+                         hand_generator=SchnapsenHandGenerator(),
+                         trick_implementer=SchnapsenTrickImplementer(),
+                         move_requester=IntegrationCheckingGamePlayEngine.CheckingRequester(bot, expected_outcomes, profile, fail_fast),
+                         move_validator=SchnapsenMoveValidator(),
+                         trick_scorer=SchnapsenTrickScorer())
+
+    def errors(self) -> list[CheckError]:
+        req = cast(IntegrationCheckingGamePlayEngine.CheckingRequester, self.move_requester)
+        return req.errors
+
+
+def check_snapshots(implementation: Callable[[PlayerPerspective, Optional[Move]], T],
+                    snapshots: Iterable[PerspectiveSnapshot],
+                    expected_outcomes: Iterable[T],
+                    conditions: Iterator[bool],
+                    fail_fast: bool = False) -> list[CheckError]:
+    """Check the implementation at every decision point of a game, using the recorded snapshots instead of replaying the game."""
+    requester = CheckingGamePlayEngine.CheckingRequester(implementation, expected_outcomes, conditions, fail_fast=fail_fast)
+    for snapshot in snapshots:
+        requester.check(snapshot, snapshot.leader_move)
+        if requester.done:
+            break
+    return requester.errors
+
+
+def assess_snapshots_correctness(implementation: Callable[[PlayerPerspective, Optional[Move]], T],
+                                 game_logs: Iterable[ConditionGameLog | ActionGameLog],
+                                 store: SnapshotStore,
+                                 conditions: Iterator[Iterator[bool]] | None,
+                                 fail_fast: bool = False) -> list[CheckError]:
+    if conditions is None:
+        conditions = map(itertools.repeat, itertools.repeat(True))
+
+    for game_log, condition in zip(game_logs, conditions):
+        outcomes: Iterable[T]
+        if isinstance(game_log, ActionGameLog):
+            outcomes = cast(Iterable[T], to_schnapsen_moves(game_log.outcomes))
+        else:
+            outcomes = cast(Iterable[T], game_log.outcomes)
+        errors = check_snapshots(implementation, store.get(game_log.game_id), outcomes, condition, fail_fast)
+        if errors:
+            # We stop early to not report 100s of times the same error
+            return errors
+    return []
+
+
+def assess_correctness_from_snapshots(student_bot: AssignmentBot, game_log: AnyGameLog, store: SnapshotStore,
+                                      fail_fast: bool = False) -> tuple[list[list[CheckError]], list[list[CheckError]], list[list[CheckError]]]:
+    """The same as assess_correctness, but the conditions and actions are checked against perspective snapshots from the store.
+    The integration check still plays the games, because the student bot takes part in them.
+    """
+    condition_errors = [assess_snapshots_correctness(getattr(student_bot, check), getattr(game_log, check), store, conditions=None, fail_fast=fail_fast)
+                        for check in CONDITION_CHECKS]
+
+    action_errors: list[list[CheckError]] = []
+    conditions: Iterator[Iterator[bool]] = iter([iter([c for c in cond_log.outcomes]) for cond_log in game_log.condition1])
+    action_errors.append(assess_snapshots_correctness(student_bot.action1, game_log.action1, store, conditions=conditions, fail_fast=fail_fast))
+    for check in ACTION_CHECKS[1:]:
+        action_errors.append(assess_snapshots_correctness(getattr(student_bot, check), getattr(game_log, check), store, conditions=None, fail_fast=fail_fast))
+
+    integration_errors: list[list[CheckError]] = []
+    integration_errors.append(assess_integration_correctness(student_bot, game_log.integration, fail_fast=fail_fast))
+
+    return condition_errors, action_errors, integration_errors
+
+
+def check_integration_game(student_bot: AssignmentBot, game_log: ActionGameLog, profile: Optional[CheckProfile] = None,
+                           fail_fast: bool = False, start: Optional[Checkpoint] = None) -> list[CheckError]:
+    from schnapsen.bots.rand import RandBot
+    game_id = game_log.game_id
+    outcomes: Iterable[Move] = to_schnapsen_moves(game_log.outcomes)
+    if start is not None:
+        outcomes = itertools.islice(outcomes, start.decisions, None)
+    engine = IntegrationCheckingGamePlayEngine(student_bot, outcomes, profile, fail_fast)
+
+    randbot = RandBot(Random(12345678910 + game_id))
+    try:
+        with _profiled_game(profile, "integration", game_id, [INTEGRATION_CHECK]):
+            if start is not None:
+                engine.play_game_from_state(start.game_state(student_bot), None)
+            else:
+                engine.play_game(student_bot, randbot, Random(game_id))
+    except CheckAborted:
+        pass
+    return engine.errors()
+
+
+def assess_integration_correctness(student_bot: AssignmentBot, game_logs: Iterable[ActionGameLog], profile: Optional[CheckProfile] = None,
+                                   fail_fast: bool = False, checkpoints: Optional[CheckpointStore] = None,
+                                   from_trick: int = 0) -> list[CheckError]:
+    for game_log in game_logs:
+        start = nearest(checkpoints.get_integration(game_log), from_trick) if checkpoints is not None else None
+        errors = check_integration_game(student_bot, game_log, profile, fail_fast, start)
+        if errors:
+            # We stop early to not report 100s of times the same error
+            return errors
+    return []
+
+
+def assess_correctness_streaming(student_bot: AssignmentBot, reader: GameLogStreamReader,
+                                 fail_fast: bool = False) -> tuple[list[list[CheckError]], list[list[CheckError]], list[list[CheckError]]]:
+    """The same as assess_correctness, but the games are checked while the records are read from the stream.
+
+    The conditions and actions are checked in the shared replay: a game is replayed once its records of all checks which did not fail yet were read,
+    or at the end of the stream if some never are.
+    Once a check failed, the remaining records of its section are skipped without parsing them.
+    Reading stops as soon as all checks failed.
+    """
+    checks = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)
+    results: dict[str, dict[int, list[CheckError]]] = {check: {} for check in checks}
+    read_counts = dict.fromkeys(checks, 0)
+    # action1 is only checked where condition1 holds, and its game logs are matched with those of condition1 by position
+    action1_conditions: list[list[bool]] = []
+    # the game IDs of the action1 records which wait for the matching condition1 record, by index
+    waiting_for_condition: dict[int, int] = {}
+    # the (check, index, game log) entries of the games which were not replayed yet, in the order in which the games were first read
+    pending: dict[int, list[tuple[str, int, ConditionGameLog | ActionGameLog]]] = {}
+
+    def failed(check: str) -> None:
+        # We stop early to not report 100s of times the same error
+        reader.skip_section(check)
+        if check == "condition1" and not results["action1"]:
+            # still needed as condition for action1
+            reader.skipped.discard("condition1")
+        if check == "action1" and results["condition1"]:
+            reader.skip_section("condition1")
+
+    def ready(game_id: int) -> bool:
+        read = {check for check, _, _ in pending[game_id]}
+        conditions_read = all(index < len(action1_conditions) for check, index, _ in pending[game_id] if check == "action1")
+        return conditions_read and all(check in read or results[check] for check in CONDITION_CHECKS + ACTION_CHECKS)
+
+    def replay(game_id: int) -> None:
+        # action1 records without a condition1 record are not checked, as in shared_replay_plan
+        selected = [(check, index, log) for check, index, log in pending.pop(game_id)
+                    if not _failed_before(results[check], index) and (check != "action1" or index < len(action1_conditions))]
+        if not selected:
+            return
+        errors = check_shared_game(student_bot, game_id, [(check, log, iter(action1_conditions[index]) if check == "action1" else itertools.repeat(True))
+                                                          for check, index, log in selected], fail_fast=fail_fast)
+        newly_failed = False
+        for (check, index, _), check_errors in zip(selected, errors):
+            if check_errors:
+                newly_failed = newly_failed or not results[check]
+                results[check][index] = check_errors
+                failed(check)
+        if newly_failed:
+            # the games which only waited for the records of the failed checks
+            for waiting in [waiting for waiting in pending if ready(waiting)]:
+                if waiting in pending:
+                    replay(waiting)
+
+    for section, record in reader:
+        index = read_counts[section]
+        read_counts[section] += 1
+        if section == "condition1":
+            action1_conditions.append(list(cast(ConditionGameLog, record).outcomes))
+        if section == INTEGRATION_CHECK:
+            if not results[section]:
+                check_errors = check_integration_game(student_bot, cast(ActionGameLog, record), fail_fast=fail_fast)
+                if check_errors:
+                    results[section][index] = check_errors
+                    failed(section)
+        elif not results[section]:
+            pending.setdefault(record.game_id, []).append((section, index, record))
+            if section == "action1":
+                waiting_for_condition[index] = record.game_id
+            if ready(record.game_id):
+                replay(record.game_id)
+        if section == "condition1" and index in waiting_for_condition:
+            game_id = waiting_for_condition.pop(index)
+            if game_id in pending and ready(game_id):
+                replay(game_id)
+        if all(results.values()):
+            break
+
+    # the games which were read before the failures in their checks, and the games missing from some of the logs
+    for game_id in list(pending):
+        if game_id in pending:
+            replay(game_id)
+    return _collect_first_errors(results)
+
+
+def _check_shared_game_task(student_bot: AssignmentBot, game_id: int, entries: list[tuple[str, int, bytes, Optional[list[bool]]]],
+                            failed: Mapping[str, int], fail_fast: bool) -> list[tuple[str, int, list[CheckError]]]:
+    """Replay a single game in a worker process, checking all (check, index, game log, condition) entries for it.
+    The game logs are passed serialized, the generated protobuf classes cannot be pickled.
+    Entries for which an earlier game of the same check already failed are skipped.
+    """
+    pending = [(check, index, serialized, condition) for check, index, serialized, condition in entries if failed.get(check, index) >= index]
+    if not pending:
+        return []
+    game_logs: list[tuple[str, ConditionGameLog | ActionGameLog, Iterator[bool]]] = []
+    for check, _, serialized, condition in pending:
+        game_log = ConditionGameLog.FromString(serialized) if check in CONDITION_CHECKS else ActionGameLog.FromString(serialized)
+        game_logs.append((check, game_log, iter(condition) if condition is not None else itertools.repeat(True)))
+    errors = check_shared_game(student_bot, game_id, game_logs, fail_fast=fail_fast)
+    return [(check, index, check_errors) for (check, index, _, _), check_errors in zip(pending, errors)]
+
+
+def _check_integration_game_task(student_bot: AssignmentBot, index: int, serialized: bytes,
+                                 failed: Mapping[str, int], fail_fast: bool) -> list[tuple[str, int, list[CheckError]]]:
+    if failed.get(INTEGRATION_CHECK, index) < index:
+        return []
+    return [(INTEGRATION_CHECK, index, check_integration_game(student_bot, ActionGameLog.FromString(serialized), fail_fast=fail_fast))]
+
+
+def assess_correctness_parallel(student_bot: AssignmentBot, game_log: AnyGameLog, jobs: int,
+                                fail_fast: bool = False, checks: Collection[str] = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)) -> tuple[list[list[CheckError]], list[list[CheckError]], list[list[CheckError]]]:
+    """The same as assess_correctness, but the shared replays of the games, and the integration games, are spread over a pool of jobs processes.
+
+    The outcome is deterministic: for every check, the errors of the first failing game in the log are reported, exactly as in the sequential version.
+    Once a game fails, the games which come later in the log of the same check are cancelled, or skipped by the workers.
+    """
+    results: dict[str, dict[int, list[CheckError]]] = {check: {} for check in CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)}
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=jobs) as executor:
+        # for each check, the index of the first game which is known to have failed. Shared with the workers as cancellation signal
+        failed = manager.dict()
+        futures: dict[Future[list[tuple[str, int, list[CheckError]]]], list[tuple[str, int]]] = {}
+        plan = [(game_id, selected) for game_id, entries in shared_replay_plan(game_log).items()
+                if (selected := [entry for entry in entries if entry[0] in checks])]
+        integration_logs = list(game_log.integration) if INTEGRATION_CHECK in checks else []
+        # interleave the integration games with the shared replays, such that failures in either are found early
+        for position in range(max(len(plan), len(integration_logs))):
+            if position < len(plan):
+                game_id, entries = plan[position]
+                serialized_entries = [(check, index, log.SerializeToString(), condition) for check, index, log, condition in entries]
+                future = executor.submit(_check_shared_game_task, student_bot, game_id, serialized_entries, failed, fail_fast)
+                futures[future] = [(check, index) for check, index, _, _ in entries]
+            if position < len(integration_logs):
+                future = executor.submit(_check_integration_game_task, student_bot, position, integration_logs[position].SerializeToString(), failed, fail_fast)
+                futures[future] = [(INTEGRATION_CHECK, position)]
+
+        # a local copy of the failures, reading from the shared dict is a round trip to the manager process
+        first_failure: dict[str, int] = {}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            new_failure = False
+            for check, index, errors in future.result():
+                if not errors:
+                    continue
+                results[check][index] = errors
+                if index < first_failure.get(check, index + 1):
+                    first_failure[check] = failed[check] = index
+                    new_failure = True
+            if new_failure:
+                # cancel the replays which only contain games that come after a failure of their check
+                for other, other_entries in futures.items():
+                    if all(index > first_failure.get(check, index) for check, index in other_entries):
+                        other.cancel()
+
+    return _collect_first_errors(results)
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import pickle
+import sys
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from random import Random
+from typing import Callable, Iterable, Iterator, Optional
+
+from schnapsen.game import (Bot, BotState, GamePlayEngine, GameState, Move, PlayerPerspective, RegularMove, SchnapsenDeckGenerator,
+                            SchnapsenHandGenerator, SchnapsenMoveValidator, SchnapsenTrickImplementer, SchnapsenTrickScorer,
+                            SimpleMoveRequester)
+
+from schnapsen_assignment.serialization import ActionGameLog, to_schnapsen_moves
+from schnapsen_assignment.student.snapshots import UNPICKLING_ERRORS, code_version
+
+CHECKPOINT_FORMAT_VERSION = 2
+
+
+def checkpoint_version() -> str:
+    """The version of the code which records checkpoints: the game engine, whose states they pickle, the RandBot and this module."""
+    import schnapsen.bots.rand
+    import schnapsen.deck
+    import schnapsen.game
+    return code_version(schnapsen.deck, schnapsen.game, schnapsen.bots.rand, sys.modules[__name__])
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """The state of a game before one of its tricks. Trump exchanges count as tricks, as they do in the engine."""
+
+    trick: int
+    """The number of tricks played before the checkpoint"""
+    decisions: int
+    """The number of moves requested before the checkpoint, i.e., the number of expected outcomes the checkpoint skips"""
+    state: bytes
+    """The pickled game state, including the bots and the state of their random number generators"""
+
+    def game_state(self, student_bot: Optional[Bot] = None) -> GameState:
+        """A fresh copy of the game state, in which the game can continue.
+        The placeholder of the student bot, if any, is replaced by student_bot, also in the history of the game."""
+        game_state: GameState = pickle.loads(self.state)
+        state: Optional[GameState] = game_state
+        while student_bot is not None and state is not None:
+            for bot_state in (state.leader, state.follower):
+                if isinstance(bot_state.implementation, StudentBotPlaceholder):
+                    bot_state.implementation = student_bot
+            state = state.previous.state if state.previous is not None else None
+        return game_state
+
+
+class StudentBotPlaceholder(Bot):
+    """Takes the place of the student bot in the integration games while their checkpoints are recorded. Its moves are the expected ones."""
+
+    def get_move(self, perspective: PlayerPerspective, leader_move: Optional[Move]) -> Move:
+        raise AssertionError("The placeholder of the student bot is never asked for a move")
+
+
+class CheckpointingTrickImplementer(SchnapsenTrickImplementer):
+    """Plays the tricks like the schnapsen implementer does, and keeps a checkpoint before every `every`-th trick."""
+
+    def __init__(self, every: int = 1) -> None:
+        self.every = every
+        self.tricks = 0
+        self.decisions = 0
+        self.checkpoints: list[Checkpoint] = []
+
+    def play_trick(self, game_engine: GamePlayEngine, game_state: GameState) -> GameState:
+        if self.tricks and self.tricks % self.every == 0:
+            self.checkpoints.append(Checkpoint(self.tricks, self.decisions, pickle.dumps(game_state, protocol=pickle.HIGHEST_PROTOCOL)))
+        self.tricks += 1
+        return super().play_trick(game_engine, game_state)
+
+    def get_leader_move(self, game_engine: GamePlayEngine, game_state: GameState) -> Move:
+        self.decisions += 1
+        return super().get_leader_move(game_engine, game_state)
+
+    def get_follower_move(self, game_engine: GamePlayEngine, game_state: GameState, leader_move: Move) -> RegularMove:
+        self.decisions += 1
+        return super().get_follower_move(game_engine, game_state, leader_move)
+
+
+class ExpectedMovesRequester(SimpleMoveRequester):
+    """Plays the expected moves for the placeholder of the student bot, and lets the opponent choose, exactly like the integration check does."""
+
+    def __init__(self, expected_moves: Iterable[Move]) -> None:
+        self.expected_moves: Iterator[Move] = iter(expected_moves)
+
+    def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+        expected_move = next(self.expected_moves)
+        if isinstance(bot.implementation, StudentBotPlaceholder):
+            return expected_move
+        return super().get_move(bot, perspective, leader_move)
+
+
+def _record(requester: SimpleMoveRequester, bot1: Bot, bot2: Bot, game_id: int, every: int) -> list[Checkpoint]:
+    trick_implementer = CheckpointingTrickImplementer(every)
+    engine = GamePlayEngine(deck_generator=SchnapsenDeckGenerator(),
+                            hand_generator=SchnapsenHandGenerator(),
+                            trick_implementer=trick_implementer,
+                            move_requester=requester,
+                            move_validator=SchnapsenMoveValidator(),
+                            trick_scorer=SchnapsenTrickScorer())
+    try:
+        engine.play_game(bot1, bot2, Random(game_id))
+    except Exception:
+        # e.g., a gamelog which does not match the game. The checkpoints before the problem are still valid, the check will report it
+        pass
+    return trick_implementer.checkpoints
+
+
+def record_checkpoints(game_id: int, every: int = 1) -> list[Checkpoint]:
+    """Replay the game with the given ID, exactly like the condition and action checks do, and record the checkpoints."""
+    from schnapsen.bots.rand import RandBot
+    randbot = RandBot(Random(12345678910 + game_id))
+    return _record(SimpleMoveRequester(), randbot, randbot, game_id, every)
+
+
+def record_integration_checkpoints(game_log: ActionGameLog, every: int = 1) -> list[Checkpoint]:
+    """Replay the integration game with the expected moves in place of the student bot, and record the checkpoints."""
+    from schnapsen.bots.rand import RandBot
+    randbot = RandBot(Random(12345678910 + game_log.game_id))
+    return _record(ExpectedMovesRequester(to_schnapsen_moves(game_log.outcomes)), StudentBotPlaceholder(), randbot, game_log.game_id, every)
+
+
+class CheckpointStore:
+    """Checkpoints of games at trick boundaries, stored on disk as one compressed pickle file per game.
+
+    The games of the condition and action checks only depend on the game ID, so their checkpoints are shared between all student IDs.
+    The integration games also depend on the moves of the student bot, their checkpoints are kept per game ID and hash of the expected moves.
+    Every checkpoint contains the history of the game up to it, which the checkpoints of a game have mostly in common, so it compresses well.
+    Every file also holds the checkpoint_version of the code which recorded it, the pickled game states can only be resumed by the same code.
+    Missing checkpoints, and those recorded by other code or which cannot be unpickled, are recorded by replaying the game once.
+    """
+
+    def __init__(self, directory: Path, every: int = 1) -> None:
+        self.every = every
+        self.directory = directory / "checkpoints" / f"v{CHECKPOINT_FORMAT_VERSION}" / f"every{every}"
+        self._loaded: dict[str, list[Checkpoint]] = {}
+        self.version = checkpoint_version()
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.pickle"
+
+    def read(self, name: str) -> Optional[list[Checkpoint]]:
+        """The stored checkpoints, None if there are none, or they were recorded by other code."""
+        try:
+            version, checkpoints = pickle.loads(zlib.decompress(self.path(name).read_bytes()))
+        except (OSError, zlib.error, *UNPICKLING_ERRORS):
+            return None
+        return checkpoints if version == self.version else None
+
+    def _get(self, name: str, record: Callable[[], list[Checkpoint]]) -> list[Checkpoint]:
+        checkpoints = self._loaded.get(name)
+        if checkpoints is None:
+            checkpoints = self.read(name)
+            if checkpoints is None:
+                checkpoints = record()
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path(name).with_name(f"{name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(zlib.compress(pickle.dumps((self.version, checkpoints), protocol=pickle.HIGHEST_PROTOCOL)))
+                os.replace(tmp_path, self.path(name))
+            self._loaded[name] = checkpoints
+        return checkpoints
+
+    def get(self, game_id: int) -> list[Checkpoint]:
+        return self._get(str(game_id), lambda: record_checkpoints(game_id, self.every))
+
+    def get_integration(self, game_log: ActionGameLog) -> list[Checkpoint]:
+        moves_hash = hashlib.sha256(game_log.SerializeToString(deterministic=True)).hexdigest()[:16]
+        return self._get(f"integration-{game_log.game_id}-{moves_hash}", lambda: record_integration_checkpoints(game_log, self.every))
+
+
+def nearest(checkpoints: Iterable[Checkpoint], trick: int) -> Optional[Checkpoint]:
+    """The latest checkpoint at or before the trick, None if there is none and the game has to be played from the start."""
+    return max((checkpoint for checkpoint in checkpoints if checkpoint.trick <= trick), key=lambda checkpoint: checkpoint.trick, default=None)
@@ -0,0 +1,196 @@
+"""Export of gamelogs, and the outcomes a bot produces for them, as a table with one row per checked decision.
+
+Columns, all integers:
+
+    source    index of the gamelog in the list of sources
+    game_id   the game ID
+    check     index of the check in CHECKS
+    position  index of the game in the log of the check
+    decision  index of the decision point in the game
+    expected  the outcome in the gamelog, 0 or 1 for conditions, the index in MOVES for moves
+    observed  the same encoding, for the outcome of the bot. -1 if no bot was given, the bot raised an exception, or returned something else
+
+The rows are written in chunks, such that memory stays bounded regardless of the number of gamelogs.
+Parquet output needs pyarrow, both formats need numpy.
+"""
+import json
+import zipfile
+from pathlib import Path
+from random import Random
+from typing import Any, Iterable, Iterator, Optional, Protocol, cast
+
+from schnapsen.game import Move, PlayerPerspective
+
+from schnapsen_assignment.serialization import MOVES, ActionGameLog, AnyGameLog, move_code, read_game_log, to_pb_move, to_schnapsen_moves
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import ACTION_CHECKS, CONDITION_CHECKS, INTEGRATION_CHECK, IntegrationCheckingGamePlayEngine
+from schnapsen_assignment.student.snapshots import SnapshotStore
+
+CHECKS = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)
+COLUMNS = ("source", "game_id", "check", "position", "decision", "expected", "observed")
+NO_OUTCOME = -1
+
+_OBSERVED_MOVE_CODES: dict[Move, int] = {move: code for code, move in enumerate(MOVES)}
+
+
+def _encode_observed(outcome: Any) -> int:
+    if isinstance(outcome, bool):
+        return int(outcome)
+    try:
+        return _OBSERVED_MOVE_CODES.get(outcome, NO_OUTCOME)
+    except TypeError:
+        # not hashable, so not a move either
+        return NO_OUTCOME
+
+
+def _observe(implementation: Any, perspective: PlayerPerspective, leader_move: Optional[Move]) -> int:
+    try:
+        return _encode_observed(implementation(perspective, leader_move))
+    except Exception:
+        return NO_OUTCOME
+
+
+def _observe_integration(student_bot: AssignmentBot, game_log: ActionGameLog) -> list[int]:
+    """Replay the integration game, and record the move of the student bot at every decision, NO_OUTCOME for the moves of the opponent."""
+    from schnapsen.bots.rand import RandBot
+    expected = to_schnapsen_moves(game_log.outcomes)
+    engine = IntegrationCheckingGamePlayEngine(student_bot, expected)
+    try:
+        engine.play_game(student_bot, RandBot(Random(12345678910 + game_log.game_id)), Random(game_log.game_id))
+    except StopIteration:
+        # the game asked for more moves than the log has. Raised on as is, it would end the generators this is called from
+        raise ValueError(f"The integration log of game {game_log.game_id} has {len(expected)} moves, the game needs more") from None
+    requester = cast(IntegrationCheckingGamePlayEngine.CheckingRequester, engine.move_requester)
+    if len(requester.observed) != len(expected):
+        raise ValueError(f"The integration log of game {game_log.game_id} has {len(expected)} moves, the game ended after {len(requester.observed)}")
+    return [_encode_observed(move) if move is not None else NO_OUTCOME for move in requester.observed]
+
+
+def game_log_rows(game_log: AnyGameLog, source: int, student_bot: Optional[AssignmentBot] = None,
+                  store: Optional[SnapshotStore] = None) -> Iterator[tuple[int, int, int, int, int, int, int]]:
+    """The rows for one gamelog, in the order of the COLUMNS. With a bot, the observed outcomes are computed from the snapshots in the store."""
+    action1_conditions = [list(condition_log.outcomes) for condition_log in game_log.condition1]
+    for check_index, check in enumerate(CHECKS):
+        for position, record in enumerate(getattr(game_log, check)):
+            if isinstance(record, ActionGameLog):
+                expected = [move_code(move) for move in record.outcomes]
+            else:
+                expected = [int(outcome) for outcome in record.outcomes]
+            if check == INTEGRATION_CHECK:
+                decisions = list(range(len(expected)))
+            elif check == "action1":
+                condition = action1_conditions[position] if position < len(action1_conditions) else []
+                decisions = [decision for decision, holds in enumerate(condition) if holds]
+            else:
+                decisions = list(range(len(expected)))
+
+            observed = [NO_OUTCOME] * len(decisions)
+            if student_bot is not None and check == INTEGRATION_CHECK:
+                observed = _observe_integration(student_bot, record)
+            elif student_bot is not None and store is not None:
+                snapshots = store.get(record.game_id)
+                implementation = getattr(student_bot, check)
+                observed = [_observe(implementation, snapshots[decision], snapshots[decision].leader_move) if decision < len(snapshots) else NO_OUTCOME
+                            for decision in decisions]
+            for decision, expected_outcome, observed_outcome in zip(decisions, expected, observed):
+                yield source, record.game_id, check_index, position, decision, expected_outcome, observed_outcome
+
+
+class ChunkWriter(Protocol):
+    def write(self, columns: dict[str, Any]) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+def _metadata(sources: list[str]) -> dict[str, Any]:
+    return {"columns": list(COLUMNS),
+            "checks": list(CHECKS),
+            "sources": sources,
+            "moves": [str(move) for move in MOVES],
+            "move_types": [to_pb_move(move).move_type for move in MOVES],
+            "move_cards": [list(to_pb_move(move).cards) for move in MOVES]}
+
+
+class ParquetChunkWriter:
+    """Writes every chunk as a row group of a Parquet file. The names of the codes are stored as JSON in the schnapsen metadata key of the schema."""
+
+    def __init__(self, path: Path, sources: list[str]) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise Exception("Exporting to Parquet requires pyarrow, install it with `pip install schnapsen-assignment[export]`, or export to .npz")
+        self._pa = pa
+        schema = pa.schema([(column, pa.int64()) for column in COLUMNS], metadata={"schnapsen": json.dumps(_metadata(sources))})
+        self._writer = pq.ParquetWriter(path, schema)
+
+    def write(self, columns: dict[str, Any]) -> None:
+        self._writer.write_table(self._pa.table(columns, schema=self._writer.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class NpzChunkWriter:
+    """Writes every chunk as separate arrays `<column>/<chunk number>` into an .npz file, which np.load reads lazily, one array at a time.
+    The names of the codes are stored as a JSON string in the `metadata` array."""
+
+    def __init__(self, path: Path, sources: list[str]) -> None:
+        import numpy as np
+        self._np = np
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._chunks = 0
+        self._write_array("metadata", np.array(json.dumps(_metadata(sources))))
+
+    def _write_array(self, name: str, array: Any) -> None:
+        with self._zip.open(f"{name}.npy", "w", force_zip64=True) as f:
+            self._np.lib.format.write_array(f, array, allow_pickle=False)
+
+    def write(self, columns: dict[str, Any]) -> None:
+        for column, values in columns.items():
+            self._write_array(f"{column}/{self._chunks:06d}", values)
+        self._chunks += 1
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+def export(game_log_paths: list[Path], output: Path, student_bot: Optional[AssignmentBot] = None, store: Optional[SnapshotStore] = None,
+           chunk_rows: int = 1_000_000) -> int:
+    """Export the gamelogs to Parquet, or to .npz if the output name ends in .npz. Returns the number of rows written."""
+    import numpy as np
+
+    sources = [path.stem for path in game_log_paths]
+    writer: ChunkWriter = NpzChunkWriter(output, sources) if output.suffix == ".npz" else ParquetChunkWriter(output, sources)
+    buffer: list[tuple[int, ...]] = []
+    rows = 0
+
+    def flush() -> None:
+        if buffer:
+            table = np.array(buffer, dtype=np.int64).reshape(-1, len(COLUMNS))
+            writer.write({column: table[:, index] for index, column in enumerate(COLUMNS)})
+            buffer.clear()
+
+    try:
+        for source, path in enumerate(game_log_paths):
+            with open(path, "rb") as f:
+                game_log = read_game_log(f)
+            for row in game_log_rows(game_log, source, student_bot, store):
+                buffer.append(row)
+                rows += 1
+                if len(buffer) >= chunk_rows:
+                    flush()
+        flush()
+    finally:
+        writer.close()
+    return rows
+
+
+def expand_paths(paths: Iterable[Path]) -> list[Path]:
+    """The given gamelog files, with directories replaced by the gamelogs in them"""
+    expanded: list[Path] = []
+    for path in paths:
+        expanded.extend(sorted(path.glob("*.gamelog")) if path.is_dir() else [path])
+    return expanded
@@ -0,0 +1,208 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, cast
+
+if TYPE_CHECKING:
+    # imported when needed, the command line only needs the defaults of this module to start
+    import requests
+    from schnapsen_assignment.serialization import AnyGameLog
+
+GAMELOG_URL = 'https://wolkje-105.labs.vu.nl/prins/assignment/v1/{id}/bot.gamelog'
+DEFAULT_CACHE_DIR = Path(".schnapsen_cache")
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10.0, 120.0)
+
+
+@dataclass(frozen=True)
+class CacheReport:
+    """How a gamelog was obtained, and how long that took."""
+
+    hit: bool
+    """Whether the gamelog came from the local cache"""
+    source: str
+    """A short description of where the content came from"""
+    seconds: float
+    """Wall time spent obtaining and parsing the gamelog"""
+
+    def __str__(self) -> str:
+        return f"cache {'hit' if self.hit else 'miss'} ({self.source}, {self.seconds * 1000:.1f} ms)"
+
+
+def make_session(pool_size: int = 10, retries: int = 5) -> "requests.Session":
+    """A session which keeps up to pool_size connections to the server alive, and retries failed requests with exponential backoff."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class GamelogCache:
+    """A persistent cache of gamelogs, keyed by student ID.
+
+    Next to every `<id>.gamelog` file, a `<id>.json` file keeps the sha256 of the content and the ETag the server sent.
+    The hash is used to detect truncated or modified cache files, the ETag to ask the server whether the content changed.
+    With compact, downloaded gamelogs are stored in the compact format, compressed with zstd if zstandard is installed. Both formats are read.
+    The metadata then also keeps the sha256 of the stored file, the one of the content is still used to compare with the server.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, url: str = GAMELOG_URL, session: Optional["requests.Session"] = None,
+                 compact: bool = False) -> None:
+        self.directory = directory
+        self.url = url
+        """The URL of the gamelogs, with an {id} placeholder for the student ID"""
+        self._session = session
+        self.compact = compact
+
+    @property
+    def session(self) -> "requests.Session":
+        """The session used to contact the server, created when it is first needed, such that offline use does not import requests."""
+        if self._session is None:
+            self._session = make_session()
+        return self._session
+
+    def gamelog_path(self, id: int) -> Path:
+        return self.directory / f"{id}.gamelog"
+
+    def metadata_path(self, id: int) -> Path:
+        return self.directory / f"{id}.json"
+
+    def read_metadata(self, id: int) -> Optional[dict[str, str]]:
+        try:
+            metadata: dict[str, str] = json.loads(self.metadata_path(id).read_text())
+        except (OSError, ValueError):
+            return None
+        return metadata
+
+    def is_valid(self, id: int) -> bool:
+        """Check that the cached gamelog exists and still has the content hash recorded when it was stored."""
+        metadata = self.read_metadata(id)
+        if metadata is None or not self.gamelog_path(id).exists():
+            return False
+        return metadata.get("file_sha256", metadata.get("sha256")) == hashlib.sha256(self.gamelog_path(id).read_bytes()).hexdigest()
+
+    def store(self, id: int, content: bytes, etag: Optional[str] = None) -> None:
+        """Store the content in the cache. Files are replaced atomically, such that concurrent readers never see partial content.
+
+        The content is parsed first, content which is not a gamelog is not stored. Otherwise, the server would confirm it with every revalidation.
+        """
+        from schnapsen_assignment.serialization import CompactGameLog, encode_compact, read_game_log
+        from schnapsen_assignment.serialization.compact import zstd_available
+        try:
+            game_log = read_game_log(io.BytesIO(content))
+            parsed = game_log.to_game_log() if isinstance(game_log, CompactGameLog) else game_log
+        except Exception as e:
+            raise Exception(f"The gamelog for {id} cannot be read, it is not stored: {e}") from e
+        self.directory.mkdir(parents=True, exist_ok=True)
+        metadata = {"sha256": hashlib.sha256(content).hexdigest()}
+        if etag:
+            metadata["etag"] = etag
+        stored = content
+        if self.compact:
+            stored = encode_compact(parsed, compress=zstd_available())
+            metadata["file_sha256"] = hashlib.sha256(stored).hexdigest()
+        for path, data in ((self.gamelog_path(id), stored), (self.metadata_path(id), json.dumps(metadata).encode())):
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+    def drop(self, id: int) -> None:
+        """Remove the cached gamelog and its metadata, such that it is downloaded again."""
+        for path in (self.metadata_path(id), self.gamelog_path(id)):
+            path.unlink(missing_ok=True)
+
+    def load(self, id: int) -> "AnyGameLog":
+        """Parse the cached gamelog straight from a memory mapped file. A compact gamelog decodes its sections only when they are used.
+
+        A compact gamelog keeps the file mapped, its sections are read from the map when they are decoded.
+        The files are only ever replaced, never written in place, so the map keeps the content it was loaded with.
+        """
+        from schnapsen_assignment.serialization import CompactGameLog, GameLog, is_compact
+        from schnapsen_assignment.serialization.compact import MAGIC as COMPACT_MAGIC
+        with open(self.gamelog_path(id), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # an empty file is a valid, empty, GameLog, but cannot be memory mapped
+                return GameLog()
+            # the map stays valid when the file is closed
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if is_compact(content[:len(COMPACT_MAGIC)]):
+            # unmapped when the gamelog is garbage collected
+            return CompactGameLog(memoryview(content))
+        with content, memoryview(content) as view:
+            # protobuf parses any buffer, the stubs only declare bytes. Passing the view avoids copying the file
+            return GameLog.FromString(cast(bytes, view))
+
+    def refresh(self, id: int) -> CacheReport:
+        """Make sure the cache holds the current gamelog of the server for the student ID.
+
+        When a valid cached copy exists, the server is asked with a conditional request whether the content changed.
+        """
+        start = time.perf_counter()
+        valid = self.is_valid(id)
+        headers = {}
+        metadata = self.read_metadata(id) if valid else None
+        if metadata and "etag" in metadata:
+            headers["If-None-Match"] = metadata["etag"]
+        r = self.session.get(self.url.format(id=id), headers=headers, timeout=DEFAULT_TIMEOUT)
+        if r.status_code == 304 and valid:
+            return CacheReport(True, "not modified on server", time.perf_counter() - start)
+        if r.status_code != 200:
+            raise Exception(f"Server could not be contacted, got status {r.status_code} for {id}")
+        if valid and metadata and metadata.get("sha256") == hashlib.sha256(r.content).hexdigest():
+            if r.headers.get("ETag") != metadata.get("etag"):
+                self.store(id, r.content, r.headers.get("ETag"))
+            return CacheReport(True, "unchanged on server", time.perf_counter() - start)
+        self.store(id, r.content, r.headers.get("ETag"))
+        return CacheReport(False, "downloaded", time.perf_counter() - start)
+
+    def fetch(self, id: int, offline: bool = False) -> tuple["AnyGameLog", CacheReport]:
+        """Get the gamelog for the student ID, from the cache if possible, from the server otherwise.
+
+        In offline mode, the server is never contacted and a valid cached copy is required.
+        A cached copy which cannot be parsed is dropped, and downloaded again unless offline.
+        """
+        start = time.perf_counter()
+        if offline:
+            if not self.is_valid(id):
+                raise Exception(f"No valid cached gamelog for {id} in {self.directory}, run once without --offline first.")
+            source = "offline"
+            hit = True
+        else:
+            report = self.refresh(id)
+            source = report.source
+            hit = report.hit
+        try:
+            game_log = self.load(id)
+        except Exception as e:
+            # e.g., stored before the content was checked. The server would keep confirming it with its ETag
+            self.drop(id)
+            if offline:
+                raise Exception(f"The cached gamelog for {id} cannot be read, it was removed: {e}") from e
+            report = self.refresh(id)
+            source = report.source
+            hit = report.hit
+            game_log = self.load(id)
+        return game_log, CacheReport(hit, source, time.perf_counter() - start)
+
+    def prefetch(self, ids: Iterable[int], jobs: int = 10) -> dict[int, CacheReport | Exception]:
+        """Refresh the cached gamelogs of many student IDs, with at most jobs concurrent requests over the connections of the session.
+        Returns the report for every ID, or the exception which made it fail."""
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {id: executor.submit(self.refresh, id) for id in ids}
+        results: dict[int, CacheReport | Exception] = {}
+        for id, future in futures.items():
+            exception = future.exception()
+            results[id] = exception if isinstance(exception, Exception) else future.result()
+        return results
@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from random import Random
+from typing import Iterable, Iterator, Optional
+
+from schnapsen.game import (BotState, GamePlayEngine, Move, PlayerPerspective, SchnapsenDeckGenerator, SchnapsenHandGenerator,
+                            SchnapsenMoveValidator, SchnapsenTrickImplementer, SchnapsenTrickScorer, SimpleMoveRequester)
+
+from schnapsen_assignment.serialization import ActionGameLog, ConditionGameLog, GameLog, GameLogStreamWriter, to_pb_move
+from schnapsen_assignment.serialization.stream import SECTIONS
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import ACTION_CHECKS, CONDITION_CHECKS
+
+
+class RecordingRequester(SimpleMoveRequester):
+    """Records the outcome of every condition and action of the reference bot at every move request,
+    exactly where the condition and action checks will ask for them."""
+
+    def __init__(self, reference: AssignmentBot) -> None:
+        self.reference = reference
+        self.conditions: dict[str, list[bool]] = {check: [] for check in CONDITION_CHECKS}
+        self.actions: dict[str, list[Move]] = {check: [] for check in ACTION_CHECKS}
+
+    def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+        for check in CONDITION_CHECKS:
+            self.conditions[check].append(getattr(self.reference, check)(perspective, leader_move))
+        for check in ACTION_CHECKS:
+            # action1 is only checked where condition1 holds
+            if check != "action1" or self.conditions["condition1"][-1]:
+                self.actions[check].append(getattr(self.reference, check)(perspective, leader_move))
+        return super().get_move(bot, perspective, leader_move)
+
+
+class MoveRecordingRequester(SimpleMoveRequester):
+    """Records the moves of both bots, in the order in which they are requested."""
+
+    def __init__(self) -> None:
+        self.moves: list[Move] = []
+
+    def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+        move = super().get_move(bot, perspective, leader_move)
+        self.moves.append(move)
+        return move
+
+
+def engine_with(requester: SimpleMoveRequester) -> GamePlayEngine:
+    """A schnapsen engine, which requests the moves through the given requester."""
+    return GamePlayEngine(deck_generator=SchnapsenDeckGenerator(),
+                          hand_generator=SchnapsenHandGenerator(),
+                          trick_implementer=SchnapsenTrickImplementer(),
+                          move_requester=requester,
+                          move_validator=SchnapsenMoveValidator(),
+                          trick_scorer=SchnapsenTrickScorer())
+
+
+def generate_game(reference: AssignmentBot, game_id: int) -> GameLog:
+    """The records of a single game, one in every section of a GameLog."""
+    from schnapsen.bots.rand import RandBot
+    game_log = GameLog()
+
+    requester = RecordingRequester(reference)
+    randbot = RandBot(Random(12345678910 + game_id))
+    engine_with(requester).play_game(randbot, randbot, Random(game_id))
+    for check, condition_outcomes in requester.conditions.items():
+        getattr(game_log, check).append(ConditionGameLog(game_id=game_id, outcomes=condition_outcomes))
+    for check, action_outcomes in requester.actions.items():
+        getattr(game_log, check).append(ActionGameLog(game_id=game_id, outcomes=[to_pb_move(move) for move in action_outcomes]))
+
+    move_requester = MoveRecordingRequester()
+    randbot = RandBot(Random(12345678910 + game_id))
+    engine_with(move_requester).play_game(reference, randbot, Random(game_id))
+    game_log.integration.append(ActionGameLog(game_id=game_id, outcomes=[to_pb_move(move) for move in move_requester.moves]))
+    return game_log
+
+
+def generate_game_log(game_ids: Iterable[int], reference: AssignmentBot | None = None) -> GameLog:
+    """Generate a game log locally, without the server, by recording the outcomes of the reference bot.
+
+    Every game ID gets a record in every section. A correct bot passes all checks against the result.
+    """
+    reference = reference or AssignmentBot()
+    game_log = GameLog()
+    for game_id in game_ids:
+        game_log.MergeFrom(generate_game(reference, game_id))
+    return game_log
+
+
+_reference_bots: dict[Optional[Path], AssignmentBot] = {}
+
+
+def _reference_bot(bot_path: Optional[Path]) -> AssignmentBot:
+    """The reference bot of the module at bot_path, or the AssignmentBot of this package. Imported once per process."""
+    if bot_path not in _reference_bots:
+        from schnapsen_assignment.student.batch import load_bot_class
+        _reference_bots[bot_path] = load_bot_class(bot_path)() if bot_path is not None else AssignmentBot()
+    return _reference_bots[bot_path]
+
+
+def _generate_task(bot_path: Optional[Path], game_ids: list[int]) -> bytes:
+    # passed serialized, the generated protobuf classes cannot be pickled
+    return generate_game_log(game_ids, _reference_bot(bot_path)).SerializeToString()
+
+
+def generate_in_chunks(game_ids: list[int], bot_path: Optional[Path] = None, jobs: int = 1, chunk_size: int = 100) -> Iterator[GameLog]:
+    """Generate the game log in chunks of at most chunk_size games, in the order of game_ids, spread over jobs processes."""
+    if jobs > 1:
+        # at least one chunk per process
+        chunk_size = max(1, min(chunk_size, -(-len(game_ids) // jobs)))
+    chunks = [game_ids[start:start + chunk_size] for start in range(0, len(game_ids), chunk_size)]
+    if jobs == 1:
+        for chunk in chunks:
+            yield generate_game_log(chunk, _reference_bot(bot_path))
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for serialized in executor.map(_generate_task, [bot_path] * len(chunks), chunks):
+            yield GameLog.FromString(serialized)
+
+
+def write_generated(path: Path, game_ids: list[int], bot_path: Optional[Path] = None, jobs: int = 1, stream: bool = True, chunk_size: int = 100) -> None:
+    """Generate the game log for the game IDs and write it to path.
+
+    In the streaming format, every chunk of games is written as soon as it is generated, such that the whole game log never has to be kept in memory.
+    """
+    with open(path, "wb") as f:
+        if stream:
+            writer = GameLogStreamWriter(f)
+            for chunk in generate_in_chunks(game_ids, bot_path, jobs, chunk_size):
+                for section in SECTIONS:
+                    writer.write(section, getattr(chunk, section))
+        else:
+            game_log = GameLog()
+            for chunk in generate_in_chunks(game_ids, bot_path, jobs, chunk_size):
+                game_log.MergeFrom(chunk)
+            f.write(game_log.SerializeToString())
@@ -0,0 +1,214 @@
+import ast
+import hashlib
+import json
+import os
+import sys
+from abc import ABC
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from schnapsen.game import Bot
+
+from schnapsen_assignment.serialization import AnyGameLog
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import ACTION_CHECKS, CONDITION_CHECKS, INTEGRATION_CHECK, CheckError, assess_correctness
+from schnapsen_assignment.student.profiling import CheckProfile
+from schnapsen_assignment.student.snapshots import code_version
+
+RESULTS_FORMAT_VERSION = 1
+CHECKS = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def checker_version() -> str:
+    """A key which changes with the code of the checker, and with the game engine and RandBot of schnapsen the games are replayed with."""
+    import schnapsen.bots.rand
+    import schnapsen.deck
+    import schnapsen.game
+    import schnapsen_assignment.serialization
+    import schnapsen_assignment.student.checker
+    return code_version(schnapsen.deck, schnapsen.game, schnapsen.bots.rand,
+                        schnapsen_assignment.serialization, schnapsen_assignment.student.checker)
+
+
+def _source_file(cls: type) -> str:
+    """The file which defines the class. Bots loaded from a file, e.g., by check-batch, have no module in sys.modules, their methods know the file."""
+    module = sys.modules.get(cls.__module__)
+    if module is not None and getattr(module, "__file__", None):
+        return str(module.__file__)
+    for value in vars(cls).values():
+        code = getattr(value, "__code__", None)
+        if code is not None:
+            return str(code.co_filename)
+    raise TypeError(f"Cannot find the source of {cls.__qualname__}")
+
+
+class _SourceFile:
+    """The top-level statements of a source file, by the names they bind, and its classes, by name."""
+
+    def __init__(self, path: str) -> None:
+        source = Path(path).read_text()
+        self.lines = source.splitlines()
+        tree = ast.parse(source)
+        self.definitions: dict[str, list[ast.stmt]] = {}
+        for statement in tree.body:
+            for name in _bound_names(statement):
+                self.definitions.setdefault(name, []).append(statement)
+        self.classes: dict[str, ast.ClassDef] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                self.classes.setdefault(node.name, node)
+
+    def source(self, statement: ast.stmt) -> str:
+        """The source of the statement, with its decorators"""
+        first = min([statement.lineno, *(decorator.lineno for decorator in getattr(statement, "decorator_list", []))])
+        return "\n".join(self.lines[first - 1:statement.end_lineno])
+
+
+def _bound_names(statement: ast.stmt) -> list[str]:
+    if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [statement.name]
+    if isinstance(statement, ast.Assign):
+        targets: list[ast.AST] = list(statement.targets)
+    elif isinstance(statement, (ast.AnnAssign, ast.AugAssign)):
+        targets = [statement.target]
+    else:
+        targets = [statement]
+    names = []
+    for target in targets:
+        for node in ast.walk(target):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                names.append(node.id)
+            elif isinstance(node, ast.alias):
+                names.append((node.asname or node.name).split(".")[0])
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.append(node.name)
+    return names
+
+
+def _references(statement: ast.stmt) -> tuple[set[str], set[str]]:
+    """The global names the statement may use, and the attributes it uses of self, or of super()"""
+    names: set[str] = set()
+    attributes: set[str] = set()
+    for node in ast.walk(statement):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            if isinstance(node.value, ast.Name) and node.value.id == "self":
+                attributes.add(node.attr)
+            elif isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Name) and node.value.func.id == "super":
+                attributes.add(node.attr)
+    return names, attributes
+
+
+def fingerprint_bot(student_bot: AssignmentBot) -> dict[str, str]:
+    """A fingerprint of the code each check depends on.
+
+    A condition or action depends on its method and on __init__, in every class of the bot which defines them, and on everything those use, transitively:
+    the methods and attributes of self and super(), and the module-level functions, classes, tables and imports of the files which define the classes of the bot.
+    The integration check depends on all methods of the bot, and what they use.
+    Code in other files is not followed, e.g., schnapsen, whose game engine is part of the checker_version all checks depend on.
+    If the source is not available, no fingerprints are returned, and all checks have to run.
+    """
+    bot_class = type(student_bot)
+    files: dict[str, _SourceFile] = {}
+    # for every class of the bot, its file, and its statements by the names they bind
+    classes: list[tuple[str, dict[str, list[ast.stmt]]]] = []
+    class_nodes: set[int] = set()
+    try:
+        for cls in bot_class.__mro__:
+            if cls in (Bot, ABC, object):
+                continue
+            path = _source_file(cls)
+            if path not in files:
+                files[path] = _SourceFile(path)
+            class_node = files[path].classes[cls.__name__]
+            class_nodes.add(id(class_node))
+            members: dict[str, list[ast.stmt]] = {}
+            for statement in class_node.body:
+                for name in _bound_names(statement):
+                    members.setdefault(name, []).append(statement)
+            classes.append((path, members))
+    except (OSError, SyntaxError, TypeError, KeyError):
+        return {}
+
+    def dependencies(members: Iterable[str]) -> str:
+        """The sources of the members of the bot classes, and of everything they use"""
+        sources: dict[tuple[str, int], str] = {}
+        pending = [("member", "", member) for member in members]
+        while pending:
+            kind, path, name = pending.pop()
+            if kind == "member":
+                statements = [(class_path, statement) for class_path, class_members in classes for statement in class_members.get(name, [])]
+            else:
+                # the classes of the bot are not taken as a whole, their members are followed one by one
+                statements = [(path, statement) for statement in files[path].definitions.get(name, []) if id(statement) not in class_nodes]
+            for statement_path, statement in statements:
+                if (statement_path, statement.lineno) in sources:
+                    continue
+                sources[statement_path, statement.lineno] = files[statement_path].source(statement)
+                names, attributes = _references(statement)
+                pending.extend(("global", statement_path, global_name) for global_name in names)
+                pending.extend(("member", "", attribute) for attribute in attributes)
+        # the files are left out, such that a bot which is moved keeps its fingerprints
+        return "\0".join(sorted(sources.values()))
+
+    shared = [checker_version(), bot_class.__qualname__]
+    fingerprints = {check: _sha256("\0".join([*shared, check, dependencies([check, "__init__"])])) for check in CONDITION_CHECKS + ACTION_CHECKS}
+    all_members = {name for _, members in classes for name in members}
+    fingerprints[INTEGRATION_CHECK] = _sha256("\0".join([*shared, INTEGRATION_CHECK, dependencies(all_members)]))
+    return fingerprints
+
+
+def fingerprint_game_log(game_log: AnyGameLog) -> str:
+    return hashlib.sha256(game_log.SerializeToString(deterministic=True)).hexdigest()
+
+
+class ResultStore:
+    """The outcome of the last run of every check, stored per gamelog as `results/v1/<gamelog hash>.json` in the cache directory.
+    For every check, the fingerprint of the code it ran and its first error, if any, are kept."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory / "results" / f"v{RESULTS_FORMAT_VERSION}"
+
+    def path(self, game_log_fingerprint: str) -> Path:
+        return self.directory / f"{game_log_fingerprint}.json"
+
+    def load(self, game_log_fingerprint: str) -> dict[str, dict[str, Any]]:
+        try:
+            results: dict[str, dict[str, Any]] = json.loads(self.path(game_log_fingerprint).read_text())
+        except (OSError, ValueError):
+            return {}
+        return results
+
+    def save(self, game_log_fingerprint: str, results: dict[str, dict[str, Any]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(game_log_fingerprint)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(results, indent=2))
+        os.replace(tmp_path, path)
+
+
+def assess_correctness_incremental(student_bot: AssignmentBot, game_log: AnyGameLog, store: ResultStore, jobs: int = 1,
+                                   profile: Optional[CheckProfile] = None, fail_fast: bool = False
+                                   ) -> tuple[tuple[list[list[CheckError]], list[list[CheckError]], list[list[CheckError]]], list[str]]:
+    """The same as assess_correctness, but the checks whose code and gamelog did not change since the last run are not run again.
+    Their outcome is taken from the store. Returns the errors, and the checks which were reused."""
+    game_log_fingerprint = fingerprint_game_log(game_log)
+    fingerprints = fingerprint_bot(student_bot)
+    previous = store.load(game_log_fingerprint)
+    reused = [check for check in CHECKS if check in fingerprints and previous.get(check, {}).get("fingerprint") == fingerprints[check]]
+    to_run = [check for check in CHECKS if check not in reused]
+
+    condition_errors, action_errors, integration_errors = assess_correctness(student_bot, game_log, jobs=jobs, profile=profile, fail_fast=fail_fast, checks=to_run)
+    errors = dict(zip(CHECKS, condition_errors + action_errors + integration_errors))
+    for check in reused:
+        errors[check] = [CheckError(message) for message in previous[check]["errors"]]
+
+    if fingerprints:
+        # only the first error is shown, so only that one is kept
+        store.save(game_log_fingerprint, {check: {"fingerprint": fingerprints[check], "errors": [str(error) for error in errors[check][:1]]} for check in CHECKS})
+    return ([errors[check] for check in CONDITION_CHECKS], [errors[check] for check in ACTION_CHECKS], [errors[INTEGRATION_CHECK]]), reused
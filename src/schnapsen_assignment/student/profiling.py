@@ -0,0 +1,93 @@
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+R = TypeVar('R')
+
+
+@dataclass
+class CheckTiming:
+    games: int = 0
+    """The number of games in which the check took part"""
+    calls: int = 0
+    """The number of calls to the student code"""
+    student_seconds: float = 0.0
+    engine_seconds: float = 0.0
+    """The time of the replays outside of the student code. The engine time of a game which is shared by several checks is split evenly between them."""
+
+    @property
+    def wall_seconds(self) -> float:
+        return self.student_seconds + self.engine_seconds
+
+
+@dataclass
+class ReplayTiming:
+    games: int = 0
+    wall_seconds: float = 0.0
+    student_seconds: float = 0.0
+
+    @property
+    def engine_seconds(self) -> float:
+        return self.wall_seconds - self.student_seconds
+
+
+class CheckProfile:
+    """Collects where the time of a check run goes: in the student code, or in the replay of the games around it."""
+
+    def __init__(self, checks: Iterable[str]) -> None:
+        self.checks = {check: CheckTiming() for check in checks}
+        self.replays = {"shared": ReplayTiming(), "integration": ReplayTiming()}
+        self.trace_events: list[dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._game_student_seconds = 0.0
+
+    def call(self, check: str, implementation: Callable[..., R], *args: Any) -> R:
+        """Call the student code for the check, and account the time to it."""
+        start = time.perf_counter()
+        try:
+            return implementation(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            timing = self.checks[check]
+            timing.calls += 1
+            timing.student_seconds += elapsed
+            self._game_student_seconds += elapsed
+
+    @contextmanager
+    def game(self, replay: str, game_id: int, checks: list[str]) -> Iterator[None]:
+        """Time the replay of one game, in which the given checks take part."""
+        self._game_student_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            engine = wall - self._game_student_seconds
+            replay_timing = self.replays[replay]
+            replay_timing.games += 1
+            replay_timing.wall_seconds += wall
+            replay_timing.student_seconds += self._game_student_seconds
+            for check in checks:
+                self.checks[check].games += 1
+                self.checks[check].engine_seconds += engine / len(checks)
+            self.trace_events.append({"name": f"game {game_id}", "cat": replay, "ph": "X", "pid": 0, "tid": 0,
+                                      "ts": (start - self._start) * 1e6, "dur": wall * 1e6,
+                                      "args": {"checks": checks, "student_ms": self._game_student_seconds * 1000}})
+
+    def report(self) -> str:
+        lines = [f"{'check':<14}{'games':>8}{'calls':>10}{'student s':>12}{'engine s':>12}{'wall s':>10}{'us/call':>10}"]
+        for check, timing in self.checks.items():
+            per_call = timing.student_seconds / timing.calls * 1e6 if timing.calls else 0.0
+            lines.append(f"{check:<14}{timing.games:>8}{timing.calls:>10}{timing.student_seconds:>12.3f}{timing.engine_seconds:>12.3f}{timing.wall_seconds:>10.3f}{per_call:>10.1f}")
+        lines.append("")
+        lines.append(f"{'replay':<14}{'games':>8}{'':>10}{'student s':>12}{'engine s':>12}{'wall s':>10}")
+        for replay, replay_timing in self.replays.items():
+            lines.append(f"{replay:<14}{replay_timing.games:>8}{'':>10}{replay_timing.student_seconds:>12.3f}{replay_timing.engine_seconds:>12.3f}{replay_timing.wall_seconds:>10.3f}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Write the replayed games as a trace which can be opened in chrome://tracing or Perfetto."""
+        path.write_text(json.dumps({"traceEvents": self.trace_events, "displayTimeUnit": "ms"}))
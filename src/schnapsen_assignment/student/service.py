@@ -0,0 +1,454 @@
+"""The checker as a long running local service.
+
+The service keeps a pool of worker processes, which have the checker imported, and the gamelogs it has seen in memory.
+Clients submit (bot module, student ID) jobs over HTTP, on a TCP port or a Unix socket:
+
+    POST /jobs         {"bot": "/path/to/bot.py", "student_id": 2712345} or {"bot": ..., "gamelog": "/path/to/file.gamelog"},
+                       optionally with "submitter", "fail_fast" and "timeout". Responds with the job, status 202
+    GET  /jobs/<id>    the job, with its result once it is done. With ?wait=<seconds>, waits at most that long for the job to finish
+    GET  /status       the number of queued and running jobs, and of the gamelogs in memory
+
+The jobs are run in the order in which they were submitted, but round robin between the submitters,
+such that a submitter who queues a whole course does not block everybody else.
+The submitter is given in the job, and defaults to the address of the client.
+
+A job which runs longer than its timeout, the one of the service or a shorter one given in the job, fails.
+Its worker cannot be interrupted, so all workers are killed and the pool is started again. The other jobs which were running on it are queued again.
+When a worker dies, e.g., because a bot exited the process, the pool is started again as well, and the jobs which were running on it are retried once.
+"""
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import functools
+import hashlib
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import os
+from pathlib import Path
+import socket
+import socketserver
+import threading
+import time
+import traceback
+from typing import Any, Optional, Union, cast
+from urllib.parse import parse_qs, urlparse
+
+from schnapsen_assignment.student.gamelog_cache import GamelogCache
+
+# the number of finished jobs kept for clients to collect, the oldest ones are dropped first
+MAX_FINISHED_JOBS = 10_000
+# the number of parsed gamelogs every worker keeps
+WORKER_GAME_LOGS = 64
+# the number of serialized gamelogs the service keeps, the least recently used ones are dropped first
+GAME_LOGS = 256
+# how often a job is run again when the pool broke while it was running
+JOB_RETRIES = 1
+
+_worker_game_logs: "OrderedDict[str, Any]" = OrderedDict()
+
+
+def _warm_worker() -> None:
+    # everything a job needs is imported once, when the worker starts
+    import schnapsen_assignment.student.batch  # noqa: F401
+    import schnapsen_assignment.student.checker  # noqa: F401
+
+
+def _ping(_: int) -> int:
+    return os.getpid()
+
+
+def _check_task(bot_path: str, game_log_key: str, serialized: bytes, fail_fast: bool) -> tuple[list[list[str]], list[list[str]], list[list[str]]]:
+    """Check the bot against the game log in a worker. The game log is passed serialized, and parsed only if this worker has not seen it before."""
+    from schnapsen_assignment.serialization import GameLog
+    from schnapsen_assignment.student.batch import load_bot_class
+    from schnapsen_assignment.student.checker import assess_correctness
+
+    game_log = _worker_game_logs.get(game_log_key)
+    if game_log is None:
+        game_log = GameLog.FromString(serialized)
+        _worker_game_logs[game_log_key] = game_log
+        if len(_worker_game_logs) > WORKER_GAME_LOGS:
+            _worker_game_logs.popitem(last=False)
+    else:
+        _worker_game_logs.move_to_end(game_log_key)
+    student_bot = load_bot_class(Path(bot_path))()
+    condition_errors, action_errors, integration_errors = assess_correctness(student_bot, game_log, fail_fast=fail_fast)
+    # the errors are formatted here, the perspectives they refer to stay in the worker
+    return ([[str(error) for error in errors] for errors in condition_errors],
+            [[str(error) for error in errors] for errors in action_errors],
+            [[str(error) for error in errors] for errors in integration_errors])
+
+
+class Job:
+    def __init__(self, id: int, bot: str, source: str, game_log: tuple[str, bytes], submitter: str, fail_fast: bool,
+                 timeout: Optional[float] = None) -> None:
+        self.id = id
+        self.bot = bot
+        self.source = source
+        """The student ID or gamelog path the bot is checked against"""
+        self.game_log = game_log
+        """The key and content of the serialized gamelog, shared with the cache of the service"""
+        self.submitter = submitter
+        self.fail_fast = fail_fast
+        self.timeout = timeout
+        """The number of seconds the job may run, None for no limit"""
+        self.status = "queued"
+        self.result: Optional[tuple[list[list[str]], list[list[str]], list[list[str]]]] = None
+        """The errors of the conditions, actions and integration, as returned by assess_correctness, formatted"""
+        self.error: Optional[str] = None
+        """Set in case the bot could not be checked at all, e.g., because it could not be imported"""
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.deadline: Optional[float] = None
+        """The time.monotonic() at which the running job times out"""
+        self.executor: Optional[ProcessPoolExecutor] = None
+        """The pool the job is running on"""
+        self.timed_out = False
+        self.interrupted = False
+        """Set when the pool was killed because another job timed out, the job is then queued again"""
+        self.retries = 0
+        self.done = threading.Event()
+
+    def to_json(self) -> dict[str, Any]:
+        passed = self.result is not None and not any(errors for check_errors in self.result for errors in check_errors)
+        return {"id": self.id, "bot": self.bot, "source": self.source, "submitter": self.submitter, "status": self.status,
+                "passed": passed if self.status == "done" else None,
+                "timeout": self.timeout,
+                "conditions": self.result[0] if self.result else None,
+                "actions": self.result[1] if self.result else None,
+                "integration": self.result[2] if self.result else None,
+                "error": self.error,
+                "queued_seconds": (self.started or time.time()) - self.submitted,
+                "run_seconds": (self.finished or time.time()) - self.started if self.started else None}
+
+
+class CheckService:
+    """Queues check jobs, and runs them in a warm pool of worker processes, fairly between the submitters."""
+
+    def __init__(self, cache: GamelogCache, workers: int = 1, offline: bool = False, job_timeout: Optional[float] = None) -> None:
+        self.cache = cache
+        self.offline = offline
+        self.workers = workers
+        self.job_timeout = job_timeout
+        """The number of seconds a job may run, None for no limit"""
+        self._game_logs: "OrderedDict[str, tuple[str, bytes]]" = OrderedDict()
+        """The serialized gamelogs, and a key for them which changes when the content changes, by the path and modification time of their file"""
+        self._game_logs_lock = threading.Lock()
+        self._jobs: dict[int, Job] = {}
+        self._queues: "OrderedDict[str, deque[Job]]" = OrderedDict()
+        self._running: set[Job] = set()
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = self._new_executor()
+        # start all workers now, instead of at the first jobs
+        list(self._executor.map(_ping, range(workers)))
+        self._dispatcher = threading.Thread(target=self._dispatch, name="check-dispatcher", daemon=True)
+        self._dispatcher.start()
+        self._watchdog = threading.Thread(target=self._watch, name="check-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+
+    def _game_log(self, student_id: Optional[int], gamelog: Optional[Path]) -> tuple[str, bytes]:
+        """The key and content of the gamelog, from memory if it was used before.
+
+        The gamelog of a student ID is revalidated with the server first, which downloads it again only if it changed.
+        A gamelog file is read again when it was modified.
+        """
+        # one at a time, such that a gamelog needed by several jobs is fetched once
+        with self._game_logs_lock:
+            if gamelog is None:
+                assert student_id is not None
+                if not self.offline:
+                    self.cache.refresh(student_id)
+                elif not self.cache.is_valid(student_id):
+                    raise Exception(f"No valid cached gamelog for {student_id} in {self.cache.directory}")
+            path = gamelog.resolve() if gamelog is not None else self.cache.gamelog_path(cast(int, student_id))
+            source = f"{path}:{path.stat().st_mtime_ns}"
+            if source in self._game_logs:
+                self._game_logs.move_to_end(source)
+                return self._game_logs[source]
+            if gamelog is not None:
+                from schnapsen_assignment.serialization import read_game_log
+                with open(gamelog, "rb") as f:
+                    serialized = read_game_log(f).SerializeToString()
+            else:
+                serialized = self.cache.load(cast(int, student_id)).SerializeToString()
+            self._game_logs[source] = (hashlib.sha256(serialized).hexdigest(), serialized)
+            if len(self._game_logs) > GAME_LOGS:
+                self._game_logs.popitem(last=False)
+            return self._game_logs[source]
+
+    def submit(self, bot: Path, submitter: str, student_id: Optional[int] = None, gamelog: Optional[Path] = None, fail_fast: bool = False,
+               timeout: Optional[float] = None) -> Job:
+        """Queue a job. The gamelog is fetched, or read, right away, such that problems with it are reported to the submitter.
+
+        The job may run for timeout seconds, at most as long as the timeout of the service.
+        """
+        if (student_id is None) == (gamelog is None):
+            raise ValueError("Give either a student ID or a gamelog")
+        if not bot.is_file():
+            raise ValueError(f"No bot module at {bot}")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("The timeout must be a positive number of seconds")
+        game_log = self._game_log(student_id, gamelog)
+        if timeout is None or (self.job_timeout is not None and self.job_timeout < timeout):
+            timeout = self.job_timeout
+        with self._condition:
+            if self._closed:
+                raise ValueError("The service is shutting down")
+            job = Job(next(self._ids), str(bot.resolve()), str(gamelog) if gamelog is not None else str(student_id), game_log, submitter, fail_fast, timeout)
+            self._jobs[job.id] = job
+            self._queues.setdefault(submitter, deque()).append(job)
+            self._condition.notify_all()
+        return job
+
+    def job(self, id: int) -> Optional[Job]:
+        with self._condition:
+            return self._jobs.get(id)
+
+    def status(self) -> dict[str, Any]:
+        with self._condition:
+            return {"workers": self.workers,
+                    "running": len(self._running),
+                    "queued": {submitter: len(queue) for submitter, queue in self._queues.items()},
+                    "jobs": len(self._jobs),
+                    "gamelogs": len(self._game_logs)}
+
+    def _next_job(self) -> Optional[Job]:
+        """The first job of the submitter whose turn it is, who then goes to the back of the line. None when the service is closed."""
+        with self._condition:
+            while not self._closed and (len(self._running) >= self.workers or not self._queues):
+                self._condition.wait()
+            if self._closed:
+                return None
+            submitter, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(submitter)
+            else:
+                del self._queues[submitter]
+            self._running.add(job)
+            job.status = "running"
+            job.started = time.time()
+            job.deadline = time.monotonic() + job.timeout if job.timeout is not None else None
+            # the watchdog waits for the new deadline
+            self._condition.notify_all()
+            return job
+
+    def _dispatch(self) -> None:
+        # at most one job per worker is handed to the pool, the order of the others is decided here, not by the queue of the pool
+        while (job := self._next_job()) is not None:
+            try:
+                # the pool is not replaced while the job is handed to it
+                with self._condition:
+                    job.executor = self._executor
+                    future = job.executor.submit(_check_task, job.bot, *job.game_log, job.fail_fast)
+            except BrokenProcessPool:
+                self._broken(job)
+                continue
+            except Exception:
+                self._finish(job, None, traceback.format_exc(limit=-1))
+                continue
+            future.add_done_callback(functools.partial(self._completed, job))
+
+    def _completed(self, job: Job, future: "Future[Any]") -> None:
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            self._broken(job)
+        except CancelledError:
+            # the pool was shut down before the job started
+            self._interrupted(job)
+        except Exception:
+            self._finish(job, None, traceback.format_exc(limit=-1))
+        else:
+            self._finish(job, result, None)
+
+    def _broken(self, job: Job) -> None:
+        """The pool broke while the job was running on it: it was killed because a job timed out, or a worker died."""
+        with self._condition:
+            if job.executor is self._executor:
+                self._restart_pool()
+            self._interrupted(job)
+
+    def _interrupted(self, job: Job) -> None:
+        """Fail the job, or queue it again, after the pool it was running on went away."""
+        with self._condition:
+            if job.timed_out:
+                self._finish(job, None, f"The check did not finish within {job.timeout:g} seconds")
+            elif self._closed:
+                self._finish(job, None, "The service shut down while checking the bot")
+            elif not job.interrupted and job.retries >= JOB_RETRIES:
+                self._finish(job, None, "A worker process died while checking the bot")
+            else:
+                if not job.interrupted:
+                    job.retries += 1
+                # first in line again
+                self._running.discard(job)
+                job.status = "queued"
+                job.started = job.deadline = job.executor = None
+                job.interrupted = False
+                self._queues.setdefault(job.submitter, deque()).appendleft(job)
+                self._queues.move_to_end(job.submitter, last=False)
+                self._condition.notify_all()
+
+    def _restart_pool(self) -> None:
+        """Replace the pool by a new one, and kill the workers of the old one. Called with the condition held."""
+        executor = self._executor
+        if not self._closed:
+            self._executor = self._new_executor()
+        # ProcessPoolExecutor has no public way to stop a worker in the middle of a task
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _watch(self) -> None:
+        """Time out the jobs which run past their deadline, by killing the workers of the pool they run on."""
+        with self._condition:
+            while not self._closed or self._running:
+                now = time.monotonic()
+                overdue = [job for job in self._running if job.deadline is not None and job.deadline <= now and not job.timed_out]
+                for job in overdue:
+                    job.timed_out = True
+                if any(job.executor is self._executor for job in overdue):
+                    for job in self._running:
+                        if job.executor is self._executor and not job.timed_out:
+                            job.interrupted = True
+                    self._restart_pool()
+                deadlines = [job.deadline for job in self._running if job.deadline is not None and not job.timed_out]
+                self._condition.wait(min(deadlines) - now if deadlines else None)
+
+    def _finish(self, job: Job, result: Any, error: Optional[str]) -> None:
+        with self._condition:
+            job.result = result
+            job.error = error
+            job.status = "done" if error is None else "failed"
+            job.finished = time.time()
+            self._running.discard(job)
+            finished = [id for id, other in self._jobs.items() if other.finished is not None]
+            for id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[id]
+            self._condition.notify_all()
+        job.done.set()
+
+    def close(self) -> None:
+        """Stop taking jobs, cancel the queued ones, and wait for the running ones, at most until their deadline."""
+        with self._condition:
+            self._closed = True
+            queued = [job for queue in self._queues.values() for job in queue]
+            self._queues.clear()
+            for job in queued:
+                self._finish(job, None, "The service shut down before the job was run")
+            self._condition.notify_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._watchdog.join()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    server: Union["ServiceHTTPServer", "UnixServiceHTTPServer"]
+
+    def _send_json(self, status: int, content: Any) -> None:
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/status":
+            self._send_json(200, self.server.service.status())
+            return
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "jobs" or not parts[1].isdigit():
+            self._send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+        job = self.server.service.job(int(parts[1]))
+        if job is None:
+            self._send_json(404, {"error": f"Unknown job {parts[1]}"})
+            return
+        wait = parse_qs(url.query).get("wait")
+        if wait:
+            try:
+                job.done.wait(float(wait[0]))
+            except ValueError:
+                self._send_json(400, {"error": f"wait must be a number of seconds, not {wait[0]!r}"})
+                return
+        self._send_json(200, job.to_json())
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != "/jobs":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            job = self.server.service.submit(Path(request["bot"]), str(request.get("submitter") or self.address_string()),
+                                             student_id=int(request["student_id"]) if request.get("student_id") is not None else None,
+                                             gamelog=Path(request["gamelog"]) if request.get("gamelog") is not None else None,
+                                             fail_fast=bool(request.get("fail_fast", False)),
+                                             timeout=float(request["timeout"]) if request.get("timeout") is not None else None)
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": str(e) if not isinstance(e, KeyError) else f"Missing {e}"})
+            return
+        except Exception as e:
+            # fetching the gamelog failed
+            self._send_json(502, {"error": str(e)})
+            return
+        self._send_json(202, job.to_json())
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: CheckService) -> None:
+        self.service = service
+        super().__init__(address, ServiceRequestHandler)
+
+
+class UnixServiceRequestHandler(ServiceRequestHandler):
+    def address_string(self) -> str:
+        # the client address of a Unix socket is an empty string, all clients are local
+        return "local"
+
+
+class UnixServiceHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, service: CheckService) -> None:
+        self.service = service
+        if path.is_socket():
+            path.unlink()
+        super().__init__(str(path), UnixServiceRequestHandler)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: Path, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(str(self.path))
+
+
+def request(method: str, path: str, body: Optional[dict[str, Any]] = None, address: str = "127.0.0.1:8765",
+            unix_socket: Optional[Path] = None, timeout: float = 600.0) -> tuple[int, dict[str, Any]]:
+    """Send a request to a running service, at the host:port address or on the Unix socket. Returns the status and the JSON response."""
+    if unix_socket is not None:
+        connection: http.client.HTTPConnection = _UnixHTTPConnection(unix_socket, timeout)
+    else:
+        connection = http.client.HTTPConnection(address, timeout=timeout)
+    try:
+        connection.request(method, path, body=json.dumps(body) if body is not None else None, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
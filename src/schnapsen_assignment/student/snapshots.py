@@ -0,0 +1,192 @@
+import functools
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+from random import Random
+from types import ModuleType
+from typing import Any, Iterable, Optional
+
+from schnapsen.deck import Card, CardCollection, OrderedCardCollection, Suit
+from schnapsen.game import (BotState, GamePhase, GamePlayEngine, GameState, Hand, Move, PlayerPerspective, Score,
+                            SchnapsenDeckGenerator, SchnapsenHandGenerator, SchnapsenMoveValidator,
+                            SchnapsenTrickImplementer, SchnapsenTrickScorer, SimpleMoveRequester)
+
+SNAPSHOT_FORMAT_VERSION = 2
+# what loading a stale or foreign pickle raises, besides pickle.UnpicklingError
+UNPICKLING_ERRORS = (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError, ValueError)
+
+
+@functools.cache
+def code_version(*modules: ModuleType) -> str:
+    """A key which changes whenever the source of one of the modules changes, e.g., after an update of schnapsen or of the checker."""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(module.__name__.encode())
+        digest.update(Path(str(module.__file__)).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_version() -> str:
+    """The version of the code which records snapshots: the game engine, the RandBot and this module."""
+    import schnapsen.bots.rand
+    import schnapsen.deck
+    import schnapsen.game
+    return code_version(schnapsen.deck, schnapsen.game, schnapsen.bots.rand, sys.modules[__name__])
+
+
+class PerspectiveSnapshot(PlayerPerspective):
+    """A frozen copy of the inputs a bot can see at one decision point of a game.
+
+    The snapshot can be passed to the condition and action methods of a bot instead of the live perspective, without the game engine.
+    Only the information a bot can observe is kept. The methods which need the engine or the history of the game raise a NotImplementedError.
+    """
+
+    def __init__(self, perspective: PlayerPerspective, leader_move: Optional[Move]) -> None:
+        # The base class keeps the game state and engine, which are intentionally not part of the snapshot
+        self._hand = tuple(perspective.get_hand().get_cards())
+        self._trump_suit = perspective.get_trump_suit()
+        self._trump_card = perspective.get_trump_card()
+        self._talon_size = perspective.get_talon_size()
+        self._phase = perspective.get_phase()
+        self._leader = perspective.am_i_leader()
+        self._my_score = perspective.get_my_score()
+        self._opponent_score = perspective.get_opponent_score()
+        self._won_cards = tuple(perspective.get_won_cards().get_cards())
+        self._opponent_won_cards = tuple(perspective.get_opponent_won_cards().get_cards())
+        self._known_cards_of_opponent_hand = tuple(perspective.get_known_cards_of_opponent_hand().get_cards())
+        self._seen_cards = tuple(perspective.seen_cards(None).get_cards())
+        self._valid_moves = tuple(perspective.valid_moves())
+        self.leader_move = leader_move
+        """The move made by the leader of the trick, None if the bot is the leader."""
+
+    def valid_moves(self) -> list[Move]:
+        return list(self._valid_moves)
+
+    def get_hand(self) -> Hand:
+        return Hand(self._hand)
+
+    def get_my_score(self) -> Score:
+        return self._my_score
+
+    def get_opponent_score(self) -> Score:
+        return self._opponent_score
+
+    def get_trump_suit(self) -> Suit:
+        return self._trump_suit
+
+    def get_trump_card(self) -> Optional[Card]:
+        return self._trump_card
+
+    def get_talon_size(self) -> int:
+        return self._talon_size
+
+    def get_phase(self) -> GamePhase:
+        return self._phase
+
+    def get_opponent_hand_in_phase_two(self) -> Hand:
+        assert self._phase == GamePhase.TWO, "Cannot get the hand of the opponent in the first phase of the game"
+        return Hand(self._known_cards_of_opponent_hand)
+
+    def am_i_leader(self) -> bool:
+        return self._leader
+
+    def get_won_cards(self) -> CardCollection:
+        return OrderedCardCollection(self._won_cards)
+
+    def get_opponent_won_cards(self) -> CardCollection:
+        return OrderedCardCollection(self._opponent_won_cards)
+
+    def seen_cards(self, leader_move: Optional[Move]) -> CardCollection:
+        seen_cards = set(self._seen_cards)
+        if leader_move is not None:
+            seen_cards.update(leader_move.cards)
+        return OrderedCardCollection(seen_cards)
+
+    def get_known_cards_of_opponent_hand(self) -> CardCollection:
+        return OrderedCardCollection(self._known_cards_of_opponent_hand)
+
+    def get_game_history(self) -> list[tuple[PlayerPerspective, Any]]:
+        raise NotImplementedError("get_game_history is not available when checking from snapshots. Run the check without --snapshots.")
+
+    def get_engine(self) -> GamePlayEngine:
+        raise NotImplementedError("get_engine is not available when checking from snapshots. Run the check without --snapshots.")
+
+    def get_state_in_phase_two(self) -> GameState:
+        raise NotImplementedError("get_state_in_phase_two is not available when checking from snapshots. Run the check without --snapshots.")
+
+    def make_assumption(self, leader_move: Optional[Move], rand: Random) -> GameState:
+        raise NotImplementedError("make_assumption is not available when checking from snapshots. Run the check without --snapshots.")
+
+    def __repr__(self) -> str:
+        return f"PerspectiveSnapshot(hand={list(self._hand)}, trump_suit={self._trump_suit}, phase={self._phase}, leader_move={self.leader_move})"
+
+
+class SnapshotRecordingRequester(SimpleMoveRequester):
+    """Records a snapshot of the perspective at every move request, before passing the request on to the bot."""
+
+    def __init__(self) -> None:
+        self.snapshots: list[PerspectiveSnapshot] = []
+
+    def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+        self.snapshots.append(PerspectiveSnapshot(perspective, leader_move))
+        return super().get_move(bot, perspective, leader_move)
+
+
+def record_snapshots(game_id: int) -> list[PerspectiveSnapshot]:
+    """Replay the game with the given ID, exactly like the condition and action checks do, and record all decision points."""
+    from schnapsen.bots.rand import RandBot
+    requester = SnapshotRecordingRequester()
+    engine = GamePlayEngine(deck_generator=SchnapsenDeckGenerator(),
+                            hand_generator=SchnapsenHandGenerator(),
+                            trick_implementer=SchnapsenTrickImplementer(),
+                            move_requester=requester,
+                            move_validator=SchnapsenMoveValidator(),
+                            trick_scorer=SchnapsenTrickScorer())
+    randbot = RandBot(Random(12345678910 + game_id))
+    engine.play_game(randbot, randbot, Random(game_id))
+    return requester.snapshots
+
+
+class SnapshotStore:
+    """Snapshots of the decision points of games, stored on disk as one pickle file per game ID.
+
+    The games of the condition and action checks only depend on the game ID, so the snapshots can be shared between all student IDs.
+    Every file also holds the snapshot_version of the code which recorded it.
+    Missing snapshots, and those recorded by other code or which cannot be unpickled, are recorded by replaying the game once.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory / "snapshots" / f"v{SNAPSHOT_FORMAT_VERSION}"
+        self._loaded: dict[int, list[PerspectiveSnapshot]] = {}
+        self.version = snapshot_version()
+
+    def path(self, game_id: int) -> Path:
+        return self.directory / f"{game_id}.pickle"
+
+    def read(self, game_id: int) -> Optional[list[PerspectiveSnapshot]]:
+        """The stored snapshots of the game, None if there are none, or they were recorded by other code."""
+        try:
+            version, snapshots = pickle.loads(self.path(game_id).read_bytes())
+        except (OSError, *UNPICKLING_ERRORS):
+            return None
+        return snapshots if version == self.version else None
+
+    def get(self, game_id: int) -> list[PerspectiveSnapshot]:
+        snapshots = self._loaded.get(game_id)
+        if snapshots is None:
+            snapshots = self.read(game_id)
+            if snapshots is None:
+                snapshots = record_snapshots(game_id)
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path(game_id).with_name(f"{game_id}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(pickle.dumps((self.version, snapshots), protocol=pickle.HIGHEST_PROTOCOL))
+                os.replace(tmp_path, self.path(game_id))
+            self._loaded[game_id] = snapshots
+        return snapshots
+
+    def prepare(self, game_ids: Iterable[int]) -> None:
+        """Make sure the snapshots of all given games are loaded or recorded."""
+        for game_id in game_ids:
+            self.get(game_id)
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from dataclasses import dataclass
+
+CLI_MODULE = "schnapsen_assignment.student.check_implementation"
+CHECKER_MODULE = "schnapsen_assignment.student.checker"
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    """The nesting of the import, 0 for the modules imported by the statement itself"""
+
+
+def parse_import_times(stderr: str) -> list[ImportTime]:
+    """Parse the `import time: self | cumulative | name` lines which python -X importtime writes to stderr."""
+    times: list[ImportTime] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            # the header line
+            continue
+        # one space after the bar, and two more for every level of nesting
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), depth))
+    return times
+
+
+def _run_importtime(code: str) -> list[ImportTime]:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"Running {code!r} failed:\n{result.stderr}")
+    return parse_import_times(result.stderr)
+
+
+def measure_import(module: str) -> list[ImportTime]:
+    """The imports caused by importing the module in a fresh interpreter, without those the interpreter makes at startup anyway."""
+    startup = {import_time.name for import_time in _run_importtime("pass")}
+    return [import_time for import_time in _run_importtime(f"import {module}") if import_time.name not in startup]
+
+
+def total_ms(import_times: list[ImportTime]) -> float:
+    return sum(import_time.cumulative_us for import_time in import_times if import_time.depth == 0) / 1000
+
+
+def protobuf_implementation() -> str:
+    """The protobuf backend in use: upb or cpp are implemented in C, python is several times slower at parsing gamelogs."""
+    from google.protobuf.internal import api_implementation
+    return str(api_implementation.Type())
@@ -0,0 +1,66 @@
+"""Game logs and bots for the tests, such that they do not need the server."""
+from collections import Counter
+import functools
+import re
+from typing import Any, Callable, Optional
+import zlib
+
+from schnapsen.game import Move, PlayerPerspective
+
+from schnapsen_assignment.serialization import GameLog
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import CheckError, simple_perspective_string
+from schnapsen_assignment.student.generate import generate_game_log
+
+
+@functools.cache
+def _generated(games: int) -> bytes:
+    return generate_game_log(range(games)).SerializeToString()
+
+
+def generated_game_log(games: int = 20) -> GameLog:
+    """A fresh copy of the game log of the reference bot for the first games game IDs."""
+    return GameLog.FromString(_generated(games))
+
+
+def error_messages(errors: tuple[list[list[CheckError]], ...]) -> list[list[list[str]]]:
+    """The messages of the errors returned by the assess_correctness functions, without the addresses of the objects in them, which can be compared."""
+    return [[[re.sub(" at 0x[0-9a-f]+", "", str(error)) for error in check_errors] for check_errors in errors_of_kind] for errors_of_kind in errors]
+
+
+class BuggyBot(AssignmentBot):
+    """The reference bot, with bugs in condition3, action2 and action4 which show up in a part of the decisions, chosen by the seed.
+
+    Whether a decision is buggy only depends on its perspective, such that the bugs are the same in every replay and process.
+    """
+
+    def __init__(self, seed: int = 0, rate: int = 5) -> None:
+        super().__init__()
+        self.seed = seed
+        self.rate = rate
+
+    def buggy(self, check: str, perspective: PlayerPerspective, leader_move: Optional[Move]) -> bool:
+        return zlib.crc32(f"{self.seed} {check} {simple_perspective_string(perspective, leader_move)}".encode()) % self.rate == 0
+
+    def condition3(self, perspective: PlayerPerspective, leader_move: Optional[Move]) -> bool:
+        return super().condition3(perspective, leader_move) != self.buggy("condition3", perspective, leader_move)
+
+    def action2(self, perspective: PlayerPerspective, leader_move: Optional[Move]) -> Move:
+        if self.buggy("action2", perspective, leader_move):
+            return perspective.valid_moves()[-1]
+        return super().action2(perspective, leader_move)
+
+    def action4(self, perspective: PlayerPerspective, leader_move: Optional[Move]) -> Move:
+        if self.buggy("action4", perspective, leader_move):
+            return perspective.valid_moves()[0]
+        return super().action4(perspective, leader_move)
+
+
+def count_calls(bot: AssignmentBot, check: str, calls: Counter[str]) -> None:
+    """Count the calls to the method of the check in calls, with a wrapper which does not keep the name of the method."""
+    method: Callable[..., Any] = getattr(bot, check)
+
+    def wrapper(*args: Any) -> Any:
+        calls[check] += 1
+        return method(*args)
+    setattr(bot, check, wrapper)
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+from schnapsen_assignment.serialization import encode_compact
+from schnapsen_assignment.student.batch import BOT_RETRIES, CHECKS, run_batch, write_summary
+
+from fixtures import generated_game_log
+
+BUGGY_CONDITION2 = """from schnapsen_assignment.student.bot import AssignmentBot as Base
+
+
+class AssignmentBot(Base):
+    def condition2(self, perspective, leader_move):
+        return not super().condition2(perspective, leader_move)
+"""
+
+
+def overriding_condition1(body: str, imports: str = "") -> str:
+    return (f"{imports}from schnapsen_assignment.student.bot import AssignmentBot as Base\n\n\n"
+            f"class AssignmentBot(Base):\n"
+            f"    def condition1(self, perspective, leader_move):\n"
+            f"        {body}\n")
+
+
+BOTS = {
+    "good": "from schnapsen_assignment.student.bot import AssignmentBot\n",
+    "buggy": BUGGY_CONDITION2,
+    "crashing": overriding_condition1("os._exit(1)", "import os\n"),
+    "exiting": overriding_condition1("sys.exit(1)", "import sys\n"),
+    "hanging": overriding_condition1("while True: pass"),
+    "unimportable": "raise ImportError('missing dependency')\n",
+}
+
+
+class BatchTest(TestCase):
+    def test_run_batch(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            bots = Path(directory) / "bots"
+            gamelogs = Path(directory) / "gamelogs"
+            bots.mkdir()
+            gamelogs.mkdir()
+            game_log = generated_game_log(3)
+            for name, source in BOTS.items():
+                (bots / f"{name}.py").write_text(source)
+                (gamelogs / f"{name}.gamelog").write_bytes(game_log.SerializeToString())
+            # the gamelogs may be compact as well
+            (gamelogs / "good.gamelog").write_bytes(encode_compact(game_log))
+            (bots / "without_gamelog.py").write_text(BOTS["good"])
+
+            results = {result.student: result for result in run_batch(bots, gamelogs, Path(directory) / "cache", jobs=2, timeout=5)}
+            self.assertEqual(sorted(results), sorted([*BOTS, "without_gamelog"]))
+            self.assertTrue(results["good"].passed(), results["good"])
+            self.assertEqual(set(results["good"].checks), set(CHECKS))
+            # the bot plays differently in the integration games as well
+            self.assertEqual([check for check, result in results["buggy"].checks.items() if not result.passed], ["condition2", "integration"])
+            self.assertIn("worker process died", results["crashing"].error or "")
+            self.assertIn("SystemExit", results["exiting"].error or "")
+            self.assertIn("did not finish within 5 seconds", results["hanging"].error or "")
+            self.assertIn("missing dependency", results["unimportable"].error or "")
+            self.assertIn("No gamelog", results["without_gamelog"].error or "")
+            self.assertEqual(BOT_RETRIES, 1)
+
+            write_summary(list(results.values()), Path(directory) / "summary.json")
+            summary = json.loads((Path(directory) / "summary.json").read_text())
+            self.assertEqual(len(summary), len(results))
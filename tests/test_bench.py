@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from schnapsen_assignment.student.bench import Measurement, compare, run_benchmarks, to_json
+from schnapsen_assignment.student.bot import AssignmentBot
+
+
+class BenchTest(TestCase):
+    def test_run_benchmarks(self) -> None:
+        results = run_benchmarks(AssignmentBot(), games=2, repeat=1)
+        self.assertIn("gamelog_parse", results)
+        self.assertIn("replay_integration", results)
+        self.assertIn("call_action4", results)
+        self.assertTrue(all(measurement.value > 0 for measurement in results.values()))
+        stored = to_json(results, games=2, repeat=1)
+        self.assertEqual(stored["results"]["replay_action1"]["unit"], "games/s")
+        self.assertEqual(compare(results, stored, tolerance=0.0), [])
+
+    def test_compare(self) -> None:
+        baseline = to_json({"replay": Measurement(100.0, "games/s", True), "call": Measurement(10.0, "us/call", False)}, games=1, repeat=1)
+        self.assertEqual(compare({"replay": Measurement(95.0, "games/s", True), "call": Measurement(10.5, "us/call", False)}, baseline, 0.1), [])
+        regressions = compare({"replay": Measurement(80.0, "games/s", True), "call": Measurement(12.0, "us/call", False)}, baseline, 0.1)
+        self.assertEqual([regression.split(":")[0] for regression in regressions], ["replay", "call"])
+        # faster is never a regression, and benchmarks missing from the baseline are ignored
+        self.assertEqual(compare({"replay": Measurement(200.0, "games/s", True), "new": Measurement(1.0, "ms", False)}, baseline, 0.0), [])
@@ -0,0 +1,74 @@
+"""Benchmarks of the checker and the bot, on game logs generated locally.
+
+Run with `pytest tests/test_benchmarks.py`, use `--benchmark-json` to store the results, and `--benchmark-compare` to compare against stored ones.
+The replay benchmarks report the time per round, which replays every game of the game log once. The call benchmarks call the method at every decision point once per round.
+"""
+import itertools
+from typing import Any, Callable, Optional
+
+import pytest
+from schnapsen.game import Move, PlayerPerspective
+
+from schnapsen_assignment.serialization import GameLog, to_schnapsen_moves
+from schnapsen_assignment.student.bench import record_perspectives
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import ACTION_CHECKS, CONDITION_CHECKS, check_action_game, check_condition_game, check_integration_game
+
+from fixtures import generated_game_log
+
+pytest.importorskip("pytest_benchmark")
+
+GAMES = 10
+
+
+@pytest.fixture(scope="module")
+def game_log() -> GameLog:
+    return generated_game_log(GAMES)
+
+
+@pytest.fixture(scope="module")
+def perspectives() -> list[tuple[PlayerPerspective, Optional[Move]]]:
+    return record_perspectives(range(GAMES))
+
+
+def test_gamelog_parse(benchmark: Any, game_log: GameLog) -> None:
+    serialized = game_log.SerializeToString()
+    assert benchmark(GameLog.FromString, serialized) == game_log
+
+
+def test_move_conversion(benchmark: Any, game_log: GameLog) -> None:
+    action_logs = [log for check in ACTION_CHECKS + ("integration",) for log in getattr(game_log, check)]
+    benchmark(lambda: [to_schnapsen_moves(log.outcomes) for log in action_logs])
+
+
+@pytest.mark.parametrize("check", CONDITION_CHECKS)
+def test_replay_condition(benchmark: Any, game_log: GameLog, check: str) -> None:
+    bot = AssignmentBot()
+    errors = benchmark(lambda: [check_condition_game(getattr(bot, check), log) for log in getattr(game_log, check)])
+    assert not any(errors)
+
+
+@pytest.mark.parametrize("check", ACTION_CHECKS)
+def test_replay_action(benchmark: Any, game_log: GameLog, check: str) -> None:
+    bot = AssignmentBot()
+    if check == "action1":
+        # action1 is only checked where condition1 holds
+        def run() -> list[Any]:
+            return [check_action_game(bot.action1, log, iter(list(condition_log.outcomes))) for log, condition_log in zip(game_log.action1, game_log.condition1)]
+    else:
+        def run() -> list[Any]:
+            return [check_action_game(getattr(bot, check), log, itertools.repeat(True)) for log in getattr(game_log, check)]
+    assert not any(benchmark(run))
+
+
+def test_replay_integration(benchmark: Any, game_log: GameLog) -> None:
+    bot = AssignmentBot()
+    errors = benchmark(lambda: [check_integration_game(bot, log) for log in game_log.integration])
+    assert not any(errors)
+
+
+@pytest.mark.parametrize("check", CONDITION_CHECKS + ACTION_CHECKS)
+def test_call(benchmark: Any, perspectives: list[tuple[PlayerPerspective, Optional[Move]]], check: str) -> None:
+    method: Callable[[PlayerPerspective, Optional[Move]], Any] = getattr(AssignmentBot(), check)
+    benchmark.extra_info["calls"] = len(perspectives)
+    benchmark(lambda: [method(perspective, leader_move) for perspective, leader_move in perspectives])
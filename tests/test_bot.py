@@ -0,0 +1,72 @@
+from random import Random
+from typing import Any, Callable
+from unittest import TestCase
+
+from schnapsen.bots.rand import RandBot
+from schnapsen.game import Bot, BotState, Move, PlayerPerspective, SimpleMoveRequester
+
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.generate import engine_with
+
+from baseline_bot import BaselineBot
+
+CONDITIONS = ("condition1", "condition2", "condition3")
+ACTIONS = ("action2", "action3", "action4")
+
+
+class ComparingRequester(SimpleMoveRequester):
+    """Calls every condition and action of both bots at every decision, and reports where they disagree."""
+
+    def __init__(self, compare: Callable[[Any, Any, str], None]) -> None:
+        self.compare = compare
+        self.decisions = 0
+        self.bot = AssignmentBot()
+        self.baseline = BaselineBot()
+
+    def get_move(self, bot: BotState, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+        self.decisions += 1
+        cache = self.bot.decision_cache(perspective)
+        for name in CONDITIONS + ACTIONS:
+            self.compare(getattr(self.bot, name)(perspective, leader_move), getattr(self.baseline, name)(perspective, leader_move), name)
+        # action1 is only specified, and checked, where condition1 holds
+        if self.baseline.condition1(perspective, leader_move):
+            self.compare(self.bot.action1(perspective, leader_move), self.baseline.action1(perspective, leader_move), "action1")
+        self.compare(self.bot.get_move(perspective, leader_move), self.baseline.get_move(perspective, leader_move), "get_move")
+        # all methods share one cache, so however many of them use a fact, it is derived from the perspective at most once per decision
+        self.compare(self.bot.last_decision_cache is cache, True, "shared cache")
+        self.compare({name: count for name, count in cache.queries.items() if count > 1}, {}, "queries")
+        self.compare(cache.queries["valid_moves"], 1, "valid_moves queries")
+        return super().get_move(bot, perspective, leader_move)
+
+
+class BotEquivalenceTest(TestCase):
+    def play(self, game_ids: range, opponent: Callable[[int], Bot], bot: Callable[[int], Bot]) -> int:
+        decisions = 0
+        for game_id in game_ids:
+            def compare(outcome: Any, expected: Any, name: str) -> None:
+                self.assertEqual(outcome, expected, f"{name} differs in game {game_id}")
+            requester = ComparingRequester(compare)
+            engine_with(requester).play_game(bot(game_id), opponent(game_id), Random(game_id))
+            decisions += requester.decisions
+        return decisions
+
+    def test_random_games(self) -> None:
+        def randbot(game_id: int) -> Bot:
+            return RandBot(Random(12345678910 + game_id))
+        self.assertGreater(self.play(range(300), randbot, randbot), 0)
+
+    def test_overrides_with_the_original_signature(self) -> None:
+        class NoMarriageBot(AssignmentBot):
+            def condition1(self, perspective: PlayerPerspective, leader_move: Move | None) -> bool:
+                return False
+
+            def action1(self, perspective: PlayerPerspective, leader_move: Move | None) -> Move:
+                raise AssertionError("action1 is only played where condition1 holds")
+
+        for game_id in range(20):
+            engine_with(SimpleMoveRequester()).play_game(NoMarriageBot(), RandBot(Random(game_id)), Random(game_id))
+
+    def test_games_of_the_bot(self) -> None:
+        def randbot(game_id: int) -> Bot:
+            return RandBot(Random(game_id))
+        self.assertGreater(self.play(range(300), randbot, lambda _: AssignmentBot()), 0)
@@ -0,0 +1,96 @@
+from collections import Counter
+import itertools
+from pathlib import Path
+from random import Random
+import tempfile
+from unittest import TestCase
+
+from schnapsen_assignment.serialization import GameLog
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import (ACTION_CHECKS, CONDITION_CHECKS, INTEGRATION_CHECK, CheckError, assess_actions_correctness, assess_conditions_correctness,
+                                                  assess_correctness, assess_correctness_from_snapshots, assess_integration_correctness,
+                                                  sample_game_log)
+from schnapsen_assignment.student.snapshots import SnapshotStore
+
+from fixtures import BuggyBot, count_calls, error_messages, generated_game_log
+
+SEEDS = range(3)
+CHECKS = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)
+
+
+def assess_separately(student_bot: AssignmentBot, game_log: GameLog,
+                      fail_fast: bool = False) -> tuple[list[list[CheckError]], list[list[CheckError]], list[list[CheckError]]]:
+    """Every check in replays of its own, as before the shared replay."""
+    condition_errors = [assess_conditions_correctness(getattr(student_bot, check), getattr(game_log, check), fail_fast) for check in CONDITION_CHECKS]
+    action1_conditions = iter([iter(list(cond_log.outcomes)) for cond_log in game_log.condition1])
+    action_errors = [assess_actions_correctness(getattr(student_bot, check), getattr(game_log, check), action1_conditions if check == "action1" else None, fail_fast)
+                     for check in ACTION_CHECKS]
+    return condition_errors, action_errors, [assess_integration_correctness(student_bot, game_log.integration, fail_fast=fail_fast)]
+
+
+class CheckerEquivalenceTest(TestCase):
+    """The ways of checking report the same errors as replaying every check on its own, for bots with bugs in condition3, action2 and action4."""
+
+    def setUp(self) -> None:
+        self.game_log = generated_game_log()
+        self.expected = {(seed, fail_fast): error_messages(assess_separately(BuggyBot(seed), self.game_log, fail_fast))
+                         for seed, fail_fast in itertools.product(SEEDS, (False, True))}
+        for (condition_errors, action_errors, _) in self.expected.values():
+            self.assertEqual([bool(errors) for errors in condition_errors + action_errors], [False, False, True, False, True, False, True])
+
+    def test_shared_replay(self) -> None:
+        for (seed, fail_fast), expected in self.expected.items():
+            with self.subTest(seed=seed, fail_fast=fail_fast):
+                self.assertEqual(error_messages(assess_correctness(BuggyBot(seed), self.game_log, fail_fast=fail_fast)), expected)
+
+    def test_jobs(self) -> None:
+        for (seed, fail_fast), expected in self.expected.items():
+            with self.subTest(seed=seed, fail_fast=fail_fast):
+                self.assertEqual(error_messages(assess_correctness(BuggyBot(seed), self.game_log, jobs=3, fail_fast=fail_fast)), expected)
+
+    def test_snapshots(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(Path(directory))
+            for (seed, fail_fast), expected in self.expected.items():
+                with self.subTest(seed=seed, fail_fast=fail_fast):
+                    self.assertEqual(error_messages(assess_correctness_from_snapshots(BuggyBot(seed), self.game_log, store, fail_fast)), expected)
+
+
+class FailFastTest(TestCase):
+    def test_only_the_first_error_is_reported(self) -> None:
+        game_log = generated_game_log()
+        bot = BuggyBot(rate=2)
+        errors = [check_errors for errors_of_kind in assess_correctness(bot, game_log) for check_errors in errors_of_kind]
+        first_errors = [check_errors for errors_of_kind in assess_correctness(bot, game_log, fail_fast=True) for check_errors in errors_of_kind]
+        self.assertTrue(any(len(check_errors) > 1 for check_errors in errors))
+        self.assertEqual(error_messages(([check_errors[:1] for check_errors in errors],)), error_messages((first_errors,)))
+
+    def test_replay_stops_at_the_first_error(self) -> None:
+        game_log = generated_game_log()
+        for fail_fast in (False, True):
+            calls: Counter[str] = Counter()
+            # every decision of condition3 is wrong
+            bot = BuggyBot(rate=1)
+            count_calls(bot, "condition3", calls)
+            assess_correctness(bot, game_log, fail_fast=fail_fast, checks=["condition3"])
+            self.assertEqual(calls["condition3"] == 1, fail_fast)
+
+
+class SampleTest(TestCase):
+    def test_stratified_sample(self) -> None:
+        game_log = generated_game_log()
+        sample = sample_game_log(game_log, 5, Random(1))
+        self.assertEqual(sample, sample_game_log(game_log, 5, Random(1)))
+        for check in CHECKS:
+            with self.subTest(check=check):
+                # the game IDs of the generated game log are the positions, and one game is drawn from every stratum of 4 games
+                game_ids = [record.game_id for record in getattr(sample, check)]
+                self.assertEqual([game_id // 4 for game_id in game_ids], list(range(5)))
+                self.assertEqual(list(getattr(sample, check)), [getattr(game_log, check)[game_id] for game_id in game_ids])
+        # the games of all checks are at the same positions, which keeps them in the shared replay together
+        self.assertEqual({tuple(record.game_id for record in getattr(sample, check)) for check in CHECKS}, {tuple(record.game_id for record in sample.condition1)})
+        self.assertEqual(sample_game_log(game_log, 20, Random(1)), game_log)
+
+    def test_sample_of_a_correct_bot_passes(self) -> None:
+        sample = sample_game_log(generated_game_log(), 3, Random(2))
+        self.assertFalse(any(check_errors for errors_of_kind in assess_correctness(AssignmentBot(), sample) for check_errors in errors_of_kind))
@@ -0,0 +1,46 @@
+from pathlib import Path
+import pickle
+import tempfile
+import zlib
+from unittest import TestCase
+
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import assess_correctness
+from schnapsen_assignment.student.checkpoints import CheckpointStore
+
+from fixtures import generated_game_log
+
+
+class CheckpointStoreTest(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_stored_checkpoints_are_reused(self) -> None:
+        recorded = CheckpointStore(self.directory).get(3)
+        self.assertTrue(recorded)
+        self.assertEqual(CheckpointStore(self.directory).read("3"), recorded)
+
+    def test_unusable_files_are_recorded_again(self) -> None:
+        store = CheckpointStore(self.directory)
+        store.directory.mkdir(parents=True)
+        contents = {
+            # pickled by a version of the code which had a module that no longer exists
+            "1": zlib.compress(b"cschnapsen_assignment.student.randbot\nRandBot\n."),
+            # recorded by other code
+            "2": zlib.compress(pickle.dumps(("other version", []))),
+            # the format before the version was stored
+            "3": zlib.compress(pickle.dumps([])),
+            "4": b"not compressed",
+        }
+        for name, content in contents.items():
+            store.path(name).write_bytes(content)
+            with self.subTest(name=name):
+                self.assertIsNone(store.read(name))
+                self.assertTrue(store.get(int(name)))
+                self.assertEqual(CheckpointStore(self.directory).read(name), store.get(int(name)))
+
+    def test_resume_from_checkpoints(self) -> None:
+        errors = assess_correctness(AssignmentBot(), generated_game_log(5), checkpoints=CheckpointStore(self.directory), from_trick=3)
+        self.assertFalse(any(check_errors for errors_of_kind in errors for check_errors in errors_of_kind))
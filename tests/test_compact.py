@@ -0,0 +1,90 @@
+import io
+import pickle
+from typing import cast
+from unittest import TestCase, skipUnless
+
+from schnapsen_assignment.serialization import (ActionGameLog, Card, CompactGameLog, ConditionGameLog, GameLog, Move, MoveType, encode_compact,
+                                                read_compact, read_game_log)
+from schnapsen_assignment.serialization.compact import zstd_available
+from schnapsen_assignment.serialization.stream import SECTIONS
+
+from fixtures import generated_game_log
+
+
+def many_moves_game_log() -> GameLog:
+    """A game log with more than 256 distinct moves, such that the moves are stored with two bytes each, and with extreme game IDs."""
+    game_log = GameLog()
+    game_ids = [0, -1, 2 ** 62, -2 ** 63, 7, 7]
+    for number, game_id in enumerate(game_ids):
+        game_log.condition1.append(ConditionGameLog(game_id=game_id, outcomes=[bool(game_id & (1 << i)) for i in range(number * 5)]))
+        moves = [Move(move_type=MoveType.MARRIAGE, cards=[cast(Card, card), cast(Card, 1000 + card * number)]) for card in range(60)]
+        game_log.action2.append(ActionGameLog(game_id=game_id, outcomes=moves))
+    game_log.integration.append(ActionGameLog(game_id=2 ** 62, outcomes=[]))
+    return game_log
+
+
+class CompactTest(TestCase):
+    def assertRoundTrip(self, game_log: GameLog, compress: bool = False) -> None:
+        compact = CompactGameLog(encode_compact(game_log, compress=compress))
+        self.assertEqual(compact.to_game_log(), game_log)
+        for section in SECTIONS:
+            self.assertEqual(list(getattr(compact, section)), list(getattr(game_log, section)), section)
+
+    def test_round_trip(self) -> None:
+        self.assertRoundTrip(generated_game_log())
+
+    @skipUnless(zstd_available(), "zstandard is not installed")
+    def test_round_trip_compressed(self) -> None:
+        self.assertRoundTrip(generated_game_log(), compress=True)
+        self.assertRoundTrip(many_moves_game_log(), compress=True)
+
+    def test_many_moves_and_extreme_game_ids(self) -> None:
+        self.assertRoundTrip(many_moves_game_log())
+
+    def test_sparse_and_empty(self) -> None:
+        self.assertRoundTrip(GameLog())
+        game_log = generated_game_log()
+        sparse = GameLog(condition3=game_log.condition3, action4=game_log.action4)
+        self.assertRoundTrip(sparse)
+        self.assertEqual(len(CompactGameLog(encode_compact(sparse)).condition1), 0)
+
+    def test_sections_are_decoded_when_used(self) -> None:
+        compact = CompactGameLog(encode_compact(generated_game_log()))
+        self.assertEqual(compact._sections, {})
+        compact.action1
+        self.assertEqual(list(compact._sections), ["action1"])
+        self.assertIs(compact.action1, compact.action1)
+        with self.assertRaises(AttributeError):
+            compact.condition9
+
+    def test_data_is_not_copied(self) -> None:
+        game_log = generated_game_log()
+        data = bytearray(encode_compact(game_log))
+        compact = CompactGameLog(memoryview(data))
+        for section in SECTIONS:
+            self.assertIs(compact._blocks[section][1].obj, data)
+        self.assertEqual(compact.to_game_log(), game_log)
+
+    def test_pickle(self) -> None:
+        game_log = generated_game_log()
+        compact = pickle.loads(pickle.dumps(CompactGameLog(memoryview(encode_compact(game_log)))))
+        self.assertEqual(compact.to_game_log(), game_log)
+
+    def test_read_game_log_keeps_it_compact(self) -> None:
+        game_log = generated_game_log()
+        compact = read_game_log(io.BytesIO(encode_compact(game_log)))
+        self.assertIsInstance(compact, CompactGameLog)
+        self.assertEqual(cast(CompactGameLog, compact).to_game_log(), game_log)
+        self.assertEqual(read_compact(io.BytesIO(encode_compact(game_log))).SerializeToString(), game_log.SerializeToString())
+
+    def test_truncated(self) -> None:
+        data = encode_compact(generated_game_log())
+        for length in (len(data) - 1, len(data) // 2, 30):
+            with self.subTest(length=length), self.assertRaises(ValueError):
+                compact = CompactGameLog(data[:length])
+                for section in SECTIONS:
+                    getattr(compact, section)
+
+    def test_not_compact(self) -> None:
+        with self.assertRaises(ValueError):
+            CompactGameLog(generated_game_log().SerializeToString())
@@ -0,0 +1,48 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from schnapsen_assignment.serialization import GameLog
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.export import CHECKS, NO_OUTCOME, export, game_log_rows
+from schnapsen_assignment.student.snapshots import SnapshotStore
+
+from fixtures import generated_game_log
+
+
+class ExportTest(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.store = SnapshotStore(self.directory / "cache")
+
+    def test_observed_outcomes_of_the_reference_bot(self) -> None:
+        rows = list(game_log_rows(generated_game_log(3), 0, AssignmentBot(), self.store))
+        integration = CHECKS.index("integration")
+        for _, _, check, _, _, expected, observed in rows:
+            if check != integration or observed != NO_OUTCOME:
+                self.assertEqual(observed, expected)
+        self.assertEqual({row[2] for row in rows}, set(range(len(CHECKS))))
+
+    def test_npz(self) -> None:
+        import numpy as np
+        path = self.directory / "log.gamelog"
+        game_log = generated_game_log(3)
+        path.write_bytes(game_log.SerializeToString())
+        rows = export([path], self.directory / "export.npz", chunk_rows=50)
+        with np.load(self.directory / "export.npz") as exported:
+            self.assertEqual(sum(len(exported[name]) for name in exported.files if name.startswith("game_id/")), rows)
+        self.assertEqual(rows, len(list(game_log_rows(game_log, 0))))
+
+    def test_integration_log_of_the_wrong_length(self) -> None:
+        for change in ("truncate", "extend"):
+            game_log = GameLog()
+            record = game_log.integration.add()
+            record.CopyFrom(generated_game_log(1).integration[0])
+            if change == "truncate":
+                del record.outcomes[-3:]
+            else:
+                record.outcomes.append(record.outcomes[-1])
+            with self.subTest(change=change), self.assertRaises(ValueError):
+                list(game_log_rows(game_log, 0, AssignmentBot(), self.store))
@@ -0,0 +1,157 @@
+import hashlib
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import tempfile
+import threading
+from typing import Any, Optional
+from unittest import TestCase
+
+from schnapsen_assignment.serialization import CompactGameLog
+from schnapsen_assignment.student.gamelog_cache import GamelogCache, make_session
+
+from fixtures import generated_game_log
+
+
+class GamelogServer(ThreadingHTTPServer):
+    """Serves the gamelogs in bodies at /<id>/bot.gamelog, with an ETag, and answers conditional requests with 304."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), GamelogHandler)
+        self.bodies: dict[int, bytes] = {}
+        self.unavailable = False
+        """Whether every request is answered with 503"""
+        self.requests: list[tuple[int, Optional[str]]] = []
+        """The ID and If-None-Match header of every request"""
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{{id}}/bot.gamelog"
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        return f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+class GamelogHandler(BaseHTTPRequestHandler):
+    server: GamelogServer
+
+    def do_GET(self) -> None:
+        id = int(self.path.split("/")[1])
+        self.server.requests.append((id, self.headers.get("If-None-Match")))
+        body = self.server.bodies.get(id)
+        if self.server.unavailable or body is None:
+            self.send_response(503 if self.server.unavailable else 404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == self.server.etag(body):
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("ETag", self.server.etag(body))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class GamelogCacheTest(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.server = GamelogServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.game_log = generated_game_log(2)
+        self.server.bodies[7] = self.game_log.SerializeToString()
+        self.cache = self.make_cache()
+
+    def make_cache(self, compact: bool = False) -> GamelogCache:
+        # few retries, such that running out of them does not take long
+        session = make_session(retries=2)
+        self.addCleanup(session.close)
+        return GamelogCache(self.directory, self.server.url, session, compact=compact)
+
+    def test_download_and_revalidate(self) -> None:
+        game_log, report = self.cache.fetch(7)
+        self.assertEqual(game_log, self.game_log)
+        self.assertEqual((report.hit, report.source), (False, "downloaded"))
+        game_log, report = self.cache.fetch(7)
+        self.assertEqual(game_log, self.game_log)
+        self.assertEqual((report.hit, report.source), (True, "not modified on server"))
+        self.assertEqual(self.server.requests, [(7, None), (7, self.server.etag(self.server.bodies[7]))])
+
+    def test_changed_body(self) -> None:
+        self.cache.fetch(7)
+        changed = generated_game_log(3)
+        self.server.bodies[7] = changed.SerializeToString()
+        game_log, report = self.cache.fetch(7)
+        self.assertEqual(game_log, changed)
+        self.assertFalse(report.hit)
+
+    def test_compact(self) -> None:
+        cache = self.make_cache(compact=True)
+        cache.fetch(7)
+        game_log, report = cache.fetch(7)
+        self.assertIsInstance(game_log, CompactGameLog)
+        self.assertEqual(game_log.SerializeToString(), self.game_log.SerializeToString())
+        self.assertEqual(report.source, "not modified on server")
+
+    def test_offline(self) -> None:
+        with self.assertRaises(Exception):
+            self.cache.fetch(7, offline=True)
+        self.cache.fetch(7)
+        requests = len(self.server.requests)
+        game_log, report = self.cache.fetch(7, offline=True)
+        self.assertEqual(game_log, self.game_log)
+        self.assertEqual(report.source, "offline")
+        self.assertEqual(len(self.server.requests), requests)
+        # a modified cache file is not used
+        self.cache.gamelog_path(7).write_bytes(self.cache.gamelog_path(7).read_bytes()[:-1])
+        with self.assertRaises(Exception):
+            self.cache.fetch(7, offline=True)
+
+    def test_retries_run_out(self) -> None:
+        self.server.unavailable = True
+        with self.assertRaises(Exception):
+            self.cache.fetch(7)
+        # the first request and two retries
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertFalse(self.cache.gamelog_path(7).exists())
+
+    def test_corrupt_body_is_not_stored(self) -> None:
+        self.server.bodies[7] = b"not a gamelog"
+        with self.assertRaisesRegex(Exception, "cannot be read"):
+            self.cache.fetch(7)
+        self.assertFalse(self.cache.gamelog_path(7).exists())
+        self.assertFalse(self.cache.metadata_path(7).exists())
+        self.server.bodies[7] = self.game_log.SerializeToString()
+        self.assertEqual(self.cache.fetch(7)[0], self.game_log)
+
+    def test_corrupt_cached_copy_is_replaced(self) -> None:
+        # stored by a version which did not parse the content, with the ETag which the server keeps confirming
+        self.cache.gamelog_path(7).write_bytes(b"not a gamelog")
+        self.cache.metadata_path(7).write_text(json.dumps({"sha256": hashlib.sha256(b"not a gamelog").hexdigest(),
+                                                           "etag": self.server.etag(self.server.bodies[7])}))
+        self.assertTrue(self.cache.is_valid(7))
+        game_log, report = self.cache.fetch(7)
+        self.assertEqual(game_log, self.game_log)
+        self.assertEqual(report.source, "downloaded")
+        # confirmed by the server first, then downloaded again
+        self.assertEqual(self.server.requests, [(7, self.server.etag(self.server.bodies[7])), (7, None)])
+
+    def test_prefetch(self) -> None:
+        self.server.bodies[8] = generated_game_log(1).SerializeToString()
+        results = self.cache.prefetch([7, 8, 9], jobs=3)
+        self.assertFalse(isinstance(results[7], Exception) or results[7].hit)
+        self.assertFalse(isinstance(results[8], Exception) or results[8].hit)
+        self.assertIsInstance(results[9], Exception)
+        self.assertEqual(self.cache.fetch(8, offline=True)[0], generated_game_log(1))
+        results = self.cache.prefetch([7, 8])
+        self.assertTrue(all(not isinstance(result, Exception) and result.hit for result in results.values()))
@@ -0,0 +1,71 @@
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+from click.testing import CliRunner
+
+from schnapsen_assignment.serialization import GameLog, is_stream_file, read_game_log
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.check_implementation import main
+from schnapsen_assignment.student.checker import assess_correctness
+from schnapsen_assignment.student.generate import generate_game_log, write_generated
+
+from fixtures import BuggyBot, generated_game_log
+
+NEGATED_CONDITION2 = """from schnapsen_assignment.student.bot import AssignmentBot as Base
+
+
+class AssignmentBot(Base):
+    def condition2(self, perspective, leader_move):
+        return not super().condition2(perspective, leader_move)
+"""
+
+
+def failed_checks(bot: AssignmentBot, game_log: GameLog) -> list[bool]:
+    return [bool(check_errors) for errors_of_kind in assess_correctness(bot, game_log) for check_errors in errors_of_kind]
+
+
+class GenerateTest(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_the_reference_bot_passes(self) -> None:
+        self.assertEqual(failed_checks(AssignmentBot(), generated_game_log(5)), [False] * 8)
+        # the bot which generated the log passes, the others fail the checks of its bugs
+        buggy_log = generate_game_log(range(5), BuggyBot(rate=2))
+        self.assertEqual(failed_checks(BuggyBot(rate=2), buggy_log), [False] * 8)
+        self.assertEqual(failed_checks(AssignmentBot(), buggy_log), [False, False, True, False, True, False, True, True])
+
+    def test_formats_and_jobs(self) -> None:
+        game_ids = [3, 0, 7, 1, 2]
+        expected = generate_game_log(game_ids)
+        for stream, jobs, chunk_size in [(True, 1, 100), (True, 2, 2), (False, 2, 1)]:
+            with self.subTest(stream=stream, jobs=jobs, chunk_size=chunk_size):
+                path = self.directory / "generated.gamelog"
+                write_generated(path, game_ids, jobs=jobs, stream=stream, chunk_size=chunk_size)
+                self.assertEqual(is_stream_file(path), stream)
+                with open(path, "rb") as f:
+                    self.assertEqual(read_game_log(f), expected)
+
+    def test_reference_bot_from_a_file(self) -> None:
+        bot_path = self.directory / "negated.py"
+        bot_path.write_text(NEGATED_CONDITION2)
+        path = self.directory / "generated.gamelog"
+        write_generated(path, [0, 1], bot_path)
+        with open(path, "rb") as f:
+            game_log = read_game_log(f)
+        self.assertEqual([[not outcome for outcome in record.outcomes] for record in game_log.condition2],
+                         [list(record.outcomes) for record in generated_game_log(2).condition2])
+
+    def test_command(self) -> None:
+        path = self.directory / "generated.gamelog"
+        result = CliRunner().invoke(main, ["generate", "--games", "0-2,5", "--output", str(path), "--format", "standard"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Generated 4 games", result.output)
+        with open(path, "rb") as f:
+            self.assertEqual([record.game_id for record in read_game_log(f).integration], [0, 1, 2, 5])
+        result = CliRunner().invoke(main, ["generate", "--games", "0-x", "--output", str(path)])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Cannot parse the game IDs", result.output)
@@ -0,0 +1,76 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from schnapsen_assignment.student.batch import load_bot_class
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.incremental import CHECKS, ResultStore, assess_correctness_incremental
+
+from fixtures import generated_game_log
+
+BOT_SOURCE = """
+from schnapsen_assignment.student.bot import AssignmentBot
+
+
+class StudentBot(AssignmentBot):
+    def condition1(self, perspective, leader_move):
+        return {negate}super().condition1(perspective, leader_move)
+
+    def action1(self, perspective, leader_move):
+        if not self.condition1(perspective, leader_move):
+            raise ValueError("action1 called where condition1 does not hold")
+        return super().action1(perspective, leader_move)
+
+    def action4(self, perspective, leader_move):
+        move = super().action4(perspective, leader_move)
+        {action4}
+        return move
+"""
+
+
+class IncrementalTest(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.store = ResultStore(self.directory / "cache")
+        self.game_log = generated_game_log(3)
+        self.versions = 0
+
+    def load_bot(self, negate: bool, action4: str = "pass") -> AssignmentBot:
+        # every version gets its own module, the source is what the fingerprint is taken of
+        self.versions += 1
+        path = self.directory / f"student_bot_{self.versions}.py"
+        path.write_text(BOT_SOURCE.format(negate="not " if negate else "", action4=action4))
+        return load_bot_class(path, "StudentBot")()
+
+    def run_checks(self, bot: AssignmentBot) -> tuple[dict[str, bool], list[str]]:
+        (condition_errors, action_errors, integration_errors), reused = assess_correctness_incremental(bot, self.game_log, self.store)
+        return {check: not errors for check, errors in zip(CHECKS, condition_errors + action_errors + integration_errors)}, reused
+
+    def test_unchanged_bot_reuses_all_results(self) -> None:
+        passed, reused = self.run_checks(self.load_bot(negate=False))
+        self.assertEqual(reused, [])
+        self.assertTrue(all(passed.values()))
+        passed_again, reused = self.run_checks(self.load_bot(negate=False))
+        self.assertEqual(reused, list(CHECKS))
+        self.assertEqual(passed_again, passed)
+
+    def test_callers_of_a_changed_method_are_checked_again(self) -> None:
+        self.run_checks(self.load_bot(negate=False))
+        passed, reused = self.run_checks(self.load_bot(negate=True))
+        self.assertEqual(set(CHECKS) - set(reused), {"condition1", "action1", "integration"})
+        self.assertFalse(passed["condition1"])
+        self.assertFalse(passed["action1"])
+
+    def test_only_the_checks_of_a_changed_method_run_again(self) -> None:
+        self.run_checks(self.load_bot(negate=False))
+        passed, reused = self.run_checks(self.load_bot(negate=False, action4="assert move is not None"))
+        self.assertEqual(set(CHECKS) - set(reused), {"action4", "integration"})
+        self.assertTrue(all(passed.values()))
+
+    def test_checker_change_invalidates_results(self) -> None:
+        self.run_checks(self.load_bot(negate=False))
+        with mock.patch("schnapsen_assignment.student.incremental.checker_version", return_value="another checker"):
+            _, reused = self.run_checks(self.load_bot(negate=False))
+        self.assertEqual(reused, [])
@@ -0,0 +1,51 @@
+from collections import Counter
+import json
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+from schnapsen_assignment.student.bot import AssignmentBot
+from schnapsen_assignment.student.checker import ACTION_CHECKS, CONDITION_CHECKS, INTEGRATION_CHECK, assess_correctness
+from schnapsen_assignment.student.profiling import CheckProfile
+
+from fixtures import count_calls, generated_game_log
+
+CHECKS = CONDITION_CHECKS + ACTION_CHECKS + (INTEGRATION_CHECK,)
+
+
+class CheckProfileTest(TestCase):
+    def test_profile_of_a_check_run(self) -> None:
+        game_log = generated_game_log(5)
+        bot = AssignmentBot()
+        calls: Counter[str] = Counter()
+        # the method is wrapped by a decorator which does not keep its name, the calls are still accounted to the check
+        count_calls(bot, "condition2", calls)
+        profile = CheckProfile(CHECKS)
+        errors = assess_correctness(bot, game_log, profile=profile)
+        self.assertFalse(any(check_errors for errors_of_kind in errors for check_errors in errors_of_kind))
+
+        # the integration calls it as well, which is accounted to the integration
+        self.assertGreater(calls["condition2"], profile.checks["condition2"].calls)
+        for check in CONDITION_CHECKS + ACTION_CHECKS[1:]:
+            with self.subTest(check=check):
+                timing = profile.checks[check]
+                self.assertEqual(timing.games, 5)
+                self.assertEqual(timing.calls, sum(len(record.outcomes) for record in getattr(game_log, check)))
+                self.assertGreater(timing.student_seconds, 0)
+                self.assertGreater(timing.engine_seconds, 0)
+        self.assertEqual(profile.checks["action1"].calls, sum(sum(record.outcomes) for record in game_log.condition1))
+        # every game is replayed once for all conditions and actions, and once for the integration
+        self.assertEqual(profile.replays["shared"].games, 5)
+        self.assertEqual(profile.replays["integration"].games, 5)
+        self.assertGreater(profile.checks[INTEGRATION_CHECK].calls, 0)
+        shared = profile.replays["shared"]
+        self.assertAlmostEqual(shared.student_seconds, sum(profile.checks[check].student_seconds for check in CONDITION_CHECKS + ACTION_CHECKS))
+        self.assertAlmostEqual(shared.engine_seconds, sum(profile.checks[check].engine_seconds for check in CONDITION_CHECKS + ACTION_CHECKS))
+        self.assertEqual(len(profile.report().splitlines()), len(CHECKS) + 5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "trace.json"
+            profile.write_chrome_trace(path)
+            events = json.loads(path.read_text())["traceEvents"]
+        self.assertEqual(sorted(event["cat"] for event in events), ["integration"] * 5 + ["shared"] * 5)
+        self.assertEqual(events[0]["args"]["checks"], list(CONDITION_CHECKS + ACTION_CHECKS))
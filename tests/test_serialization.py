@@ -0,0 +1,48 @@
+from typing import cast
+from unittest import TestCase
+
+from schnapsen.deck import Card as SchnapsenCard
+from schnapsen.game import Marriage, RegularMove, TrumpExchange
+
+from schnapsen_assignment.serialization import MOVES, Card, Move, MoveType, move_code, to_pb_move, to_schnapsen_card, to_schnapsen_move, to_schnapsen_moves
+
+
+class ConversionTest(TestCase):
+    def test_cards_round_trip(self) -> None:
+        for card in SchnapsenCard:
+            pb_move = to_pb_move(RegularMove(card))
+            self.assertEqual(Card.Name(pb_move.cards[0]), card.name)
+            self.assertEqual(to_schnapsen_card(pb_move.cards[0]), card)
+
+    def test_known_moves_are_interned(self) -> None:
+        for code, move in enumerate(MOVES):
+            pb_move = to_pb_move(move)
+            self.assertIs(to_schnapsen_move(pb_move), move)
+            self.assertEqual(move_code(pb_move), code)
+        self.assertEqual(to_schnapsen_moves([to_pb_move(move) for move in MOVES]), MOVES)
+
+    def test_move_types(self) -> None:
+        self.assertIsInstance(to_schnapsen_move(to_pb_move(TrumpExchange(SchnapsenCard.JACK_SPADES))), TrumpExchange)
+        marriage = Marriage(SchnapsenCard.QUEEN_HEARTS, SchnapsenCard.KING_HEARTS)
+        self.assertEqual(to_schnapsen_move(to_pb_move(marriage)), marriage)
+
+    def test_wrong_card_counts_are_rejected(self) -> None:
+        cards = [cast(Card, number) for number in (0, 10, 11)]
+        for move_type, count in ((MoveType.REGULAR, 0), (MoveType.REGULAR, 2), (MoveType.TRUMP_EXCHANGE, 0), (MoveType.TRUMP_EXCHANGE, 2),
+                                 (MoveType.MARRIAGE, 0), (MoveType.MARRIAGE, 1), (MoveType.MARRIAGE, 3)):
+            move = Move(move_type=move_type, cards=cards[:count])
+            with self.subTest(move_type=MoveType.Name(move_type), count=count):
+                self.assertEqual(move_code(move), -1)
+                with self.assertRaises(AssertionError):
+                    to_schnapsen_move(move)
+                with self.assertRaises(AssertionError):
+                    to_schnapsen_moves([move])
+
+    def test_unknown_cards_are_rejected(self) -> None:
+        for number in (-1, 52, 60, 69, 1000):
+            move = Move(move_type=MoveType.REGULAR, cards=[cast(Card, number)])
+            self.assertEqual(move_code(move), -1)
+            with self.assertRaises(ValueError):
+                to_schnapsen_move(move)
+            with self.assertRaises(ValueError):
+                to_schnapsen_moves([move])
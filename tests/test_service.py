@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+import tempfile
+import time
+from unittest import TestCase, mock
+
+from schnapsen_assignment.student import service
+from schnapsen_assignment.student.gamelog_cache import GamelogCache
+from schnapsen_assignment.student.service import CheckService
+
+from fixtures import generated_game_log
+
+BOTS = {
+    "good": "from schnapsen_assignment.student.bot import AssignmentBot\n",
+    "hanging": ("from schnapsen_assignment.student.bot import AssignmentBot as Base\n\n\n"
+                "class AssignmentBot(Base):\n"
+                "    def condition1(self, perspective, leader_move):\n"
+                "        while True:\n"
+                "            pass\n"),
+    "slow": ("import time\n\nfrom schnapsen_assignment.student.bot import AssignmentBot as Base\n\n\n"
+             "class AssignmentBot(Base):\n"
+             "    def condition1(self, perspective, leader_move):\n"
+             "        time.sleep(0.1)\n"
+             "        return super().condition1(perspective, leader_move)\n"),
+    "exiting": ("import os\n\nfrom schnapsen_assignment.student.bot import AssignmentBot as Base\n\n\n"
+                "class AssignmentBot(Base):\n"
+                "    def condition1(self, perspective, leader_move):\n"
+                "        os._exit(1)\n"),
+}
+
+
+class CheckServiceTest(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        for name, source in BOTS.items():
+            (self.directory / f"{name}.py").write_text(source)
+        self.gamelog = self.directory / "test.gamelog"
+        self.gamelog.write_bytes(generated_game_log(3).SerializeToString())
+        self.cache = GamelogCache(self.directory / "cache")
+        self.service = CheckService(self.cache, workers=2, offline=True, job_timeout=60)
+        self.addCleanup(self.service.close)
+
+    def run_job(self, bot: str, timeout: float | None = None) -> service.Job:
+        job = self.service.submit(self.directory / f"{bot}.py", bot, gamelog=self.gamelog, timeout=timeout)
+        self.assertTrue(job.done.wait(120), f"{bot} did not finish")
+        return job
+
+    def test_good_bot(self) -> None:
+        job = self.run_job("good")
+        self.assertEqual(job.status, "done", job.error)
+        self.assertTrue(job.to_json()["passed"])
+
+    def test_timeout(self) -> None:
+        hanging = self.service.submit(self.directory / "hanging.py", "hanging", gamelog=self.gamelog, timeout=1)
+        slow = self.service.submit(self.directory / "slow.py", "slow", gamelog=self.gamelog)
+        self.assertTrue(hanging.done.wait(60))
+        self.assertEqual(hanging.status, "failed")
+        self.assertIn("did not finish within 1 seconds", hanging.error or "")
+        # the job which was running next to it is run again, on the new pool
+        self.assertIsNone(slow.finished)
+        self.assertTrue(slow.done.wait(120))
+        self.assertEqual(slow.status, "done", slow.error)
+        self.assertTrue(slow.to_json()["passed"], slow.to_json())
+        self.assertEqual(slow.retries, 0)
+        self.assertTrue(self.run_job("good").to_json()["passed"])
+
+    def test_timeout_of_the_service_is_the_limit(self) -> None:
+        self.assertEqual(self.service.submit(self.directory / "good.py", "good", gamelog=self.gamelog, timeout=600).timeout, 60)
+
+    def test_worker_dies(self) -> None:
+        job = self.run_job("exiting")
+        self.assertEqual(job.status, "failed")
+        self.assertIn("worker process died", job.error or "")
+        self.assertEqual(job.retries, service.JOB_RETRIES)
+        self.assertTrue(self.run_job("good").to_json()["passed"])
+
+    def test_close_cancels_queued_jobs(self) -> None:
+        running = [self.service.submit(self.directory / "slow.py", f"slow{i}", gamelog=self.gamelog) for i in range(2)]
+        queued = self.service.submit(self.directory / "good.py", "good", gamelog=self.gamelog)
+        deadline = time.monotonic() + 60
+        while self.service.status()["running"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.service.close()
+        self.assertTrue(queued.done.is_set())
+        self.assertEqual(queued.status, "failed")
+        self.assertIn("shut down", queued.error or "")
+        self.assertEqual(self.service.status()["queued"], {})
+        for job in running:
+            self.assertTrue(job.to_json()["passed"], job.to_json())
+
+    def test_game_logs(self) -> None:
+        self.cache.store(7, generated_game_log(2).SerializeToString())
+        key = self.service.submit(self.directory / "good.py", "good", student_id=7).game_log
+        self.assertIs(self.service.submit(self.directory / "good.py", "good", student_id=7).game_log, key)
+        with self.assertRaises(Exception):
+            self.service.submit(self.directory / "good.py", "good", student_id=8)
+        with mock.patch.object(service, "GAME_LOGS", 2):
+            self.service.submit(self.directory / "good.py", "good", gamelog=self.gamelog)
+            # a modified file is read again
+            stat = self.gamelog.stat()
+            os.utime(self.gamelog, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            self.service.submit(self.directory / "good.py", "good", gamelog=self.gamelog)
+            self.assertEqual(self.service.status()["gamelogs"], 2)
+            self.assertIsNot(self.service.submit(self.directory / "good.py", "good", student_id=7).game_log, key)
@@ -0,0 +1,71 @@
+import io
+import itertools
+from unittest import TestCase
+
+from schnapsen_assignment.serialization import GameLog, GameLogStreamReader, read_game_log, write_stream
+from schnapsen_assignment.serialization.stream import MAGIC, SECTIONS
+from schnapsen_assignment.student.checker import assess_correctness, assess_correctness_streaming
+
+from fixtures import BuggyBot, error_messages, generated_game_log
+
+
+def to_stream(game_log: GameLog, chunk_size: int | None = None) -> bytes:
+    fp = io.BytesIO()
+    write_stream(game_log, fp, chunk_size)
+    return fp.getvalue()
+
+
+class StreamTest(TestCase):
+    def test_round_trip(self) -> None:
+        game_log = generated_game_log()
+        for chunk_size in (None, 1, 7):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(read_game_log(io.BytesIO(to_stream(game_log, chunk_size))), game_log)
+
+    def test_records_in_order(self) -> None:
+        game_log = generated_game_log()
+        records = list(GameLogStreamReader(io.BytesIO(to_stream(game_log, 3))))
+        self.assertEqual(records, [(section, record) for section in SECTIONS for record in getattr(game_log, section)])
+
+    def test_skip_section(self) -> None:
+        game_log = generated_game_log()
+        for fp in (io.BytesIO(to_stream(game_log, 4)), io.BufferedReader(io.BytesIO(to_stream(game_log, 4)))):
+            reader = GameLogStreamReader(fp)
+            reader.skip_section("integration")
+            reader.skip_section("condition2")
+            sections = [section for section, _ in reader]
+            self.assertEqual(len(sections), len(game_log.condition1) * (len(SECTIONS) - 2))
+            self.assertNotIn("integration", sections)
+
+    def test_empty(self) -> None:
+        self.assertEqual(read_game_log(io.BytesIO(to_stream(GameLog()))), GameLog())
+
+    def test_reads_standard_game_logs(self) -> None:
+        game_log = generated_game_log()
+        self.assertEqual(read_game_log(io.BytesIO(game_log.SerializeToString())), game_log)
+
+    def test_truncated(self) -> None:
+        data = to_stream(generated_game_log(), 5)
+        with self.assertRaises(ValueError):
+            list(GameLogStreamReader(io.BytesIO(data[:-1])))
+
+    def test_unknown_section(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Unknown section number 99"):
+            list(GameLogStreamReader(io.BytesIO(MAGIC + bytes([99, 0]))))
+
+    def test_not_a_stream(self) -> None:
+        with self.assertRaises(ValueError):
+            GameLogStreamReader(io.BytesIO(generated_game_log().SerializeToString()))
+
+
+class StreamingCheckTest(TestCase):
+    def test_same_errors_as_assess_correctness(self) -> None:
+        game_log = generated_game_log()
+        for seed, fail_fast in itertools.product(range(3), (False, True)):
+            bot = BuggyBot(seed)
+            expected = error_messages(assess_correctness(bot, game_log, fail_fast=fail_fast))
+            self.assertTrue(any(expected[0]) and any(expected[1]))
+            for chunk_size in (None, 1, 7):
+                with self.subTest(seed=seed, fail_fast=fail_fast, chunk_size=chunk_size):
+                    streamed = assess_correctness_streaming(bot, GameLogStreamReader(io.BytesIO(to_stream(game_log, chunk_size))), fail_fast)
+                    self.assertEqual(error_messages(streamed), expected)